@@ -2,20 +2,41 @@
 # Note: In a real install, ranex_core is a compiled binary.
 # For this prototype, we assume the rust module is available in the path.
 
-from ranex_core import StateMachine as RustMachine
 from ranex_core import SchemaValidator as RustSchemaValidator
+from ranex.registry import StateTransitionError, get_registry
+from ranex.store import StateConflictError, StateStore
+from ranex.metrics import get_recorder
+from ranex.validation import SchemaValidatorPool, ValidatedCache, estimate_payload_size, get_validation_executor
+from ranex.batch import BatchItemResult, run_batch, run_batch_async
+from ranex.bulkhead import Bulkhead
+from ranex.eventlog import EventLog
+from ranex.idempotency import IdempotencyCache
+from ranex.offload import OffloadRunner, get_offload_executor
+from ranex.schema_cache import get_schema_cache
+from ranex.startup import warmup
 import functools
 import asyncio
+import collections.abc
+import inspect
 import logging
+# Bound by name: importing the ranex.logging submodule rebinds this
+# package's "logging" attribute, so logging.INFO is not safe at call time
+from logging import DEBUG, ERROR, INFO, WARNING
+import re
 import time
+import typing
 import contextvars
-from typing import Optional, Callable, Any, List
+from dataclasses import dataclass
+from typing import Optional, Callable, Any, Dict, List, Sequence, Tuple, Union
 
 # Initialize logger for Contract operations
 logger = logging.getLogger("ranex.contract")
 
-# Global schema validator instance
-_schema_validator = RustSchemaValidator()
+# Global schema registry (one native validator per thread when the GIL is off)
+_schema_validator = SchemaValidatorPool(RustSchemaValidator)
+
+# Compiled state.yaml rules, shared by every Contract in the process
+_feature_registry = get_registry()
 
 # Context variable for tenant ID (thread-safe, async-safe)
 _current_tenant: contextvars.ContextVar[str] = contextvars.ContextVar(
@@ -23,63 +44,6 @@ _current_tenant: contextvars.ContextVar[str] = contextvars.ContextVar(
 )
 
 
-class StateTransitionError(Exception):
-    """
-    Exception raised when an invalid state transition is attempted.
-    
-    This exception provides detailed information about the failed transition,
-    including the current state, the attempted state, and the list of allowed
-    transitions from the current state.
-    
-    Attributes:
-        message: Human-readable error message
-        current_state: The state the machine was in when transition was attempted
-        attempted_state: The state that was attempted to transition to
-        allowed_states: List of valid states that can be transitioned to from current_state
-    
-    Example:
-        try:
-            _ctx.transition("InvalidState")
-        except StateTransitionError as e:
-            print(f"Cannot transition from {e.current_state} to {e.attempted_state}")
-            print(f"Allowed transitions: {e.allowed_states}")
-    """
-    
-    def __init__(
-        self, 
-        message: str, 
-        current_state: str, 
-        attempted_state: str, 
-        allowed_states: List[str]
-    ):
-        """
-        Initialize a StateTransitionError.
-        
-        Args:
-            message: Human-readable error message
-            current_state: The state the machine was in
-            attempted_state: The state that was attempted
-            allowed_states: List of valid transition targets
-        """
-        super().__init__(message)
-        self.current_state = current_state
-        self.attempted_state = attempted_state
-        self.allowed_states = allowed_states
-    
-    def __str__(self) -> str:
-        return (
-            f"Cannot transition from '{self.current_state}' to '{self.attempted_state}'. "
-            f"Allowed transitions: {self.allowed_states}"
-        )
-    
-    def __repr__(self) -> str:
-        return (
-            f"StateTransitionError(current_state={self.current_state!r}, "
-            f"attempted_state={self.attempted_state!r}, "
-            f"allowed_states={self.allowed_states!r})"
-        )
-
-
 def set_tenant_id(tenant_id: str) -> contextvars.Token:
     """
     Set the current tenant ID in the context.
@@ -132,35 +96,630 @@ def reset_tenant_id(token: contextvars.Token) -> None:
     _current_tenant.reset(token)
 
 
-def _parse_state_transition_error(error_message: str, current_state: str, attempted_state: str) -> StateTransitionError:
+# Sentinel for "argument not supplied" (None is a valid payload)
+_MISSING = object()
+
+
+_SEQUENCE_ORIGINS = (
+    list, tuple, collections.abc.Sequence, collections.abc.Collection, collections.abc.Iterable,
+)
+_SEQUENCE_ANNOTATION = re.compile(
+    r"^(?:typing\.)?(?:List|list|Sequence|Collection|Iterable|Tuple|tuple)\[(\w+)(?:,\.\.\.)?\]$"
+)
+
+
+def _is_sequence_of(annotation: Any, input_schema: Any, schema_label: Optional[str]) -> bool:
+    """Return True for List[Schema], Sequence[Schema], tuple[Schema, ...] and their string forms."""
+    if isinstance(annotation, str):
+        match = _SEQUENCE_ANNOTATION.match(annotation.replace(" ", ""))
+        return match is not None and match.group(1) == schema_label
+    if typing.get_origin(annotation) not in _SEQUENCE_ORIGINS:
+        return False
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) is tuple:
+        return len(args) == 2 and args[0] is input_schema and args[1] is Ellipsis
+    return len(args) == 1 and args[0] is input_schema
+
+
+def _bind_schema_param(func: Callable, input_schema: Any) -> Tuple[Optional[int], Optional[str], bool]:
     """
-    Parse a state transition error message from Rust and create a StateTransitionError.
-    
-    Args:
-        error_message: The error message from Rust
-        current_state: The current state
-        attempted_state: The attempted state
-        
+    Find the parameter that carries the payload validated against input_schema.
+
+    Prefers a parameter annotated with the schema class, or with a list of
+    it; otherwise falls back to the first positional parameter (skipping
+    self/cls and _ctx).
+
     Returns:
-        A StateTransitionError with parsed information
+        (positional index or None, parameter name or None, whether the
+        parameter is a list of the schema)
     """
-    # Try to extract allowed states from the error message
-    # Format: "... Allowed transitions from 'X': [A, B, C]"
-    allowed_states = []
-    if "Allowed transitions" in error_message:
-        try:
-            # Extract the list part after the colon
-            list_part = error_message.split("[")[-1].rstrip("]")
-            allowed_states = [s.strip().strip("'\"") for s in list_part.split(",") if s.strip()]
-        except (IndexError, ValueError):
-            pass
-    
-    return StateTransitionError(
-        message=error_message,
-        current_state=current_state,
-        attempted_state=attempted_state,
-        allowed_states=allowed_states
+    try:
+        params = list(inspect.signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return 0, None, False
+
+    bindable = (
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        inspect.Parameter.KEYWORD_ONLY,
     )
+    schema_label = getattr(input_schema, "__name__", None)
+    chosen = None
+    many = False
+    for param in params:
+        if param.kind in bindable and param.name != "_ctx":
+            if param.annotation is input_schema or (schema_label and param.annotation == schema_label):
+                chosen = param
+                break
+            if _is_sequence_of(param.annotation, input_schema, schema_label):
+                chosen = param
+                many = True
+                break
+    if chosen is None:
+        for param in params:
+            if param.kind in bindable[:2] and param.name not in ("self", "cls", "_ctx"):
+                chosen = param
+                break
+    if chosen is None:
+        return None, None, False
+
+    index = params.index(chosen) if chosen.kind in bindable[:2] else None
+    name = chosen.name if chosen.kind is not inspect.Parameter.POSITIONAL_ONLY else None
+    return index, name, many
+
+
+def _raw_validator(input_schema: Any, many: bool) -> Callable[[Any], Any]:
+    """Build the one-pass JSON parse-and-validate function for Contract(raw_body=True)."""
+    if not many:
+        return input_schema.model_validate_json
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(List[input_schema]).validate_json
+
+
+def _raw_errors(error: ValueError) -> List[str]:
+    """Render a Pydantic ValidationError as "field.path: message" strings."""
+    errors = getattr(error, "errors", None)
+    if not callable(errors):
+        return [str(error)]
+    rendered = []
+    for item in errors(include_url=False, include_input=False):
+        location = ".".join(str(part) for part in item.get("loc", ()))
+        rendered.append(f"{location}: {item['msg']}" if location else item["msg"])
+    return rendered
+
+
+def _bind_named_param(func: Callable, name: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Locate a parameter by name.
+
+    Returns:
+        (positional index or None, parameter name)
+
+    Raises:
+        ValueError: If the function has no such parameter
+    """
+    params = list(inspect.signature(func).parameters.values())
+    for index, param in enumerate(params):
+        if param.name == name:
+            positional = param.kind in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            )
+            return (index if positional else None), name
+    raise ValueError(f"{func.__name__}() has no parameter named '{name}'")
+
+
+def _bind_batch_item(
+    func: Callable,
+    schema_index: Optional[int],
+    schema_param: Optional[str],
+    entity_index: Optional[int],
+    entity_param: Optional[str],
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Decide which parameter Contract's batch() passes each item to.
+
+    That is the parameter input_schema validates and a named entity_key
+    reads (they must be the same one), else the first positional parameter.
+
+    Returns:
+        (keyword to pass items as, or None to pass them as the first
+        positional argument; error message if items cannot be bound)
+    """
+    slots: Dict[Tuple[str, Any], Optional[str]] = {}
+    for index, name in ((schema_index, schema_param), (entity_index, entity_param)):
+        if index is not None or name is not None:
+            key = ("index", index) if index is not None else ("name", name)
+            slots[key] = slots.get(key) or name
+    if len(slots) > 1:
+        return None, (
+            f"{func.__name__}.batch() passes each item as a single argument, but input_schema "
+            f"binds '{schema_param or schema_index}' and entity_key '{entity_param or entity_index}'"
+        )
+    if not slots:
+        return None, None
+    (kind, position), name = next(iter(slots.items()))
+    if kind == "index" and position == 0:
+        return None, None
+    if name is None:
+        return None, f"{func.__name__}.batch() cannot pass items to positional-only parameter #{position}"
+    return name, None
+
+
+@dataclass(frozen=True, slots=True)
+class _InvocationPlan:
+    """
+    Immutable per-function plan built once when Contract decorates a function.
+
+    Everything that does not depend on the call arguments is resolved here,
+    so the wrappers only run the steps the plan enables. Log records are
+    built only when their level is enabled on the ``ranex.contract`` logger.
+    """
+    feature: str
+    func_name: str
+    schema_name: Optional[str]
+    schema_index: Optional[int]
+    schema_param: Optional[str]
+    tenant_id: Optional[str]
+    state_store: Optional[StateStore] = None
+    entity_getter: Optional[Callable[..., Any]] = None
+    entity_index: Optional[int] = None
+    entity_param: Optional[str] = None
+    schema_model: Optional[type] = None
+    validated_cache: Optional[ValidatedCache] = None
+    offload_bytes: Optional[int] = None
+    optimistic: bool = False
+    idempotency_key: Optional[Callable[..., Any]] = None
+    event_log: Optional[EventLog] = None
+    schema_many: bool = False
+    raw_validator: Optional[Callable[[Any], Any]] = None
+    # How batch() binds items; see _bind_batch_item
+    batch_param: Optional[str] = None
+    batch_error: Optional[str] = None
+
+    def bound_payload(self, args: tuple, kwargs: dict) -> Any:
+        """Return the schema-bound argument, or _MISSING if not supplied."""
+        index = self.schema_index
+        if index is not None and len(args) > index:
+            return args[index]
+        if self.schema_param is not None:
+            return kwargs.get(self.schema_param, _MISSING)
+        return _MISSING
+
+    def needs_validation(self, payload: Any) -> bool:
+        """Return False for payloads that are known to be valid already."""
+        if payload is _MISSING:
+            return False
+        # Fast paths: model instances were validated by Pydantic on construction,
+        # and objects seen recently were validated by us
+        if self.schema_model is not None and isinstance(payload, self.schema_model):
+            return False
+        cache = self.validated_cache
+        return cache is None or not cache.contains(payload)
+
+    def validate(self, args: tuple, kwargs: dict) -> None:
+        """Validate the bound payload against the registered schema."""
+        payload = self.bound_payload(args, kwargs)
+        if self.schema_many:
+            self.validate_items(payload)
+            return
+        if not self.needs_validation(payload):
+            return
+        recorder = get_recorder()
+        if recorder is None:
+            self.check_result(_schema_validator.validate(self.schema_name, payload), payload)
+            return
+        started = time.perf_counter()
+        validation_result = _schema_validator.validate(self.schema_name, payload)
+        recorder.observe("schema_validation_seconds", (self.feature, "inline"), time.perf_counter() - started)
+        self.check_result(validation_result, payload)
+
+    async def validate_async(self, args: tuple, kwargs: dict) -> None:
+        """
+        Validate the bound payload, offloading large payloads to a thread pool.
+
+        Payloads estimated above ``offload_bytes`` are validated on the
+        bounded ranex-validate pool so the event loop keeps serving other
+        coroutines; smaller ones are validated inline.
+        """
+        payload = self.bound_payload(args, kwargs)
+        if not self.needs_validation(payload):
+            return
+        if estimate_payload_size(payload, self.offload_bytes) <= self.offload_bytes:
+            self.validate(args, kwargs)
+            return
+        if self.schema_many:
+            await asyncio.get_running_loop().run_in_executor(
+                get_validation_executor(), self.validate_items, payload, "offload"
+            )
+            return
+        started = time.perf_counter()
+        validation_result = await asyncio.get_running_loop().run_in_executor(
+            get_validation_executor(), _schema_validator.validate, self.schema_name, payload
+        )
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.observe("schema_validation_seconds", (self.feature, "offload"), time.perf_counter() - started)
+        self.check_result(validation_result, payload)
+
+    def decode_raw(self, args: tuple, kwargs: dict, mode: str = "raw") -> tuple:
+        """
+        Parse and validate a raw JSON body bound to the schema parameter.
+
+        Bytes, bytearray, memoryview and str payloads go through Pydantic's
+        native JSON validator, which builds the model (or list of models)
+        straight from the bytes, without an intermediate dict. The model
+        replaces the raw argument, so later validation is skipped. Other
+        payloads are returned untouched.
+
+        Returns:
+            The positional arguments, with the model substituted if bound positionally
+        """
+        payload = self.bound_payload(args, kwargs)
+        if not isinstance(payload, (bytes, bytearray, memoryview, str)):
+            return args
+        if isinstance(payload, memoryview):
+            payload = payload.tobytes()  # Pydantic parses str, bytes and bytearray only
+
+        recorder = get_recorder()
+        started = time.perf_counter() if recorder is not None else 0.0
+        try:
+            model = self.raw_validator(payload)
+        except ValueError as e:
+            errors = _raw_errors(e)
+            error_msg = f"Schema validation failed: {', '.join(errors)}"
+            if logger.isEnabledFor(ERROR):
+                logger.error(
+                    error_msg,
+                    extra={
+                        "feature": self.feature,
+                        "function": self.func_name,
+                        "schema_name": self.schema_name,
+                        "errors": errors,
+                        "payload_bytes": len(payload),
+                    }
+                )
+            raise ValueError(error_msg) from None
+        finally:
+            if recorder is not None:
+                recorder.observe("schema_validation_seconds", (self.feature, mode), time.perf_counter() - started)
+
+        index = self.schema_index
+        if index is not None and len(args) > index:
+            return args[:index] + (model,) + args[index + 1:]
+        kwargs[self.schema_param] = model
+        return args
+
+    async def decode_raw_async(self, args: tuple, kwargs: dict) -> tuple:
+        """decode_raw, on the validation pool for bodies larger than ``offload_bytes``."""
+        payload = self.bound_payload(args, kwargs)
+        if (
+            self.offload_bytes is None
+            or not isinstance(payload, (bytes, bytearray, memoryview, str))
+            or estimate_payload_size(payload, self.offload_bytes) <= self.offload_bytes
+        ):
+            return self.decode_raw(args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            get_validation_executor(), self.decode_raw, args, kwargs, "raw_offload"
+        )
+
+    def validate_items(self, payload: Any, mode: str = "inline") -> None:
+        """
+        Validate a list-of-schema argument in one native call.
+
+        Items that are already model instances are skipped. Raises
+        ValueError naming the failing indices (see
+        SchemaValidatorPool.validate_many).
+        """
+        if payload is _MISSING:
+            return
+        if not isinstance(payload, (list, tuple)):
+            raise ValueError(
+                f"Schema validation failed: expected a list for '{self.schema_name}', got {type(payload).__name__}"
+            )
+        items = payload
+        indices = None
+        model = self.schema_model
+        if model is not None:
+            # Model instances were validated by Pydantic on construction
+            indices = [i for i, item in enumerate(payload) if not isinstance(item, model)]
+            if not indices:
+                return
+            if len(indices) == len(payload):
+                indices = None
+            else:
+                items = [payload[i] for i in indices]
+
+        recorder = get_recorder()
+        started = time.perf_counter() if recorder is not None else 0.0
+        result = _schema_validator.validate_many(self.schema_name, items)
+        if recorder is not None:
+            recorder.observe("schema_validation_seconds", (self.feature, mode), time.perf_counter() - started)
+        if result.valid:
+            return
+
+        errors = result.errors
+        if indices is not None:
+            errors = {(indices[i] if i >= 0 else i): e for i, e in errors.items()}
+        failed = sorted(errors)
+        shown = "; ".join(f"[{i}] {', '.join(errors[i])}" for i in failed[:5])
+        more = f"; ... {len(failed) - 5} more" if len(failed) > 5 else ""
+        error_msg = f"Schema validation failed for {len(failed)} of {len(payload)} items: {shown}{more}"
+        if logger.isEnabledFor(ERROR):
+            logger.error(
+                error_msg,
+                extra={
+                    "feature": self.feature,
+                    "function": self.func_name,
+                    "schema_name": self.schema_name,
+                    "failed_indices": failed,
+                    "errors": {i: errors[i] for i in failed[:100]},
+                }
+            )
+        raise ValueError(error_msg)
+
+    def check_result(self, validation_result: Any, payload: Any) -> None:
+        """Raise ValueError for a failed validation; remember passing payloads."""
+        cache = self.validated_cache
+        if not validation_result.valid:
+            error_msg = f"Schema validation failed: {', '.join(validation_result.errors)}"
+            if logger.isEnabledFor(ERROR):
+                logger.error(
+                    error_msg,
+                    extra={
+                        "feature": self.feature,
+                        "function": self.func_name,
+                        "schema_name": self.schema_name,
+                        "errors": validation_result.errors,
+                        "field_errors": validation_result.field_errors,
+                    }
+                )
+            raise ValueError(error_msg)
+        if cache is not None:
+            cache.add(payload)
+
+    def resolve_tenant(self, kwargs: dict) -> str:
+        """
+        Resolve the tenant for this call.
+
+        Priority order:
+        1. Explicit tenant_id parameter on Contract
+        2. tenant_id from kwargs (passed by caller, consumed here)
+        3. Context variable (set by middleware)
+        4. Default
+        """
+        if self.tenant_id is not None:
+            return self.tenant_id
+        tenant_context = kwargs.pop('tenant_id', None)
+        if tenant_context is None:
+            tenant_context = _current_tenant.get()
+        return tenant_context
+
+    def idempotency_key_for(self, args: tuple, kwargs: dict, tenant_context: str) -> Optional[str]:
+        """Scope the caller's idempotency key to this function and tenant (None: not idempotent)."""
+        key = self.idempotency_key(*args, **kwargs)
+        if key is None:
+            return None
+        return f"{self.feature}:{self.func_name}:{tenant_context}:{key}"
+
+    def entity_id(self, args: tuple, kwargs: dict) -> Optional[str]:
+        """Resolve the entity id used as the state store key."""
+        if self.entity_getter is not None:
+            value = self.entity_getter(*args, **kwargs)
+        else:
+            index = self.entity_index
+            if index is not None and len(args) > index:
+                value = args[index]
+            else:
+                value = kwargs.get(self.entity_param)
+        return None if value is None else str(value)
+
+    def enter(
+        self, args: tuple, kwargs: dict, tenant_context: str, validate: bool = True
+    ) -> Tuple[Any, Optional[Tuple[str, str, Optional[str]]]]:
+        """
+        Validate input, build the machine and inject it as ``_ctx``.
+
+        Pass ``validate=False`` when the caller already ran validate_async.
+
+        Returns:
+            (machine, entity scope) where the scope is (tenant_id, entity_id,
+            stored_state) when the call has an entity for the state store or
+            event log (stored_state is None without a store), else None
+        """
+        if validate and self.schema_name is not None:
+            self.validate(args, kwargs)
+
+        ctx = _feature_registry.new_machine(
+            self.feature, record=self.event_log is not None or get_recorder() is not None
+        )
+
+        scope = None
+        if self.state_store is not None or self.event_log is not None:
+            entity = self.entity_id(args, kwargs)
+            if entity is not None:
+                stored = None
+                if self.state_store is not None:
+                    stored = self.state_store.get(self.feature, tenant_context, entity)
+                    if stored is not None:
+                        ctx.set_state(stored)
+                scope = (tenant_context, entity, stored)
+
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(
+                f"Contract initialized with tenant context: {tenant_context}",
+                extra={
+                    "feature": self.feature,
+                    "tenant_id": tenant_context,
+                    "state_key": f"{self.feature}:{tenant_context}",
+                    "initial_state": ctx.current_state,
+                }
+            )
+
+        kwargs['_ctx'] = ctx
+        return ctx, scope
+
+    def complete(
+        self, ctx: Any, scope: Optional[Tuple[str, str, Optional[str]]], initial_state: str, start_time: float
+    ) -> None:
+        """
+        Persist the final state (if it changed), append the transitions to
+        the event log and log completion.
+
+        Raises:
+            StateConflictError: In optimistic mode, if another worker changed
+                the stored state since enter() read it
+        """
+        if scope is not None:
+            tenant_context, entity, stored = scope
+            if self.state_store is None or ctx.current_state == initial_state:
+                pass
+            elif not self.optimistic:
+                self.state_store.set(self.feature, tenant_context, entity, ctx.current_state)
+            elif not self.state_store.compare_and_set(
+                self.feature, tenant_context, entity, stored, ctx.current_state
+            ):
+                raise StateConflictError(self.feature, tenant_context, entity, stored, ctx.current_state)
+            if self.event_log is not None and ctx.trail:
+                self.event_log.append(self.feature, tenant_context, entity, ctx.trail)
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record_contract(
+                self.feature, self.func_name, "success", time.perf_counter() - start_time, ctx.trail
+            )
+        self.log_complete(ctx, start_time)
+
+    def log_start(self) -> None:
+        if logger.isEnabledFor(INFO):
+            logger.info(
+                f"Contract execution started: feature={self.feature}, function={self.func_name}",
+                extra={
+                    "feature": self.feature,
+                    "function": self.func_name,
+                    "operation": "contract_start",
+                }
+            )
+
+    def log_complete(self, ctx: Any, start_time: float) -> None:
+        if logger.isEnabledFor(INFO):
+            duration = time.perf_counter() - start_time
+            logger.info(
+                f"Contract execution completed: feature={self.feature}, function={self.func_name}, duration={duration:.3f}s",
+                extra={
+                    "feature": self.feature,
+                    "function": self.func_name,
+                    "operation": "contract_complete",
+                    "duration_seconds": duration,
+                    "success": True,
+                    "final_state": ctx.current_state,
+                }
+            )
+
+    def first_item(self, start_time: float) -> None:
+        """Record the time from the call to a stream's first item."""
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.observe(
+                "contract_stream_first_item_seconds", (self.feature, self.func_name), time.perf_counter() - start_time
+            )
+
+    def abandon(self, ctx: Any, initial_state: Optional[str], start_time: float) -> None:
+        """
+        Handle a stream closed or cancelled before it was exhausted.
+
+        The consumer went away (e.g. the client disconnected), so the
+        transitions made so far are rolled back as on failure, the call is
+        counted as "cancelled" and a warning without traceback is logged.
+        """
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record_contract(self.feature, self.func_name, "cancelled", time.perf_counter() - start_time)
+        rolled_back_from = None
+        if ctx is not None and initial_state is not None and ctx.current_state != initial_state:
+            rolled_back_from = ctx.current_state
+            ctx.restore(initial_state)
+            if recorder is not None:
+                recorder.inc("contract_rollbacks_total", (self.feature, self.func_name, "success"))
+
+        if logger.isEnabledFor(WARNING):
+            rollback_note = (
+                f", state rolled back from '{rolled_back_from}' to '{initial_state}'"
+                if rolled_back_from is not None else ""
+            )
+            logger.warning(
+                f"Contract stream closed early: feature={self.feature}, function={self.func_name}{rollback_note}",
+                extra={
+                    "feature": self.feature,
+                    "function": self.func_name,
+                    "operation": "contract_cancelled",
+                    "duration_seconds": time.perf_counter() - start_time,
+                    "rolled_back_from": rolled_back_from,
+                    "success": False,
+                }
+            )
+
+    def fail(self, ctx: Any, initial_state: Optional[str], error: Exception, kwargs: dict, start_time: float) -> Optional[Exception]:
+        """
+        Handle a failed call: translate transition errors, roll back, log.
+
+        Returns:
+            A replacement exception to raise from ``error``, or None to re-raise it
+        """
+        feature = self.feature
+        func_name = self.func_name
+
+        # No transitions: a failed call's transitions are rolled back (or never
+        # persisted), so only the rollback counter below records them
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record_contract(feature, func_name, "error", time.perf_counter() - start_time)
+
+        # Illegal transitions and lost races surface as-is: no rollback, no traceback logging
+        if isinstance(error, (StateTransitionError, StateConflictError)):
+            return None
+        error_str = str(error)
+        if ctx is not None and "Illegal transition" in error_str:
+            # Raised by a raw Rust machine: attach the precomputed allowed states
+            return StateTransitionError(
+                message=error_str,
+                current_state=ctx.current_state,
+                attempted_state=kwargs.get('_attempted_state', 'unknown'),
+                allowed_states=ctx.rules.transitions.get(ctx.current_state, ()),
+                feature=ctx.rules.feature,
+            )
+
+        # Auto-rollback: restore the entry snapshot. No rule check, so it
+        # cannot fail, and it is counted rather than logged separately.
+        rolled_back_from = None
+        if ctx is not None and initial_state is not None and ctx.current_state != initial_state:
+            rolled_back_from = ctx.current_state
+            ctx.restore(initial_state)
+            if recorder is not None:
+                recorder.inc("contract_rollbacks_total", (feature, func_name, "success"))
+
+        if logger.isEnabledFor(ERROR):
+            duration = time.perf_counter() - start_time
+            rollback_note = (
+                f", state rolled back from '{rolled_back_from}' to '{initial_state}'"
+                if rolled_back_from is not None else ""
+            )
+            logger.error(
+                f"Contract execution failed: feature={feature}, function={func_name}, "
+                f"error={type(error).__name__}: {error_str}{rollback_note}",
+                extra={
+                    "feature": feature,
+                    "function": func_name,
+                    "operation": "contract_error",
+                    "duration_seconds": duration,
+                    "error_type": type(error).__name__,
+                    "error_message": error_str,
+                    "rolled_back_from": rolled_back_from,
+                    "success": False,
+                },
+                exc_info=True
+            )
+        return None
 
 
 def Contract(
@@ -168,16 +727,86 @@ def Contract(
     input_schema: Optional[Any] = None,
     auto_validate: bool = True,
     tenant_id: Optional[str] = None,
+    state_store: Optional[StateStore] = None,
+    entity_key: Optional[Union[str, Callable[..., Any]]] = None,
+    offload_validation_over_bytes: Optional[int] = None,
+    bulkhead: Optional[Bulkhead] = None,
+    optimistic: bool = False,
+    idempotency_key: Optional[Callable[..., Any]] = None,
+    idempotency_cache: Optional[IdempotencyCache] = None,
+    offload: Optional[str] = None,
+    event_log: Optional[EventLog] = None,
+    raw_body: bool = False,
 ):
     """
     The Runtime Guardrail.
-    Intercepts execution and verifies logic against the Rust Core.
+    Intercepts execution and checks every state transition against the
+    feature's compiled rules (ranex.registry): state.yaml is loaded by the
+    ranex_core StateMachine once per process and compiled into immutable
+    Python lookup tables, so transition checks never call into Rust.
+    ranex_core is still used for input_schema validation.
 
     Args:
         feature: Feature name (must match app/features/{feature}/state.yaml)
-        input_schema: Optional Pydantic BaseModel class for input validation
+        input_schema: Optional Pydantic BaseModel class for input validation.
+            Validates the parameter annotated with this class, or the first
+            positional parameter if none is. A parameter annotated as a list
+            of the class (``List[Model]``) is validated in one native call. Instances of the model (already
+            validated by Pydantic), objects validated recently and str/bytes
+            bodies equal to one validated recently are not re-validated;
+            dicts, lists and bytearrays always are.
         auto_validate: Whether to automatically validate state transitions (default: True)
         tenant_id: Explicit tenant ID for multi-tenant isolation. If None, uses context.
+        state_store: Optional StateStore (see ranex.store). The machine starts from
+            the entity's stored state and the final state is saved after success.
+        entity_key: Parameter name, or callable taking the call arguments, that
+            yields the entity id. Required with state_store.
+        offload_validation_over_bytes: Async (or offloaded) functions only. Payloads estimated
+            larger than this are schema-validated on a bounded thread pool
+            (see ranex.validation) instead of blocking the event loop.
+        bulkhead: Optional Bulkhead (see ranex.bulkhead) limiting concurrent
+            executions per feature and/or per tenant. Calls beyond the limit
+            queue up to its max_queue, then fail fast with BulkheadFullError.
+        optimistic: With state_store, save the final state with compare-and-set
+            against the state read at entry, so concurrent calls on the same
+            entity (on any node) cannot both apply. The loser raises the
+            retryable StateConflictError.
+        idempotency_key: Callable taking the call arguments and returning a key
+            (or None to opt a call out). Successful results are cached per
+            key and tenant; repeated calls return the cached result without
+            validation, state machine setup or execution, and concurrent
+            calls with the same key share one execution.
+        idempotency_cache: IdempotencyCache (see ranex.idempotency) to use with
+            idempotency_key; defaults to an in-memory cache with a 5 minute TTL.
+        offload: "thread" or "process" to run a sync function's body on a
+            managed pool (see ranex.offload) instead of the event loop. The
+            wrapped function becomes a coroutine function. Validation, state
+            store access and rollback stay in the caller; with "process",
+            the worker's transitions are replayed on the caller's ``_ctx``.
+        event_log: Optional EventLog (see ranex.eventlog). The transitions of
+            every successful call are appended to it, keyed by entity_key
+            (required), so entity states can later be rebuilt with replay().
+        raw_body: Accept the schema-bound argument as a raw JSON body (bytes,
+            bytearray, memoryview or str). It is parsed and validated in one
+            pass by Pydantic's native JSON validator and the function
+            receives the model instance (or list of them) instead; no
+            intermediate dicts are built. Needs a Pydantic input_schema.
+            Dicts and model instances are still accepted as before.
+
+    Generator and async generator functions are wrapped as generators: the
+    machine lives until the stream is exhausted (then the state is saved as
+    for a normal call), items are passed through unbuffered, and closing the
+    stream early or an error inside it rolls back. contract_duration_seconds
+    covers the whole stream; the time to the first item is recorded too.
+    offload and idempotency_key are not supported for generators.
+
+    The wrapped function also gets ``.batch(items, states=None, target=None, **kwargs)``,
+    which calls it once per item (passed as the first argument) with one
+    tenant resolution, one bulk transition check against ``target``, isolated
+    per-item rollback and one aggregated log/metrics record. It returns a
+    list of BatchItemResult (see ranex.batch) and does not raise per item.
+    For offloaded functions the whole batch runs on the offload thread pool.
+    Generator functions have no ``.batch``.
 
     Usage:
         @Contract(feature="payment")
@@ -203,9 +832,9 @@ def Contract(
         schema_name = None
         if input_schema is not None:
             try:
-                # Get Pydantic model's JSON schema
+                # Get Pydantic model's JSON schema (from the on-disk cache when unchanged)
                 if hasattr(input_schema, 'model_json_schema'):
-                    schema_dict = input_schema.model_json_schema()
+                    schema_dict = get_schema_cache().json_schema(input_schema)
                     schema_name = f"{feature}_{func.__name__}"
                     _schema_validator.register_schema(schema_name, schema_dict)
                     logger.debug(
@@ -218,324 +847,299 @@ def Contract(
                     extra={"feature": feature, "error": str(e)},
                     exc_info=True
                 )
-        is_async = asyncio.iscoroutinefunction(func)
 
-        if is_async:
+        schema_index, schema_param, schema_many = (
+            _bind_schema_param(func, input_schema) if schema_name else (None, None, False)
+        )
+        raw_validator = None
+        if raw_body:
+            if input_schema is not None and not hasattr(input_schema, "model_validate_json"):
+                raise ValueError("Contract(raw_body=True) needs a Pydantic model as input_schema")
+            if schema_name is None:
+                raise ValueError(f"Contract(feature={feature!r}, raw_body=True) needs an input_schema")
+            raw_validator = _raw_validator(input_schema, schema_many)
+        entity_getter = entity_index = entity_param = None
+        if state_store is not None or event_log is not None:
+            if entity_key is None:
+                needs = "state_store" if state_store is not None else "event_log"
+                raise ValueError(f"Contract(feature={feature!r}) needs entity_key when {needs} is set")
+            if callable(entity_key):
+                entity_getter = entity_key
+            else:
+                entity_index, entity_param = _bind_named_param(func, entity_key)
+        if optimistic and state_store is None:
+            raise ValueError(f"Contract(feature={feature!r}, optimistic=True) needs a state_store")
+        batch_param, batch_error = _bind_batch_item(func, schema_index, schema_param, entity_index, entity_param)
+
+        plan = _InvocationPlan(
+            feature=feature,
+            func_name=func.__name__,
+            schema_name=schema_name,
+            schema_index=schema_index,
+            schema_param=schema_param,
+            tenant_id=tenant_id,
+            state_store=state_store,
+            entity_getter=entity_getter,
+            entity_index=entity_index,
+            entity_param=entity_param,
+            schema_model=input_schema if schema_name and isinstance(input_schema, type) else None,
+            validated_cache=ValidatedCache() if schema_name else None,
+            offload_bytes=offload_validation_over_bytes,
+            optimistic=optimistic,
+            idempotency_key=idempotency_key,
+            event_log=event_log,
+            schema_many=schema_many,
+            raw_validator=raw_validator,
+            batch_param=batch_param,
+            batch_error=batch_error,
+        )
+        offload_validation = schema_name is not None and offload_validation_over_bytes is not None
+        streaming = inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func)
+        if streaming and (offload is not None or idempotency_key is not None):
+            needs = "offload" if offload is not None else "idempotency_key"
+            raise ValueError(f"Contract(feature={feature!r}) does not support {needs} on generator functions")
+        runner = OffloadRunner(offload, func) if offload is not None else None
+        idempotency = None
+        if idempotency_key is not None:
+            idempotency = idempotency_cache if idempotency_cache is not None else IdempotencyCache()
+
+        if inspect.isasyncgenfunction(func):
             @functools.wraps(func)
-            async def async_wrapper(*args, **kwargs):
-                # Log contract execution start
-                start_time = time.time()
-                logger.info(
-                    f"Contract execution started: feature={feature}, function={func.__name__}",
-                    extra={
-                        "feature": feature,
-                        "function": func.__name__,
-                        "operation": "contract_start",
-                    }
-                )
+            async def async_stream_wrapper(*args, **kwargs):
+                tenant_context = plan.resolve_tenant(kwargs)
+                permit = None
+                if bulkhead is not None:
+                    permit = await bulkhead.acquire_async(tenant_context)
+                start_time = time.perf_counter()
+                plan.log_start()
 
                 ctx = None
                 initial_state = None
                 try:
-                    # 1. Schema validation (if schema provided)
-                    if schema_name:
-                        # Find the first argument that matches the schema
-                        for arg in args:
-                            validation_result = _schema_validator.validate(schema_name, arg)
-                            if not validation_result.valid:
-                                error_msg = f"Schema validation failed: {', '.join(validation_result.errors)}"
-                                logger.error(
-                                    error_msg,
-                                    extra={
-                                        "feature": feature,
-                                        "function": func.__name__,
-                                        "schema_name": schema_name,
-                                        "errors": validation_result.errors,
-                                        "field_errors": validation_result.field_errors,
-                                    }
-                                )
-                                raise ValueError(error_msg)
-
-                    # 2. Initialize Rust State Engine with tenant isolation
-                    # Priority order for tenant_id:
-                    # 1. Explicit tenant_id parameter
-                    # 2. tenant_id from kwargs (passed by caller)
-                    # 3. Context variable (set by middleware)
-                    # 4. Default
-                    tenant_context = tenant_id
-                    if tenant_context is None:
-                        # Check if tenant_id was passed as kwarg
-                        tenant_context = kwargs.pop('tenant_id', None)
-                    if tenant_context is None:
-                        # Get from context variable (set by middleware)
-                        tenant_context = get_current_tenant_id()
-
-                    # Create tenant-scoped state machine key for logging
-                    state_key = f"{feature}:{tenant_context}"
-                    ctx = RustMachine(feature)
-                    initial_state = ctx.current_state  # Track initial state for rollback
-
-                    # Log tenant context
-                    logger.debug(
-                        f"Contract initialized with tenant context: {tenant_context}",
-                        extra={
-                            "feature": feature,
-                            "tenant_id": tenant_context,
-                            "state_key": state_key,
-                            "initial_state": initial_state,
-                        }
-                    )
+                    if raw_body:
+                        args = await plan.decode_raw_async(args, kwargs)
+                    if offload_validation:
+                        await plan.validate_async(args, kwargs)
+                        ctx, scope = plan.enter(args, kwargs, tenant_context, validate=False)
+                    else:
+                        ctx, scope = plan.enter(args, kwargs, tenant_context)
+                    initial_state = ctx.snapshot()  # Restored on failure or early close
 
-                    # 3. Inject Context into Function
-                    kwargs['_ctx'] = ctx
-
-                    # 4. Execute Logic
-                    result = await func(*args, **kwargs)
-
-                    # Log successful completion
-                    duration = time.time() - start_time
-                    logger.info(
-                        f"Contract execution completed: feature={feature}, function={func.__name__}, duration={duration:.3f}s",
-                        extra={
-                            "feature": feature,
-                            "function": func.__name__,
-                            "operation": "contract_complete",
-                            "duration_seconds": duration,
-                            "success": True,
-                            "final_state": ctx.current_state,
-                        }
-                    )
-
-                    return result
-
-                except Exception as e:
-                    # Check if this is a state transition error from Rust
-                    error_str = str(e)
-                    if ctx is not None and "Illegal transition" in error_str:
-                        # Parse and re-raise as StateTransitionError
-                        attempted = kwargs.get('_attempted_state', 'unknown')
-                        raise _parse_state_transition_error(
-                            error_str, 
-                            ctx.current_state, 
-                            attempted
-                        ) from e
-                    
-                    # Auto-rollback: Restore initial state if state changed
-                    if ctx is not None and initial_state is not None:
-                        current_state = ctx.current_state
-                        if current_state != initial_state:
+                    # Items are passed through one at a time (nothing is buffered);
+                    # asend()/athrow() are forwarded to the wrapped generator
+                    stream = func(*args, **kwargs)
+                    try:
+                        item = await stream.__anext__()
+                        plan.first_item(start_time)
+                        while True:
                             try:
-                                # Attempt to rollback to initial state
-                                ctx.transition(initial_state)
-                                logger.error(
-                                    f"Contract execution failed: feature={feature}, function={func.__name__}, "
-                                    f"state rolled back from '{current_state}' to '{initial_state}'",
-                                    extra={
-                                        "feature": feature,
-                                        "function": func.__name__,
-                                        "operation": "contract_rollback",
-                                        "from_state": current_state,
-                                        "to_state": initial_state,
-                                        "error_type": type(e).__name__,
-                                        "error_message": str(e),
-                                        "rollback_success": True,
-                                    }
-                                )
-                            except Exception as rollback_error:
-                                # Rollback failed - log but don't mask original error
-                                logger.error(
-                                    f"Contract execution failed: feature={feature}, function={func.__name__}, "
-                                    f"rollback failed: {rollback_error}",
-                                    extra={
-                                        "feature": feature,
-                                        "function": func.__name__,
-                                        "operation": "contract_rollback_failed",
-                                        "current_state": current_state,
-                                        "target_state": initial_state,
-                                        "error_type": type(e).__name__,
-                                        "error_message": str(e),
-                                        "rollback_error": str(rollback_error),
-                                        "rollback_success": False,
-                                    },
-                                    exc_info=True
-                                )
-
-                    # Log contract execution failure
-                    duration = time.time() - start_time
-                    logger.error(
-                        f"Contract execution failed: feature={feature}, function={func.__name__}, error={type(e).__name__}: {str(e)}",
-                        extra={
-                            "feature": feature,
-                            "function": func.__name__,
-                            "operation": "contract_error",
-                            "duration_seconds": duration,
-                            "error_type": type(e).__name__,
-                            "error_message": str(e),
-                            "success": False,
-                        },
-                        exc_info=True
-                    )
+                                sent = yield item
+                            except GeneratorExit:
+                                raise
+                            except BaseException as thrown:
+                                item = await stream.athrow(thrown)
+                            else:
+                                item = await stream.asend(sent)
+                    except StopAsyncIteration:
+                        pass
+                    finally:
+                        await stream.aclose()
+                    plan.complete(ctx, scope, initial_state, start_time)
+                except (GeneratorExit, asyncio.CancelledError):
+                    plan.abandon(ctx, initial_state, start_time)
                     raise
+                except Exception as e:
+                    replacement = plan.fail(ctx, initial_state, e, kwargs, start_time)
+                    if replacement is not None:
+                        raise replacement from e
+                    raise
+                finally:
+                    if permit is not None:
+                        permit.release()
 
-            return async_wrapper
+            async_stream_wrapper.__contract_plan__ = plan
+            return async_stream_wrapper
 
-        else:
+        if inspect.isgeneratorfunction(func):
             @functools.wraps(func)
-            def sync_wrapper(*args, **kwargs):
-                # Log contract execution start
-                start_time = time.time()
-                logger.info(
-                    f"Contract execution started: feature={feature}, function={func.__name__}",
-                    extra={
-                        "feature": feature,
-                        "function": func.__name__,
-                        "operation": "contract_start",
-                    }
-                )
+            def sync_stream_wrapper(*args, **kwargs):
+                tenant_context = plan.resolve_tenant(kwargs)
+                permit = None
+                if bulkhead is not None:
+                    permit = bulkhead.acquire(tenant_context)
+                start_time = time.perf_counter()
+                plan.log_start()
 
                 ctx = None
                 initial_state = None
                 try:
-                    # 1. Schema validation (if schema provided)
-                    if schema_name:
-                        # Find the first argument that matches the schema
-                        for arg in args:
-                            validation_result = _schema_validator.validate(schema_name, arg)
-                            if not validation_result.valid:
-                                error_msg = f"Schema validation failed: {', '.join(validation_result.errors)}"
-                                logger.error(
-                                    error_msg,
-                                    extra={
-                                        "feature": feature,
-                                        "function": func.__name__,
-                                        "schema_name": schema_name,
-                                        "errors": validation_result.errors,
-                                        "field_errors": validation_result.field_errors,
-                                    }
-                                )
-                                raise ValueError(error_msg)
-
-                    # 2. Initialize Rust State Engine with tenant isolation
-                    # Priority order for tenant_id:
-                    # 1. Explicit tenant_id parameter
-                    # 2. tenant_id from kwargs (passed by caller)
-                    # 3. Context variable (set by middleware)
-                    # 4. Default
-                    tenant_context = tenant_id
-                    if tenant_context is None:
-                        # Check if tenant_id was passed as kwarg
-                        tenant_context = kwargs.pop('tenant_id', None)
-                    if tenant_context is None:
-                        # Get from context variable (set by middleware)
-                        tenant_context = get_current_tenant_id()
-
-                    # Create tenant-scoped state machine key for logging
-                    state_key = f"{feature}:{tenant_context}"
-                    ctx = RustMachine(feature)
-                    initial_state = ctx.current_state  # Track initial state for rollback
-
-                    # Log tenant context
-                    logger.debug(
-                        f"Contract initialized with tenant context: {tenant_context}",
-                        extra={
-                            "feature": feature,
-                            "tenant_id": tenant_context,
-                            "state_key": state_key,
-                            "initial_state": initial_state,
-                        }
-                    )
+                    if raw_body:
+                        args = plan.decode_raw(args, kwargs)
+                    ctx, scope = plan.enter(args, kwargs, tenant_context)
+                    initial_state = ctx.snapshot()  # Restored on failure or early close
 
-                    # 3. Inject Context into Function
-                    kwargs['_ctx'] = ctx
+                    stream = func(*args, **kwargs)
+                    result = None
+                    try:
+                        item = next(stream)
+                        plan.first_item(start_time)
+                        while True:
+                            try:
+                                sent = yield item
+                            except GeneratorExit:
+                                raise
+                            except BaseException as thrown:
+                                item = stream.throw(thrown)
+                            else:
+                                item = stream.send(sent)
+                    except StopIteration as stop:
+                        result = stop.value
+                    finally:
+                        stream.close()
+                    plan.complete(ctx, scope, initial_state, start_time)
+                    return result
+                except GeneratorExit:
+                    plan.abandon(ctx, initial_state, start_time)
+                    raise
+                except Exception as e:
+                    replacement = plan.fail(ctx, initial_state, e, kwargs, start_time)
+                    if replacement is not None:
+                        raise replacement from e
+                    raise
+                finally:
+                    if permit is not None:
+                        permit.release()
 
-                    # 4. Execute Logic
-                    result = func(*args, **kwargs)
+            sync_stream_wrapper.__contract_plan__ = plan
+            return sync_stream_wrapper
 
-                    # Log successful completion
-                    duration = time.time() - start_time
-                    logger.info(
-                        f"Contract execution completed: feature={feature}, function={func.__name__}, duration={duration:.3f}s",
-                        extra={
-                            "feature": feature,
-                            "function": func.__name__,
-                            "operation": "contract_complete",
-                            "duration_seconds": duration,
-                            "success": True,
-                            "final_state": ctx.current_state,
-                        }
-                    )
+        if runner is not None or asyncio.iscoroutinefunction(func):
+            async def invoke(args: tuple, kwargs: dict, tenant_context: str) -> Any:
+                permit = None
+                if bulkhead is not None:
+                    permit = await bulkhead.acquire_async(tenant_context)
+                start_time = time.perf_counter()
+                plan.log_start()
 
+                ctx = None
+                initial_state = None
+                try:
+                    if raw_body:
+                        args = await plan.decode_raw_async(args, kwargs)
+                    if offload_validation:
+                        await plan.validate_async(args, kwargs)
+                        ctx, scope = plan.enter(args, kwargs, tenant_context, validate=False)
+                    else:
+                        ctx, scope = plan.enter(args, kwargs, tenant_context)
+                    initial_state = ctx.snapshot()  # Restored on failure
+                    if runner is None:
+                        result = await func(*args, **kwargs)
+                    else:
+                        result = await runner.run(ctx, args, kwargs, tenant_context)
+                    plan.complete(ctx, scope, initial_state, start_time)
                     return result
-
                 except Exception as e:
-                    # Check if this is a state transition error from Rust
-                    error_str = str(e)
-                    if ctx is not None and "Illegal transition" in error_str:
-                        # Parse and re-raise as StateTransitionError
-                        attempted = kwargs.get('_attempted_state', 'unknown')
-                        raise _parse_state_transition_error(
-                            error_str, 
-                            ctx.current_state, 
-                            attempted
-                        ) from e
-                    
-                    # Auto-rollback: Restore initial state if state changed
-                    if ctx is not None and initial_state is not None:
-                        current_state = ctx.current_state
-                        if current_state != initial_state:
-                            try:
-                                # Attempt to rollback to initial state
-                                ctx.transition(initial_state)
-                                logger.error(
-                                    f"Contract execution failed: feature={feature}, function={func.__name__}, "
-                                    f"state rolled back from '{current_state}' to '{initial_state}'",
-                                    extra={
-                                        "feature": feature,
-                                        "function": func.__name__,
-                                        "operation": "contract_rollback",
-                                        "from_state": current_state,
-                                        "to_state": initial_state,
-                                        "error_type": type(e).__name__,
-                                        "error_message": str(e),
-                                        "rollback_success": True,
-                                    }
-                                )
-                            except Exception as rollback_error:
-                                # Rollback failed - log but don't mask original error
-                                logger.error(
-                                    f"Contract execution failed: feature={feature}, function={func.__name__}, "
-                                    f"rollback failed: {rollback_error}",
-                                    extra={
-                                        "feature": feature,
-                                        "function": func.__name__,
-                                        "operation": "contract_rollback_failed",
-                                        "current_state": current_state,
-                                        "target_state": initial_state,
-                                        "error_type": type(e).__name__,
-                                        "error_message": str(e),
-                                        "rollback_error": str(rollback_error),
-                                        "rollback_success": False,
-                                    },
-                                    exc_info=True
-                                )
-
-                    # Log contract execution failure
-                    duration = time.time() - start_time
-                    logger.error(
-                        f"Contract execution failed: feature={feature}, function={func.__name__}, error={type(e).__name__}: {str(e)}",
-                        extra={
-                            "feature": feature,
-                            "function": func.__name__,
-                            "operation": "contract_error",
-                            "duration_seconds": duration,
-                            "error_type": type(e).__name__,
-                            "error_message": str(e),
-                            "success": False,
-                        },
-                        exc_info=True
+                    replacement = plan.fail(ctx, initial_state, e, kwargs, start_time)
+                    if replacement is not None:
+                        raise replacement from e
+                    raise
+                finally:
+                    if permit is not None:
+                        permit.release()
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                tenant_context = plan.resolve_tenant(kwargs)
+                if idempotency is not None:
+                    key = plan.idempotency_key_for(args, kwargs, tenant_context)
+                    if key is not None:
+                        return await idempotency.run_async(key, invoke, args, kwargs, tenant_context)
+                return await invoke(args, kwargs, tenant_context)
+
+            async def batch(
+                items: Sequence[Any],
+                states: Optional[Sequence[str]] = None,
+                target: Optional[str] = None,
+                concurrency: int = 1,
+                **kwargs: Any,
+            ) -> List[BatchItemResult]:
+                """Run once per item (see ranex.batch); up to ``concurrency`` at a time."""
+                tenant_context = plan.resolve_tenant(kwargs)
+                permit = None
+                if bulkhead is not None:
+                    permit = await bulkhead.acquire_async(tenant_context)
+                try:
+                    if runner is not None:
+                        return await asyncio.get_running_loop().run_in_executor(
+                            get_offload_executor("thread"), contextvars.copy_context().run,
+                            run_batch, plan, func, items, states, target, kwargs, tenant_context,
+                        )
+                    return await run_batch_async(
+                        plan, func, items, states, target, kwargs, tenant_context, concurrency
                     )
+                finally:
+                    if permit is not None:
+                        permit.release()
+
+            async_wrapper.__contract_plan__ = plan
+            async_wrapper.batch = batch
+            return async_wrapper
+
+        else:
+            def invoke(args: tuple, kwargs: dict, tenant_context: str) -> Any:
+                permit = None
+                if bulkhead is not None:
+                    permit = bulkhead.acquire(tenant_context)
+                start_time = time.perf_counter()
+                plan.log_start()
+
+                ctx = None
+                initial_state = None
+                try:
+                    if raw_body:
+                        args = plan.decode_raw(args, kwargs)
+                    ctx, scope = plan.enter(args, kwargs, tenant_context)
+                    initial_state = ctx.snapshot()  # Restored on failure
+                    result = func(*args, **kwargs)
+                    plan.complete(ctx, scope, initial_state, start_time)
+                    return result
+                except Exception as e:
+                    replacement = plan.fail(ctx, initial_state, e, kwargs, start_time)
+                    if replacement is not None:
+                        raise replacement from e
                     raise
+                finally:
+                    if permit is not None:
+                        permit.release()
+
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                tenant_context = plan.resolve_tenant(kwargs)
+                if idempotency is not None:
+                    key = plan.idempotency_key_for(args, kwargs, tenant_context)
+                    if key is not None:
+                        return idempotency.run(key, invoke, args, kwargs, tenant_context)
+                return invoke(args, kwargs, tenant_context)
+
+            def batch(
+                items: Sequence[Any],
+                states: Optional[Sequence[str]] = None,
+                target: Optional[str] = None,
+                **kwargs: Any,
+            ) -> List[BatchItemResult]:
+                """Run once per item (see ranex.batch)."""
+                tenant_context = plan.resolve_tenant(kwargs)
+                permit = None
+                if bulkhead is not None:
+                    permit = bulkhead.acquire(tenant_context)
+                try:
+                    return run_batch(plan, func, items, states, target, kwargs, tenant_context)
+                finally:
+                    if permit is not None:
+                        permit.release()
 
+            sync_wrapper.__contract_plan__ = plan
+            sync_wrapper.batch = batch
             return sync_wrapper
 
     return decorator
@@ -545,7 +1149,9 @@ def Contract(
 __all__ = [
     "Contract",
     "StateTransitionError",
+    "StateConflictError",
     "set_tenant_id",
     "get_current_tenant_id",
     "reset_tenant_id",
+    "warmup",
 ]
@@ -0,0 +1,312 @@
+"""
+Ranex Contract Batches.
+
+Runs a Contract-wrapped function over many entities in one call:
+- Tenant resolved, bulkhead slot taken and compiled rules fetched once
+- Requested transitions checked for every item in one bulk pass
+- Per-item failures and rollbacks isolated; the batch itself never raises
+- One aggregated log line, metrics record and event log write per batch
+
+Usage:
+    @Contract(feature="orders", state_store=store, entity_key="order_id")
+    def ship_order(order_id: str, *, _ctx=None):
+        _ctx.transition("Shipped")
+
+    results = ship_order.batch(order_ids, target="Shipped")
+    failed = [r for r in results if not r.ok]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ranex.metrics import get_recorder
+from ranex.registry import FeatureMachine, FeatureRules, StateTransitionError, get_registry
+from ranex.store import StateConflictError
+
+logger = logging.getLogger("ranex.contract")
+
+
+@dataclass(slots=True)
+class BatchItemResult:
+    """
+    Outcome of one item in a Contract batch.
+
+    Truthy when the item succeeded.
+
+    Attributes:
+        item: The item as passed in
+        ok: Whether the function completed (and its state was saved)
+        result: Return value of the function, if it completed
+        error: Exception raised for this item, if any
+        state: State after the call (the starting state if it failed)
+    """
+    item: Any
+    ok: bool
+    result: Any = None
+    error: Optional[BaseException] = None
+    state: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class _Batch:
+    """Per-batch bookkeeping shared by the sync and async runners."""
+
+    __slots__ = (
+        "plan", "items", "kwargs", "tenant_context", "rules", "record",
+        "states", "expected", "allowed", "target", "results", "machines", "start_time",
+    )
+
+    def __init__(
+        self,
+        plan: Any,
+        items: Sequence[Any],
+        states: Optional[Sequence[str]],
+        target: Optional[str],
+        kwargs: Dict[str, Any],
+        tenant_context: str,
+    ):
+        if plan.batch_error is not None:
+            raise ValueError(plan.batch_error)
+        if plan.batch_param is not None and plan.batch_param in kwargs:
+            raise ValueError(f"batch() passes items as '{plan.batch_param}'; do not pass it as a keyword too")
+        self.start_time = time.perf_counter()
+        self.plan = plan
+        self.items = list(items)
+        self.kwargs = kwargs
+        self.tenant_context = tenant_context
+        self.rules: FeatureRules = get_registry().get(plan.feature)
+        self.record = get_recorder() is not None or plan.event_log is not None
+        self.target = target
+        n = len(self.items)
+
+        # expected: what the state store holds now (None if unset), for compare-and-set
+        if states is None:
+            self.expected: List[Optional[str]] = [self._stored_state(item) for item in self.items]
+            self.states: List[str] = [self.rules.initial if s is None else s for s in self.expected]
+        elif len(states) != n:
+            raise ValueError(f"batch() got {n} items but {len(states)} states")
+        else:
+            self.states = list(states)
+            self.expected = list(states)
+
+        # One bulk lookup for every requested transition
+        self.allowed = self.rules.validate_transitions(self.states, [target] * n) if target is not None else None
+        self.results: List[Optional[BatchItemResult]] = [None] * n
+        self.machines: List[Optional[FeatureMachine]] = [None] * n
+
+    def _call_args(self, item: Any) -> Tuple[tuple, dict]:
+        """Arguments for one item: first positional, or by keyword (see _bind_batch_item)."""
+        name = self.plan.batch_param
+        if name is None:
+            return (item,), dict(self.kwargs)
+        kwargs = dict(self.kwargs)
+        kwargs[name] = item
+        return (), kwargs
+
+    def _entity_id(self, item: Any) -> Optional[str]:
+        if self.plan.batch_param is None:
+            return self.plan.entity_id((item,), self.kwargs)
+        return self.plan.entity_id(*self._call_args(item))
+
+    def _stored_state(self, item: Any) -> Optional[str]:
+        plan = self.plan
+        if plan.state_store is None:
+            return None
+        entity = self._entity_id(item)
+        if entity is None:
+            return None
+        return plan.state_store.get(plan.feature, self.tenant_context, entity)
+
+    def begin(self, index: int) -> Optional[Tuple[tuple, dict]]:
+        """Set up item ``index``; returns its call arguments, or None if rejected up front."""
+        item = self.items[index]
+        state = self.states[index]
+        if self.allowed is not None and not self.allowed[index]:
+            error = StateTransitionError(
+                None, state, self.target, self.rules.transitions.get(state, ()), self.rules.feature
+            )
+            self.results[index] = BatchItemResult(item, False, error=error, state=state)
+            return None
+        args, kwargs = self._call_args(item)
+        try:
+            if self.plan.raw_validator is not None:
+                args = self.plan.decode_raw(args, kwargs)
+            if self.plan.schema_name is not None:
+                self.plan.validate(args, kwargs)
+            machine = FeatureMachine(self.rules, record=self.record)
+            if state != self.rules.initial:
+                machine.set_state(state)
+        except Exception as e:
+            self.results[index] = BatchItemResult(item, False, error=e, state=state)
+            return None
+        self.machines[index] = machine
+        kwargs["_ctx"] = machine
+        return args, kwargs
+
+    def succeed(self, index: int, result: Any) -> None:
+        state = self.machines[index].current_state
+        self.results[index] = BatchItemResult(self.items[index], True, result=result, state=state)
+
+    def fail(self, index: int, error: BaseException) -> None:
+        # Isolated rollback: only this item's machine goes back
+        state = self.states[index]
+        machine = self.machines[index]
+        if machine is not None:
+            machine.restore(state)
+        self.results[index] = BatchItemResult(self.items[index], False, error=error, state=state)
+
+    def finish(self) -> List[BatchItemResult]:
+        """Persist changed states, then emit one log line and one metrics record."""
+        plan = self.plan
+        results: List[BatchItemResult] = self.results  # type: ignore[assignment]
+        if plan.state_store is not None:
+            self._persist(results)
+        if plan.event_log is not None:
+            self._log_events(results)
+
+        succeeded = sum(1 for r in results if r.ok)
+        failed = len(results) - succeeded
+        duration = time.perf_counter() - self.start_time
+        recorder = get_recorder()
+        if recorder is not None:
+            transitions = [
+                pair
+                for machine, result in zip(self.machines, results)
+                if machine is not None and result.ok
+                for pair in machine.trail
+            ]
+            recorder.record_batch(plan.feature, plan.func_name, succeeded, failed, duration, transitions)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"Contract batch completed: feature={plan.feature}, function={plan.func_name}, "
+                f"items={len(results)}, succeeded={succeeded}, failed={failed}, duration={duration:.3f}s",
+                extra={
+                    "feature": plan.feature,
+                    "function": plan.func_name,
+                    "operation": "contract_batch",
+                    "tenant_id": self.tenant_context,
+                    "items": len(results),
+                    "succeeded": succeeded,
+                    "failed": failed,
+                    "duration_seconds": duration,
+                },
+            )
+        return results
+
+    def _persist(self, results: List[BatchItemResult]) -> None:
+        plan = self.plan
+        store = plan.state_store
+        changed: List[Tuple[int, str]] = []
+        for index, result in enumerate(results):
+            if result.ok and result.state != self.states[index]:
+                entity = self._entity_id(result.item)
+                if entity is not None:
+                    changed.append((index, entity))
+        if not changed:
+            return
+        if not plan.optimistic:
+            for index, entity in changed:
+                store.set(plan.feature, self.tenant_context, entity, results[index].state)
+            return
+        # One compare-and-set round-trip for the whole batch
+        operations = [
+            (plan.feature, self.tenant_context, entity, self.expected[index], results[index].state)
+            for index, entity in changed
+        ]
+        for (index, entity), written in zip(changed, store.compare_and_set_many(operations)):
+            if not written:
+                result = results[index]
+                result.ok = False
+                result.error = StateConflictError(
+                    plan.feature, self.tenant_context, entity, self.expected[index], result.state
+                )
+                result.state = self.states[index]
+
+    def _log_events(self, results: List[BatchItemResult]) -> None:
+        plan = self.plan
+        entries = []
+        for machine, result in zip(self.machines, results):
+            if result.ok and machine is not None and machine.trail:
+                entity = self._entity_id(result.item)
+                if entity is not None:
+                    entries.append((plan.feature, self.tenant_context, entity, machine.trail))
+        if entries:
+            # One write for the whole batch
+            plan.event_log.append_many(entries)
+
+
+def run_batch(
+    plan: Any,
+    func: Callable[..., Any],
+    items: Sequence[Any],
+    states: Optional[Sequence[str]],
+    target: Optional[str],
+    kwargs: Dict[str, Any],
+    tenant_context: str,
+) -> List[BatchItemResult]:
+    """Run a sync Contract function once per item; see the module docstring."""
+    batch = _Batch(plan, items, states, target, kwargs, tenant_context)
+    for index in range(len(batch.items)):
+        call = batch.begin(index)
+        if call is None:
+            continue
+        try:
+            result = func(*call[0], **call[1])
+        except Exception as e:
+            batch.fail(index, e)
+        else:
+            batch.succeed(index, result)
+    return batch.finish()
+
+
+async def run_batch_async(
+    plan: Any,
+    func: Callable[..., Any],
+    items: Sequence[Any],
+    states: Optional[Sequence[str]],
+    target: Optional[str],
+    kwargs: Dict[str, Any],
+    tenant_context: str,
+    concurrency: int = 1,
+) -> List[BatchItemResult]:
+    """Async form of run_batch(); up to ``concurrency`` items run at once."""
+    batch = _Batch(plan, items, states, target, kwargs, tenant_context)
+
+    async def run_item(index: int) -> None:
+        call = batch.begin(index)
+        if call is None:
+            return
+        try:
+            result = await func(*call[0], **call[1])
+        except Exception as e:
+            batch.fail(index, e)
+        else:
+            batch.succeed(index, result)
+
+    if concurrency <= 1:
+        for index in range(len(batch.items)):
+            await run_item(index)
+    else:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(index: int) -> None:
+            async with semaphore:
+                await run_item(index)
+
+        await asyncio.gather(*(bounded(index) for index in range(len(batch.items))))
+    return batch.finish()
+
+
+# Export all public symbols
+__all__ = [
+    "BatchItemResult",
+    "run_batch",
+    "run_batch_async",
+]
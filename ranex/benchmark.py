@@ -0,0 +1,512 @@
+"""
+Ranex Contract Benchmark.
+
+Measures what @Contract adds on top of the function it wraps, across the
+configurations that change its hot path:
+- sync / async
+- with / without input_schema
+- ranex.contract logger at INFO / WARNING
+- tenant from the tenant_id kwarg / the contextvar
+- success / rollback path
+
+Results can be saved as a JSON baseline (under .ranex/) and later runs
+compared against it to catch overhead regressions.
+
+A separate contention benchmark runs 1 to 64 threads through one shared
+Contract and reports the throughput scaling curve, which is only
+expected to climb on a free-threaded (no-GIL) interpreter.
+
+A middleware benchmark compares the per-request cost of TenantMiddleware
+with the BaseHTTPMiddleware equivalent (needs Starlette).
+
+Usage:
+    from ranex.benchmark import run_contract_bench, compare_to_baseline, load_baseline
+
+    results = run_contract_bench("payment", calls=5000)
+    regressions = compare_to_baseline(results, load_baseline())
+
+    curve = run_contention_bench("payment", threads=(1, 2, 4, 8, 16, 32, 64))
+    middleware = run_middleware_bench(requests=5000)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_BASELINE_PATH = Path(".ranex") / "bench" / "contract.json"
+
+DEFAULT_THREAD_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+
+# Regressions smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_NS = 100.0
+
+
+@dataclass(frozen=True)
+class ContractBenchCase:
+    """One cell of the benchmark matrix."""
+    mode: str  # "sync" or "async"
+    schema: bool
+    log_level: str  # "INFO" or "WARNING"
+    tenant: str  # "kwarg" or "contextvar"
+    path: str  # "success" or "rollback"
+
+    @property
+    def name(self) -> str:
+        return "/".join((
+            self.mode, "schema" if self.schema else "noschema", self.log_level, self.tenant, self.path,
+        ))
+
+
+def contract_bench_matrix(include_schema: bool = True) -> List[ContractBenchCase]:
+    """Build the full matrix of cases (32, or 16 without schema cases)."""
+    schemas = (False, True) if include_schema else (False,)
+    return [
+        ContractBenchCase(mode, schema, level, tenant, path)
+        for mode, schema, level, tenant, path in itertools.product(
+            ("sync", "async"), schemas, ("INFO", "WARNING"), ("kwarg", "contextvar"), ("success", "rollback"),
+        )
+    ]
+
+
+class _BenchFailure(Exception):
+    """Raised by rollback-path functions."""
+
+
+def _build_functions(case: ContractBenchCase, feature: str, target: Optional[str], schema_model: Any) -> Tuple[Callable, Callable]:
+    """Return (wrapped, bare) functions with identical bodies."""
+    from ranex import Contract
+
+    rollback = case.path == "rollback"
+    if case.mode == "async":
+        async def wrapped(payload, *, _ctx=None):
+            if rollback:
+                if target is not None:
+                    _ctx.transition(target)
+                raise _BenchFailure()
+            return payload
+
+        async def bare(payload):
+            if rollback:
+                raise _BenchFailure()
+            return payload
+    else:
+        def wrapped(payload, *, _ctx=None):
+            if rollback:
+                if target is not None:
+                    _ctx.transition(target)
+                raise _BenchFailure()
+            return payload
+
+        def bare(payload):
+            if rollback:
+                raise _BenchFailure()
+            return payload
+
+    contract = Contract(feature=feature, input_schema=schema_model if case.schema else None)
+    return contract(wrapped), bare
+
+
+def _time_sync(fn: Callable, payload: Any, kwargs: Dict[str, Any], calls: int) -> List[int]:
+    clock = time.perf_counter_ns
+    samples = [0] * calls
+    for i in range(calls):
+        started = clock()
+        try:
+            fn(payload, **kwargs)
+        except _BenchFailure:
+            pass
+        samples[i] = clock() - started
+    return samples
+
+
+async def _time_async(fn: Callable, payload: Any, kwargs: Dict[str, Any], calls: int) -> List[int]:
+    clock = time.perf_counter_ns
+    samples = [0] * calls
+    for i in range(calls):
+        started = clock()
+        try:
+            await fn(payload, **kwargs)
+        except _BenchFailure:
+            pass
+        samples[i] = clock() - started
+    return samples
+
+
+def _percentiles(samples: List[int]) -> Tuple[float, float]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    return float(ordered[n // 2]), float(ordered[min(n - 1, int(n * 0.99))])
+
+
+def _measure(fn: Callable, payload: Any, kwargs: Dict[str, Any], calls: int, is_async: bool) -> Tuple[float, float]:
+    warmup = max(calls // 10, 50)
+    if is_async:
+        async def run() -> List[int]:
+            await _time_async(fn, payload, kwargs, warmup)
+            return await _time_async(fn, payload, kwargs, calls)
+
+        samples = asyncio.run(run())
+    else:
+        _time_sync(fn, payload, kwargs, warmup)
+        samples = _time_sync(fn, payload, kwargs, calls)
+    return _percentiles(samples)
+
+
+@contextmanager
+def _isolated_logger() -> Iterator[logging.Logger]:
+    """Point ranex.contract at a NullHandler while measuring, then restore it."""
+    contract_logger = logging.getLogger("ranex.contract")
+    saved = (contract_logger.level, contract_logger.propagate, list(contract_logger.handlers))
+    contract_logger.handlers = [logging.NullHandler()]
+    contract_logger.propagate = False
+    try:
+        yield contract_logger
+    finally:
+        contract_logger.setLevel(saved[0])
+        contract_logger.propagate = saved[1]
+        contract_logger.handlers = saved[2]
+
+
+def run_contract_bench(
+    feature: str,
+    calls: int = 5000,
+    cases: Optional[List[ContractBenchCase]] = None,
+    progress: Optional[Callable[[ContractBenchCase], None]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Run the benchmark matrix against a feature.
+
+    Schema cases are skipped when Pydantic is not installed. The rollback
+    path makes the feature's first allowed transition, then raises.
+
+    Args:
+        feature: Feature whose state.yaml the Contracts load
+        calls: Timed calls per case (plus a short warmup)
+        cases: Subset of the matrix to run (default: all of it)
+        progress: Called before each case runs
+
+    Returns:
+        Per case name: median_ns / p99_ns of the wrapped call, the same for
+        the bare function, and the overhead (wrapped minus bare)
+    """
+    from ranex import reset_tenant_id, set_tenant_id
+
+    try:
+        from pydantic import BaseModel
+
+        class BenchPayload(BaseModel):
+            amount: int
+            email: str
+
+        schema_model: Any = BenchPayload
+    except ImportError:
+        schema_model = None
+
+    target = _first_target(feature)
+    payload = {"amount": 42, "email": "bench@example.com"}
+
+    if cases is None:
+        cases = contract_bench_matrix(include_schema=schema_model is not None)
+    elif schema_model is None:
+        cases = [case for case in cases if not case.schema]
+
+    results: Dict[str, Dict[str, float]] = {}
+    with _isolated_logger() as contract_logger:
+        for case in cases:
+            if progress is not None:
+                progress(case)
+            contract_logger.setLevel(case.log_level)
+            wrapped, bare = _build_functions(case, feature, target, schema_model)
+            is_async = case.mode == "async"
+            kwargs = {"tenant_id": "bench"} if case.tenant == "kwarg" else {}
+            token = set_tenant_id("bench") if case.tenant == "contextvar" else None
+            try:
+                median, p99 = _measure(wrapped, payload, kwargs, calls, is_async)
+                bare_median, bare_p99 = _measure(bare, payload, {}, calls, is_async)
+            finally:
+                if token is not None:
+                    reset_tenant_id(token)
+            results[case.name] = {
+                "median_ns": median,
+                "p99_ns": p99,
+                "bare_median_ns": bare_median,
+                "bare_p99_ns": bare_p99,
+                "overhead_median_ns": max(median - bare_median, 0.0),
+                "overhead_p99_ns": max(p99 - bare_p99, 0.0),
+            }
+    return results
+
+
+def _first_target(feature: str) -> Optional[str]:
+    from ranex.registry import get_registry
+
+    rules = get_registry().get(feature)
+    allowed = rules.transitions.get(rules.initial, ())
+    return allowed[0] if allowed else None
+
+
+def _run_threads(fn: Callable[[], None], threads: int, calls: int) -> float:
+    """Run ``fn`` ``calls`` times on each of ``threads`` threads; returns wall seconds."""
+    barrier = threading.Barrier(threads + 1)
+    errors: List[BaseException] = []
+
+    def worker() -> None:
+        barrier.wait()
+        try:
+            for _ in range(calls):
+                fn()
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, name=f"ranex-bench-{i}") for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return elapsed
+
+
+def run_contention_bench(
+    feature: str,
+    threads: Sequence[int] = DEFAULT_THREAD_COUNTS,
+    calls_per_thread: int = 2000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Hammer one shared Contract from a growing number of threads.
+
+    Every thread calls the same sync Contract-wrapped function, which makes
+    the feature's first allowed transition (so each call builds a machine
+    from the shared compiled rules). Logging is kept at WARNING so handler
+    locks do not dominate the measurement.
+
+    Args:
+        feature: Feature whose state.yaml the Contract loads
+        threads: Thread counts to measure, in order
+        calls_per_thread: Calls each thread makes per measurement
+        progress: Called with the thread count before each measurement
+
+    Returns:
+        ``gil_enabled`` (whether the GIL was on while measuring) and
+        ``curve``: per thread count, calls_per_second, speedup over the
+        first measurement's per-thread rate and efficiency (speedup / threads)
+    """
+    from ranex import Contract
+
+    target = _first_target(feature)
+
+    @Contract(feature=feature, tenant_id="bench")
+    def hammered(*, _ctx=None):
+        if target is not None:
+            _ctx.transition(target)
+
+    curve: List[Dict[str, float]] = []
+    with _isolated_logger() as contract_logger:
+        contract_logger.setLevel(logging.WARNING)
+        _run_threads(hammered, 1, max(calls_per_thread // 10, 50))
+        base_rate: Optional[float] = None
+        for count in threads:
+            if progress is not None:
+                progress(count)
+            elapsed = _run_threads(hammered, count, calls_per_thread)
+            rate = count * calls_per_thread / elapsed
+            if base_rate is None:
+                # Per-thread rate of the first measurement (normally 1 thread)
+                base_rate = rate / count
+            speedup = rate / base_rate
+            curve.append({
+                "threads": count,
+                "calls": count * calls_per_thread,
+                "seconds": elapsed,
+                "calls_per_second": rate,
+                "speedup": speedup,
+                "efficiency": speedup / count,
+            })
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return {
+        "gil_enabled": True if is_gil_enabled is None else is_gil_enabled(),
+        "python": sys.version.split()[0],
+        "calls_per_thread": calls_per_thread,
+        "curve": curve,
+    }
+
+
+def run_middleware_bench(requests: int = 1000) -> Dict[str, Any]:
+    """
+    Time requests through no middleware, TenantMiddleware and BaseHTTPMiddleware.
+
+    Requests are driven straight through the ASGI apps (no server, no
+    network) with an ``x-tenant-id`` header, so the difference between
+    the rows is the middleware's own cost.
+
+    Args:
+        requests: Requests per variant
+
+    Returns:
+        ``requests`` and ``results``: per variant ("none",
+        "tenant_middleware", "base_http_middleware"), seconds_per_request,
+        requests_per_second and overhead_seconds over "none"
+
+    Raises:
+        ImportError: If Starlette is not installed
+    """
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from starlette.responses import PlainTextResponse
+
+    from ranex import reset_tenant_id, set_tenant_id
+    from ranex.middleware import TenantMiddleware
+
+    runs = max(requests, 1)
+    endpoint = PlainTextResponse("ok")  # A Response is itself an ASGI app
+
+    async def dispatch(request: Any, call_next: Callable[..., Any]) -> Any:
+        # The BaseHTTPMiddleware version users would otherwise write
+        token = set_tenant_id(request.headers.get("x-tenant-id", "default"))
+        try:
+            return await call_next(request)
+        finally:
+            reset_tenant_id(token)
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        pass
+
+    async def drive(asgi_app: Any) -> float:
+        started = time.perf_counter()
+        for _ in range(runs):
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/",
+                "root_path": "", "query_string": b"", "server": ("bench", 80),
+                "headers": [(b"host", b"bench"), (b"x-tenant-id", b"acme")],
+            }
+            await asgi_app(scope, receive, send)
+        return (time.perf_counter() - started) / runs
+
+    async def run_all() -> Dict[str, float]:
+        return {
+            "none": await drive(endpoint),
+            "tenant_middleware": await drive(TenantMiddleware(endpoint)),
+            "base_http_middleware": await drive(BaseHTTPMiddleware(endpoint, dispatch=dispatch)),
+        }
+
+    timings = asyncio.run(run_all())
+    bare = timings["none"]
+    return {
+        "requests": runs,
+        "results": {
+            name: {
+                "seconds_per_request": seconds,
+                "requests_per_second": 1 / seconds if seconds > 0 else float("inf"),
+                "overhead_seconds": max(seconds - bare, 0.0),
+            }
+            for name, seconds in timings.items()
+        },
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, Any]],
+    median_threshold: float = 0.25,
+    p99_threshold: float = 0.50,
+    strict: bool = False,
+) -> List[str]:
+    """
+    List the cases whose overhead regressed against a baseline.
+
+    A case regresses when its median (or p99) overhead exceeds the baseline
+    by more than the relative threshold and by at least MIN_REGRESSION_NS.
+    Cases missing from either side are ignored unless ``strict`` is set.
+
+    Args:
+        strict: For CI gates: a missing baseline raises, and a case absent
+            from the baseline counts as a regression, so nothing passes unchecked
+
+    Returns:
+        Human-readable descriptions of each regression (empty if none)
+
+    Raises:
+        ValueError: If ``strict`` and there is no baseline
+    """
+    if not baseline:
+        if strict:
+            raise ValueError("No baseline to compare against")
+        return []
+    previous = baseline.get("results", {})
+    regressions = []
+    for name, current in results.items():
+        before = previous.get(name)
+        if before is None:
+            if strict:
+                regressions.append(f"{name}: not in baseline")
+            continue
+        for metric, threshold in (("overhead_median_ns", median_threshold), ("overhead_p99_ns", p99_threshold)):
+            old, new = before.get(metric, 0.0), current[metric]
+            if new > old * (1 + threshold) and new - old >= MIN_REGRESSION_NS:
+                regressions.append(
+                    f"{name}: {metric.replace('_ns', '')} {old:,.0f}ns -> {new:,.0f}ns "
+                    f"(+{(new - old) / old * 100 if old else float('inf'):.0f}%, limit {threshold * 100:.0f}%)"
+                )
+    return regressions
+
+
+def load_baseline(path: Union[str, Path] = DEFAULT_BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    """Load a saved baseline, or None if there is none."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(
+    results: Dict[str, Dict[str, float]],
+    path: Union[str, Path] = DEFAULT_BASELINE_PATH,
+    calls: Optional[int] = None,
+) -> Path:
+    """Write results as the new baseline, with the environment they came from."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "calls": calls,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+# Export all public symbols
+__all__ = [
+    "ContractBenchCase",
+    "DEFAULT_BASELINE_PATH",
+    "DEFAULT_THREAD_COUNTS",
+    "contract_bench_matrix",
+    "run_contract_bench",
+    "run_contention_bench",
+    "run_middleware_bench",
+    "compare_to_baseline",
+    "load_baseline",
+    "save_baseline",
+]
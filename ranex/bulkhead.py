@@ -0,0 +1,296 @@
+"""
+Ranex Bulkheads.
+
+Concurrency limits for Contract-wrapped functions so one feature, or one
+noisy tenant, cannot take every worker slot on a node:
+- Per-feature limit shared by every function given the same Bulkhead
+- Per-tenant limit (tenant resolved the same way Contract resolves it)
+- Bounded wait queue with fast rejection once it is full
+
+Sync and async callers share the same slots, so a Bulkhead used from both
+paths never runs more than max_concurrent calls in total. Async callers
+wait on futures from their own event loop, so one Bulkhead can serve
+several loops (threads, or successive asyncio.run calls).
+
+Usage:
+    from ranex import Contract
+    from ranex.bulkhead import Bulkhead, BulkheadFullError
+
+    payments = Bulkhead("payment", max_concurrent=32, max_concurrent_per_tenant=4, max_queue=16)
+
+    @Contract(feature="payment", bulkhead=payments)
+    async def charge(order_id: str, *, _ctx=None):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from ranex.metrics import get_recorder
+
+
+class BulkheadFullError(RuntimeError):
+    """
+    Raised when a bulkhead is at its limit and its wait queue is full
+    (or the wait timed out).
+
+    Attributes:
+        bulkhead: Name of the bulkhead
+        tenant_id: Tenant of the rejected call
+        scope: "feature" or "tenant", whichever limit rejected the call
+    """
+
+    def __init__(self, bulkhead: str, tenant_id: str, scope: str):
+        super().__init__(f"Bulkhead '{bulkhead}' is full ({scope} limit) for tenant '{tenant_id}'")
+        self.bulkhead = bulkhead
+        self.tenant_id = tenant_id
+        self.scope = scope
+
+
+def _wake_future(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Waiter:
+    """A queued caller; granted is set when a released slot is handed to it."""
+
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake: Callable[[], object]):
+        self.granted = False
+        self.wake = wake
+
+
+class _Compartment:
+    """
+    One concurrency limit with a bounded FIFO queue, shared by threads and
+    coroutines on any event loop.
+
+    A released slot is handed straight to the oldest waiter, so active never
+    drops below the limit while anyone is queued. Coroutines wait on a future
+    created in their own running loop, so no asyncio object outlives a loop.
+    """
+
+    __slots__ = ("limit", "max_queue", "active", "users", "_lock", "_waiters")
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.users = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+
+    def acquire(self, timeout: Optional[float]) -> Optional[float]:
+        """Take a slot from a thread. Returns seconds waited, or None if rejected."""
+        with self._lock:
+            if self.active < self.limit:
+                self.active += 1
+                return 0.0
+            if len(self._waiters) >= self.max_queue:
+                return None
+            event = threading.Event()
+            waiter = _Waiter(event.set)
+            self._waiters.append(waiter)
+        started = time.perf_counter()
+        if not event.wait(timeout):
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    return None
+            # Granted between the timeout and taking the lock: keep the slot
+        return time.perf_counter() - started
+
+    async def acquire_async(self, timeout: Optional[float]) -> Optional[float]:
+        """Take a slot from a coroutine. Returns seconds waited, or None if rejected."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit:
+                self.active += 1
+                return 0.0
+            if len(self._waiters) >= self.max_queue:
+                return None
+            future = loop.create_future()
+            waiter = _Waiter(lambda: loop.call_soon_threadsafe(_wake_future, future))
+            self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            if timeout is None:
+                await future
+            else:
+                await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    if isinstance(exc, asyncio.CancelledError):
+                        raise
+                    return None
+            if isinstance(exc, asyncio.CancelledError):
+                # Granted as we were cancelled: pass the slot on
+                self.release()
+                raise
+        return time.perf_counter() - started
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                try:
+                    waiter.wake()
+                    return
+                except RuntimeError:
+                    # Waiter's event loop is closed; try the next one
+                    continue
+            self.active -= 1
+
+
+class BulkheadPermit:
+    """Slots held by one call; release exactly once."""
+
+    __slots__ = ("_bulkhead", "_tenant_id", "_held")
+
+    def __init__(self, bulkhead: "Bulkhead", tenant_id: str, held: List[_Compartment]):
+        self._bulkhead = bulkhead
+        self._tenant_id = tenant_id
+        self._held = held
+
+    def release(self) -> None:
+        held, self._held = self._held, []
+        self._bulkhead._release(self._tenant_id, held)
+
+
+class Bulkhead:
+    """
+    Concurrency limits shared by every Contract that uses this object.
+
+    A call first takes a per-tenant slot (if configured), then a feature
+    slot (if configured), so a tenant queued on its own limit holds no
+    feature-wide capacity.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: Optional[int] = None,
+        max_concurrent_per_tenant: Optional[int] = None,
+        max_queue: int = 0,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the bulkhead.
+
+        Args:
+            name: Label for errors and metrics (usually the feature name)
+            max_concurrent: Maximum concurrent calls overall, or None for no limit
+            max_concurrent_per_tenant: Maximum concurrent calls per tenant, or None
+            max_queue: Calls allowed to wait for a slot (per limit); beyond that
+                calls are rejected immediately with BulkheadFullError
+            timeout: Maximum seconds to wait for a slot, or None to wait indefinitely
+        """
+        if max_concurrent is None and max_concurrent_per_tenant is None:
+            raise ValueError("Bulkhead needs max_concurrent, max_concurrent_per_tenant, or both")
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_tenant = max_concurrent_per_tenant
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._feature = _Compartment(max_concurrent, max_queue) if max_concurrent else None
+        self._tenants: Dict[str, _Compartment] = {}
+
+    def _tenant_compartment(self, tenant_id: str) -> Optional[_Compartment]:
+        if self.max_concurrent_per_tenant is None:
+            return None
+        with self._lock:
+            compartment = self._tenants.get(tenant_id)
+            if compartment is None:
+                compartment = self._tenants[tenant_id] = _Compartment(self.max_concurrent_per_tenant, self.max_queue)
+            compartment.users += 1
+            return compartment
+
+    def _release(self, tenant_id: str, held: List[_Compartment]) -> None:
+        for compartment in reversed(held):
+            compartment.release()
+        if self.max_concurrent_per_tenant is None:
+            return
+        with self._lock:
+            compartment = self._tenants.get(tenant_id)
+            if compartment is not None:
+                compartment.users -= 1
+                if compartment.users == 0:
+                    # Idle tenants are dropped so the map stays bounded
+                    del self._tenants[tenant_id]
+
+    def _record(self, scope: str, waited: Optional[float]) -> None:
+        recorder = get_recorder()
+        if recorder is None:
+            return
+        if waited is None:
+            recorder.inc("bulkhead_rejections_total", (self.name, scope))
+        else:
+            recorder.observe("bulkhead_wait_seconds", (self.name, scope), waited)
+
+    def _reject(self, tenant_id: str, scope: str, held: List[_Compartment]) -> BulkheadFullError:
+        self._release(tenant_id, held)
+        self._record(scope, None)
+        return BulkheadFullError(self.name, tenant_id, scope)
+
+    def acquire(self, tenant_id: str) -> BulkheadPermit:
+        """
+        Take the slots for a sync call, waiting in the queue if needed.
+
+        Raises:
+            BulkheadFullError: If a limit is reached and its queue is full
+        """
+        held: List[_Compartment] = []
+        tenant = self._tenant_compartment(tenant_id)
+        for scope, compartment in (("tenant", tenant), ("feature", self._feature)):
+            if compartment is None:
+                continue
+            waited = compartment.acquire(self.timeout)
+            if waited is None:
+                raise self._reject(tenant_id, scope, held)
+            held.append(compartment)
+            self._record(scope, waited)
+        return BulkheadPermit(self, tenant_id, held)
+
+    async def acquire_async(self, tenant_id: str) -> BulkheadPermit:
+        """
+        Take the slots for an async call, waiting in the queue if needed.
+
+        Raises:
+            BulkheadFullError: If a limit is reached and its queue is full
+        """
+        held: List[_Compartment] = []
+        tenant = self._tenant_compartment(tenant_id)
+        for scope, compartment in (("tenant", tenant), ("feature", self._feature)):
+            if compartment is None:
+                continue
+            try:
+                waited = await compartment.acquire_async(self.timeout)
+            except BaseException:
+                # Cancelled while queued: give back what we already hold
+                self._release(tenant_id, held)
+                raise
+            if waited is None:
+                raise self._reject(tenant_id, scope, held)
+            held.append(compartment)
+            self._record(scope, waited)
+        return BulkheadPermit(self, tenant_id, held)
+
+
+# Export all public symbols
+__all__ = [
+    "Bulkhead",
+    "BulkheadFullError",
+    "BulkheadPermit",
+]
@@ -1930,11 +1930,15 @@ def graph(
             console.print("[dim]Create features in app/features/ or specify --feature to graph a specific feature[/dim]")
         return  # Exit successfully - this is informational, not an error
 
+    from ranex.registry import FeatureRules
+
     mermaid_code = "graph TD\n"
+    unreachable_nodes: List[str] = []
 
     for feat in target_features:
         try:
             sm = StateMachine(feat)
+            rules = FeatureRules.from_machine(feat, sm)
             mermaid_code += f"    subgraph {feat.upper()}\n"
             mermaid_code += f"    {feat}_Start((Start)) --> {feat}_{sm.rules.initial}\n"
             for start_state, targets in sm.rules.transitions.items():
@@ -1942,9 +1946,17 @@ def graph(
                     mermaid_code += f"    {feat}_{start_state} --> {feat}_{target}\n"
             mermaid_code += "    end\n"
             console.print(f"[green]✅ Loaded Logic for '{feat}'[/green]")
+            unreachable = [s for s in rules.states if not rules.can_reach(rules.initial, s)]
+            if unreachable:
+                unreachable_nodes.extend(f"{feat}_{s}" for s in unreachable)
+                console.print(f"[yellow]   ⚠️  Unreachable from '{rules.initial}': {', '.join(unreachable)}[/yellow]")
         except Exception as exc:
             console.print(f"[yellow]⚠️  Could not load '{feat}': {exc}[/yellow]")
 
+    if unreachable_nodes:
+        mermaid_code += "    classDef unreachable stroke-dasharray: 5 5,color:#999\n"
+        mermaid_code += f"    class {','.join(unreachable_nodes)} unreachable\n"
+
     output_file = "architecture.mermaid"
     with open(output_file, "w", encoding="utf-8") as handle:
         handle.write(mermaid_code)
@@ -2129,21 +2141,235 @@ def arch(
         )
 
 
+def _load_bench_feature(feature: str) -> None:
+    """Compile a feature's rules up front, failing with a CLI error if that is impossible."""
+    try:
+        from ranex.registry import get_registry
+
+        get_registry().get(feature)
+    except Exception as exc:
+        raise RanexError(
+            code=ErrorCode.CONFIG_NOT_FOUND,
+            message=f"Could not load feature '{feature}'",
+            details={"error": str(exc)},
+            hint=f"Ensure app/features/{feature}/state.yaml exists or pass --feature"
+        )
+
+
+def _bench_contract(
+    feature: str,
+    calls: int,
+    baseline_path: Path,
+    save: bool,
+    threshold: float,
+    p99_threshold: float,
+    json_output: bool,
+    check: bool = False,
+) -> None:
+    """Run the Contract overhead matrix and gate on the saved baseline."""
+    from ranex.benchmark import compare_to_baseline, load_baseline, run_contract_bench, save_baseline
+
+    _load_bench_feature(feature)
+    previous = load_baseline(baseline_path)
+    if check and not save and previous is None:
+        # Fail before spending time on the run: an ungated CI job is worse than a red one
+        raise RanexError(
+            code=ErrorCode.FILE_NOT_FOUND,
+            message=f"No Contract benchmark baseline at {baseline_path}",
+            details={"baseline": str(baseline_path)},
+            hint="Record one with --save-baseline and commit it, or point --baseline at it"
+        )
+
+    if not json_output:
+        console.print(f"[bold]📊 Contract Overhead Benchmark[/bold] (feature '{feature}', {calls:,} calls per case)\n")
+    results = run_contract_bench(
+        feature,
+        calls=calls,
+        progress=None if json_output else (lambda case: console.print(f"[dim]  {case.name}[/dim]")),
+    )
+    regressions = [] if save else compare_to_baseline(results, previous, threshold, p99_threshold, strict=check)
+
+    if json_output:
+        console.print(json.dumps({"results": results, "regressions": regressions}, indent=2))
+    else:
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Case")
+        table.add_column("Overhead p50", justify="right")
+        table.add_column("Overhead p99", justify="right")
+        table.add_column("Baseline p50", justify="right")
+        for name, row in results.items():
+            before = (previous or {}).get("results", {}).get(name)
+            table.add_row(
+                name,
+                f"{row['overhead_median_ns'] / 1000:,.2f}µs",
+                f"{row['overhead_p99_ns'] / 1000:,.2f}µs",
+                f"{before['overhead_median_ns'] / 1000:,.2f}µs" if before else "-",
+            )
+        console.print(table)
+
+    if save:
+        path = save_baseline(results, baseline_path, calls=calls)
+        if not json_output:
+            console.print(f"[green]✅ Baseline saved to {path}[/green]")
+        return
+    if previous is None and not json_output:
+        console.print(f"[yellow]⚠️ No baseline at {baseline_path}; run with --save-baseline to create one.[/yellow]")
+    if regressions:
+        if not json_output:
+            console.print("[bold red]❌ CONTRACT OVERHEAD REGRESSION[/bold red]")
+            for regression in regressions:
+                console.print(f"  • {regression}")
+        raise RanexError(
+            code=ErrorCode.VALIDATION_FAILED,
+            message=f"Contract overhead regressed in {len(regressions)} case(s)",
+            details={"regressions": regressions[:5]},
+            hint="Investigate the slowdown, or re-record with --save-baseline if it is intended"
+        )
+
+
+def _bench_threads(feature: str, calls: int, max_threads: int, json_output: bool) -> None:
+    """Run the Contract contention benchmark and print its scaling curve."""
+    from ranex.benchmark import run_contention_bench
+
+    _load_bench_feature(feature)
+    counts = []
+    count = 1
+    while count <= max(1, max_threads):
+        counts.append(count)
+        count *= 2
+    calls_per_thread = max(calls // 10, 100)
+
+    if not json_output:
+        console.print(
+            f"[bold]🧵 Contract Contention Benchmark[/bold] "
+            f"(feature '{feature}', {calls_per_thread:,} calls per thread)\n"
+        )
+    report = run_contention_bench(
+        feature,
+        threads=counts,
+        calls_per_thread=calls_per_thread,
+        progress=None if json_output else (lambda n: console.print(f"[dim]  {n} thread(s)[/dim]")),
+    )
+    if json_output:
+        console.print(json.dumps(report, indent=2))
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Threads", justify="right")
+    table.add_column("Calls/s", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Efficiency", justify="right")
+    table.add_column("Curve")
+    peak = max(row["calls_per_second"] for row in report["curve"])
+    for row in report["curve"]:
+        table.add_row(
+            str(row["threads"]),
+            f"{row['calls_per_second']:,.0f}",
+            f"{row['speedup']:.2f}x",
+            f"{row['efficiency'] * 100:.0f}%",
+            "█" * max(1, round(row["calls_per_second"] / peak * 30)),
+        )
+    console.print(table)
+    if report["gil_enabled"]:
+        console.print(
+            "[yellow]⚠️ The GIL is enabled, so throughput cannot scale past one core. "
+            "Run on a free-threaded build (python3.13t or later) with PYTHON_GIL=0 to measure scaling.[/yellow]"
+        )
+
+
+def _bench_middleware(requests: int, json_output: bool) -> None:
+    """Compare TenantMiddleware with the BaseHTTPMiddleware equivalent."""
+    from ranex.benchmark import run_middleware_bench
+
+    if not json_output:
+        console.print(f"[bold]🚪 Tenant Middleware Benchmark[/bold] ({requests:,} requests per variant)\n")
+    try:
+        report = run_middleware_bench(requests=requests)
+    except ImportError as exc:
+        raise RanexError(
+            code=ErrorCode.INVALID_ARGUMENT,
+            message="The middleware benchmark needs Starlette",
+            details={"error": str(exc)},
+            hint="pip install starlette (installed with fastapi)"
+        )
+    if json_output:
+        console.print(json.dumps(report, indent=2))
+        return
+
+    labels = {
+        "none": "No middleware",
+        "tenant_middleware": "TenantMiddleware (ASGI)",
+        "base_http_middleware": "BaseHTTPMiddleware",
+    }
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Variant")
+    table.add_column("Per request", justify="right")
+    table.add_column("Requests/s", justify="right")
+    table.add_column("Overhead", justify="right")
+    for name, row in report["results"].items():
+        table.add_row(
+            labels.get(name, name),
+            f"{row['seconds_per_request'] * 1e6:,.2f}µs",
+            f"{row['requests_per_second']:,.0f}",
+            f"{row['overhead_seconds'] * 1e6:,.2f}µs",
+        )
+    console.print(table)
+
+
 @app.command()
 @handle_errors
 @log_command
 def bench(
+    suite: str = typer.Argument("atlas", help="What to benchmark: atlas, contract, threads or middleware"),
     mode: str = typer.Option("both", "--mode", "-m", help="Which Atlas to benchmark: old, new, or both"),
     iterations: int = typer.Option(5, "--iterations", "-n", help="Number of benchmark iterations"),
     json_output: bool = typer.Option(False, "--json", help="Output results as JSON"),
+    feature: str = typer.Option("payment", "--feature", "-f", help="[contract] Feature the Contracts load"),
+    calls: int = typer.Option(5000, "--calls", help="[contract/threads/middleware] Timed calls per case"),
+    baseline: Path = typer.Option(
+        Path(".ranex/bench/contract.json"), "--baseline", help="[contract] Baseline JSON file"
+    ),
+    save_baseline: bool = typer.Option(False, "--save-baseline", help="[contract] Write results as the new baseline"),
+    threshold: float = typer.Option(0.25, "--threshold", help="[contract] Allowed median overhead regression (0.25 = 25%)"),
+    p99_threshold: float = typer.Option(0.5, "--p99-threshold", help="[contract] Allowed p99 overhead regression"),
+    check: bool = typer.Option(
+        False, "--check", help="[contract] CI mode: fail if the baseline, or any case in it, is missing"
+    ),
+    max_threads: int = typer.Option(64, "--max-threads", help="[threads] Largest thread count (doubling from 1)"),
 ) -> None:
-    """Benchmark Atlas performance (old regex vs new graph-based).
-
-    Compares indexing and search performance between implementations.
+    """Benchmark Atlas performance (old regex vs new graph-based), or Contract overhead.
+
+    `ranex bench` compares indexing and search performance between Atlas
+    implementations. `ranex bench contract` measures @Contract overhead
+    against a bare function across sync/async, schema, log level, tenant
+    source and success/rollback, and fails if it regressed past the baseline
+    (with --check, also if there is no baseline to compare against).
+    `ranex bench threads` runs 1 to --max-threads threads through one shared
+    Contract and prints the throughput scaling curve.
+    `ranex bench middleware` compares TenantMiddleware with the
+    BaseHTTPMiddleware equivalent, --calls requests each.
     Reference: https://docs.python.org/3/library/timeit.html
     """
     import statistics
 
+    valid_suites = ["atlas", "contract", "threads", "middleware"]
+    if suite not in valid_suites:
+        raise RanexError(
+            code=ErrorCode.INVALID_ARGUMENT,
+            message=f"Unknown benchmark suite: {suite}",
+            details={"valid_suites": valid_suites},
+            hint=f"Use one of: {', '.join(valid_suites)}"
+        )
+    if suite == "contract":
+        _bench_contract(feature, calls, baseline, save_baseline, threshold, p99_threshold, json_output, check)
+        return
+    if suite == "threads":
+        _bench_threads(feature, calls, max_threads, json_output)
+        return
+    if suite == "middleware":
+        _bench_middleware(calls, json_output)
+        return
+
     valid_modes = ["old", "new", "both"]
     if mode not in valid_modes:
         raise RanexError(
@@ -2374,11 +2600,17 @@ def stress(
             hint=f"Ensure app/features/{feature}/state.yaml exists"
         )
 
-    console.print("[1] THE LOGIC MAZE: Testing ALL state permutations...")
+    # Every number also goes into report, printed instead of the tables with --json
+    report: Dict[str, Any] = {"feature": feature}
+    say = (lambda *_args, **_kwargs: None) if json_output else console.print
+
+    say("[1] THE LOGIC MAZE: Testing ALL state permutations...")
     states = sm.rules.states or list(sm.rules.transitions.keys())
 
     if not states:
-        console.print("[yellow]⚠️ No states defined for this feature.[/yellow]")
+        say("[yellow]⚠️ No states defined for this feature.[/yellow]")
+        if json_output:
+            console.print(json.dumps(report, indent=2))
         return
 
     table = Table(show_header=True, header_style="bold magenta")
@@ -2386,24 +2618,48 @@ def stress(
     for state in states:
         table.add_column(state)
 
-    valid_count = 0
-    blocked_count = 0
-    for start_state in states:
+    # One bulk pass over every (from, to) pair instead of one raising FFI call each
+    from ranex.registry import FeatureRules
+
+    rules = FeatureRules.from_machine(feature, sm)
+    from_states = [s for s in states for _ in states]
+    to_states = [t for _ in states for t in states]
+    mask = rules.validate_transitions(from_states, to_states)
+
+    valid_count = sum(mask)
+    blocked_count = len(mask) - valid_count
+    for i, start_state in enumerate(states):
         row = [start_state]
-        for target_state in states:
-            try:
-                sm.validate_transition(start_state, target_state)
-                row.append("[green]✅[/green]")
-                valid_count += 1
-            except Exception:
-                row.append("[dim]🛡️[/dim]")
-                blocked_count += 1
+        for allowed in mask[i * len(states):(i + 1) * len(states)]:
+            row.append("[green]✅[/green]" if allowed else "[dim]🛡️[/dim]")
         table.add_row(*row)
 
-    console.print(table)
-    console.print(f"📊 Logic Report: {valid_count} Valid Paths, {blocked_count} Blocked Paths.\n")
+    say(table)
+    say(f"📊 Logic Report: {valid_count} Valid Paths, {blocked_count} Blocked Paths.")
 
-    console.print("[2] THE SPEED RUN: Hammering Rust Core (1,000,000 ops)...")
+    # Multi-step view from the precomputed reachability index
+    reachable = set(rules.reachable_from(rules.initial)) | {rules.initial}
+    unreachable = [s for s in states if s not in reachable]
+    deepest = max(
+        (rules.shortest_path(rules.initial, s) or [] for s in states),
+        key=len,
+        default=[],
+    )
+    report["logic"] = {
+        "states": len(states),
+        "valid_paths": valid_count,
+        "blocked_paths": blocked_count,
+        "unreachable_states": unreachable,
+        "longest_shortest_path": deepest,
+    }
+    say(f"🧭 Reachability: {len(states) - len(unreachable)}/{len(states)} states reachable from '{rules.initial}'.")
+    if unreachable:
+        say(f"[yellow]⚠️ Unreachable states: {', '.join(unreachable)}[/yellow]")
+    if len(deepest) > 1:
+        say(f"   Longest shortest path ({len(deepest) - 1} steps): {' → '.join(deepest)}")
+    say()
+
+    say("[2] THE SPEED RUN: Hammering Rust Core (1,000,000 ops)...")
     valid_transition = None
     for start_state, targets in sm.rules.transitions.items():
         if targets:
@@ -2411,7 +2667,9 @@ def stress(
             break
 
     if not valid_transition:
-        console.print("[yellow]⚠️ No valid transitions to run the speed test.[/yellow]")
+        say("[yellow]⚠️ No valid transitions to run the speed test.[/yellow]")
+        if json_output:
+            console.print(json.dumps(report, indent=2))
         return
 
     start, end = valid_transition
@@ -2420,9 +2678,82 @@ def stress(
         sm.validate_transition(start, end)
     duration = time.time() - start_time
     ops = 1_000_000 / duration if duration > 0 else float("inf")
+    report["speed_run"] = {"checks": 1_000_000, "seconds": duration, "checks_per_second": ops}
+
+    say(f"⚡ Completed in {duration:.4f}s")
+    say(f"[bold green]🚀 THROUGHPUT: {ops:,.0f} checks/sec[/bold green]")
+
+    say(f"\n[3] THE COLD START: Per-call machine construction ({iterations:,} calls)...")
+    from ranex.registry import FeatureRegistry
+
+    runs = max(iterations, 1)
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        StateMachine(feature)
+    parse_per_call = (time.perf_counter() - start_time) / runs
+
+    registry = FeatureRegistry()
+    registry.get(feature)  # Compile once, as the first Contract call would
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        registry.new_machine(feature)
+    cached_per_call = (time.perf_counter() - start_time) / runs
+
+    speedup = parse_per_call / cached_per_call if cached_per_call > 0 else float("inf")
+    report["cold_start"] = {
+        "calls": runs,
+        "parse_per_call_seconds": parse_per_call,
+        "compiled_per_call_seconds": cached_per_call,
+        "speedup": speedup,
+    }
+    say(f"   Parse state.yaml per call:  {parse_per_call * 1e6:,.2f}µs")
+    say(f"   Compiled template per call: {cached_per_call * 1e6:,.2f}µs")
+    say(f"[bold green]🚀 CONSTRUCTION SPEEDUP: {speedup:,.1f}x[/bold green]")
+
+    # Rejection-heavy traffic: every attempt targets a state that is not allowed
+    blocked_index = next((i for i, allowed in enumerate(mask) if not allowed), None)
+    if blocked_index is not None:
+        say(f"\n[4] THE REJECTION STORM: Illegal transitions ({iterations:,} attempts)...")
+        blocked_from, blocked_to = from_states[blocked_index], to_states[blocked_index]
+
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            sm.current_state = blocked_from
+            try:
+                sm.transition(blocked_to)
+            except Exception as exc:
+                str(exc)  # Contract used to match and parse the Rust error text
+        rust_per_call = (time.perf_counter() - start_time) / runs
+
+        machine = registry.new_machine(feature)
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            machine.current_state = blocked_from
+            try:
+                machine.transition(blocked_to)
+            except ValueError:
+                pass
+        raise_per_call = (time.perf_counter() - start_time) / runs
+
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            machine.current_state = blocked_from
+            machine.try_transition(blocked_to)
+        try_per_call = (time.perf_counter() - start_time) / runs
+
+        report["rejection_storm"] = {
+            "attempts": runs,
+            "transition": [blocked_from, blocked_to],
+            "rust_raise_seconds": rust_per_call,
+            "state_transition_error_seconds": raise_per_call,
+            "try_transition_seconds": try_per_call,
+        }
+        say(f"   Rust raise + message:        {rust_per_call * 1e6:,.2f}µs")
+        say(f"   StateTransitionError raise:  {raise_per_call * 1e6:,.2f}µs")
+        say(f"   try_transition():            {try_per_call * 1e6:,.2f}µs")
 
-    console.print(f"⚡ Completed in {duration:.4f}s")
-    console.print(f"[bold green]🚀 THROUGHPUT: {ops:,.0f} checks/sec[/bold green]")
+    if json_output:
+        console.print(json.dumps(report, indent=2))
 
 
 # ============================================================================
@@ -0,0 +1,698 @@
+"""
+Ranex Transition Event Log.
+
+Append-only log of the transitions Contract applies, with compact
+snapshots of the latest state per (feature, tenant, entity), so state can
+be rebuilt after a cache flush or failover without replaying all history:
+- Binary segment files; strings are dictionary-encoded once per segment
+  and each event is one fixed-size struct record
+- Snapshots hold a string table plus four uint32 arrays
+- Replay loads the newest readable snapshot and applies only the events
+  after it, decoding segments and applying tenants in parallel
+- One writer process per directory; a log inherited across fork() refuses
+  to write in the child, so pre-fork servers open one per worker
+
+Usage:
+    from ranex import Contract
+    from ranex.eventlog import EventLog, replay
+
+    events = EventLog(".ranex/events", snapshot_every=1_000_000)
+
+    @Contract(feature="orders", entity_key="order_id", event_log=events)
+    def ship_order(order_id: str, *, _ctx=None):
+        _ctx.transition("Shipped")
+
+    # After a cache flush:
+    replay(".ranex/events").apply_to(store)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+import weakref
+from array import array
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ranex.store import StateStore
+
+logger = logging.getLogger("ranex.contract")
+
+SEGMENT_MAGIC = b"RNXEVT1\n"
+SNAPSHOT_MAGIC = b"RNXSNP1\n"
+
+_TAG_STRING = 1
+_TAG_EVENT = 2
+# tag, string id, utf-8 length (followed by the bytes)
+_STRING = struct.Struct("<BIH")
+# tag, seq, unix time, feature, tenant, entity, from state, to state (string ids)
+_EVENT = struct.Struct("<BQdIIIII")
+# last seq covered, string count, entry count
+_SNAPSHOT_HEADER = struct.Struct("<QIQ")
+_LENGTH = struct.Struct("<H")
+
+_SWAP = sys.byteorder != "little"
+
+# (feature, tenant_id, entity_id)
+EventKey = Tuple[str, str, str]
+# (seq, feature, entity_id, from_state, to_state), grouped by tenant
+_TenantEvent = Tuple[int, str, str, str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class TransitionEvent:
+    """One logged transition."""
+    seq: int
+    timestamp: float
+    feature: str
+    tenant_id: str
+    entity_id: str
+    from_state: str
+    to_state: str
+
+
+def _segment_paths(directory: Path) -> List[Path]:
+    return sorted(directory.glob("events-*.log"))
+
+
+def _snapshot_paths(directory: Path) -> List[Path]:
+    return sorted(directory.glob("snapshot-*.snap"))
+
+
+def _name_seq(path: Path) -> int:
+    """Sequence number embedded in a segment or snapshot file name."""
+    return int(path.stem.split("-", 1)[1])
+
+
+def _scan_segment(path: Path) -> Iterator[Tuple[int, float, str, str, str, str, str]]:
+    """
+    Decode a segment's events in order.
+
+    Stops quietly at a torn record at the end of the file (a crash mid-write);
+    writers never append to a segment after reopening the log.
+    """
+    data = path.read_bytes()
+    if not data.startswith(SEGMENT_MAGIC):
+        raise ValueError(f"{path} is not a ranex event segment")
+    strings: Dict[int, str] = {}
+    unpack_event = _EVENT.unpack_from
+    unpack_string = _STRING.unpack_from
+    event_size = _EVENT.size
+    string_size = _STRING.size
+    offset = len(SEGMENT_MAGIC)
+    end = len(data)
+    while offset < end:
+        tag = data[offset]
+        if tag == _TAG_EVENT:
+            if offset + event_size > end:
+                return
+            _, seq, timestamp, feature, tenant, entity, source, target = unpack_event(data, offset)
+            offset += event_size
+            yield (
+                seq, timestamp, strings[feature], strings[tenant], strings[entity], strings[source], strings[target]
+            )
+        elif tag == _TAG_STRING:
+            if offset + string_size > end:
+                return
+            _, string_id, length = unpack_string(data, offset)
+            offset += string_size
+            if offset + length > end:
+                return
+            strings[string_id] = data[offset:offset + length].decode("utf-8")
+            offset += length
+        else:
+            raise ValueError(f"Corrupt event segment {path} at byte {offset}")
+
+
+def _read_segment(
+    path: Path, after_seq: int, until_seq: Optional[int]
+) -> Tuple[int, Dict[str, List[_TenantEvent]]]:
+    """Decode one segment: (last seq in it, events in (after_seq, until_seq] grouped by tenant)."""
+    last_seq = 0
+    by_tenant: Dict[str, List[_TenantEvent]] = {}
+    for seq, _, feature, tenant, entity, source, target in _scan_segment(path):
+        last_seq = seq
+        if seq <= after_seq or (until_seq is not None and seq > until_seq):
+            continue
+        bucket = by_tenant.get(tenant)
+        if bucket is None:
+            bucket = by_tenant[tenant] = []
+        bucket.append((seq, feature, entity, source, target))
+    return last_seq, by_tenant
+
+
+def read_events(directory: Union[str, Path] = ".ranex/events", after_seq: int = 0) -> Iterator[TransitionEvent]:
+    """Iterate over logged events after ``after_seq``, oldest first (e.g. for audits)."""
+    for path in _segment_paths(Path(directory)):
+        for seq, timestamp, feature, tenant, entity, source, target in _scan_segment(path):
+            if seq > after_seq:
+                yield TransitionEvent(seq, timestamp, feature, tenant, entity, source, target)
+
+
+def write_snapshot(directory: Union[str, Path], states: Dict[EventKey, str], seq: int) -> Path:
+    """
+    Atomically write a snapshot of ``states`` covering every event up to ``seq``.
+
+    Returns:
+        Path of the new snapshot file
+    """
+    directory = Path(directory)
+    strings: Dict[str, int] = {}
+    columns = [array("I") for _ in range(4)]
+    for key, state in states.items():
+        for column, value in zip(columns, (*key, state)):
+            string_id = strings.get(value)
+            if string_id is None:
+                string_id = strings[value] = len(strings)
+            column.append(string_id)
+
+    parts = [SNAPSHOT_MAGIC, _SNAPSHOT_HEADER.pack(seq, len(strings), len(states))]
+    for value in strings:
+        encoded = value.encode("utf-8")
+        parts.append(_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    for column in columns:
+        if _SWAP:
+            column.byteswap()
+        parts.append(column.tobytes())
+
+    path = directory / f"snapshot-{seq:016d}.snap"
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(b"".join(parts))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def _load_snapshot(path: Path) -> Tuple[int, Dict[str, Dict[Tuple[str, str], str]]]:
+    """
+    Load a snapshot: (seq it covers, states per tenant keyed by (feature, entity)).
+
+    Raises:
+        ValueError: If the file is not a complete, well-formed snapshot
+    """
+    data = path.read_bytes()
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError(f"{path} is not a ranex snapshot")
+    offset = len(SNAPSHOT_MAGIC)
+    try:
+        seq, string_count, count = _SNAPSHOT_HEADER.unpack_from(data, offset)
+        offset += _SNAPSHOT_HEADER.size
+        strings = []
+        for _ in range(string_count):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if offset + length > len(data):
+                raise ValueError("string table is truncated")
+            strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+    except struct.error as e:
+        raise ValueError(f"Snapshot {path} is truncated: {e}") from None
+    except ValueError as e:
+        raise ValueError(f"Snapshot {path} is damaged: {e}") from None
+    if len(data) - offset != 4 * count * array("I").itemsize:
+        raise ValueError(f"Snapshot {path} is truncated or has trailing bytes")
+    columns = []
+    for _ in range(4):
+        column = array("I")
+        column.frombytes(data[offset:offset + count * column.itemsize])
+        if _SWAP:
+            column.byteswap()
+        offset += count * column.itemsize
+        columns.append(column)
+    if any(value >= string_count for column in columns for value in column):
+        raise ValueError(f"Snapshot {path} refers to strings it does not contain")
+
+    by_tenant: Dict[str, Dict[Tuple[str, str], str]] = {}
+    for feature, tenant, entity, state in zip(*columns):
+        bucket = by_tenant.get(strings[tenant])
+        if bucket is None:
+            bucket = by_tenant[strings[tenant]] = {}
+        bucket[(strings[feature], strings[entity])] = strings[state]
+    return seq, by_tenant
+
+
+def _replay_tenant(
+    tenant: str,
+    base: Dict[Tuple[str, str], str],
+    events: List[_TenantEvent],
+    rules: Optional[Dict[str, Tuple[str, FrozenSet[Tuple[str, str]]]]],
+) -> Tuple[Dict[Tuple[str, str], str], List[str]]:
+    """Apply one tenant's events in order on top of its snapshot states (updated in place)."""
+    states = base
+    anomalies: List[str] = []
+    if rules is None:
+        for _, feature, entity, _, target in events:
+            states[(feature, entity)] = target
+        return states, anomalies
+    for seq, feature, entity, source, target in events:
+        key = (feature, entity)
+        rule = rules.get(feature)
+        if rule is not None:
+            current = states.get(key, rule[0])
+            if current != source:
+                anomalies.append(f"seq {seq}: {feature}:{tenant}:{entity} was '{current}', event moves from '{source}'")
+            elif (source, target) not in rule[1]:
+                anomalies.append(f"seq {seq}: {feature} does not allow '{source}' -> '{target}'")
+        states[key] = target
+    return states, anomalies
+
+
+@dataclass
+class ReplayResult:
+    """
+    Rebuilt state of every logged entity.
+
+    Attributes:
+        states: Latest state per (feature, tenant_id, entity_id)
+        snapshot_seq: Sequence number the loaded snapshot covered (0 if none)
+        last_seq: Last sequence number applied
+        events_applied: Events replayed on top of the snapshot
+        anomalies: With validate=True, events that did not follow from the
+            previous state or the feature's rules (they are still applied)
+        duration_seconds: Wall time of the replay
+    """
+    states: Dict[EventKey, str]
+    snapshot_seq: int = 0
+    last_seq: int = 0
+    events_applied: int = 0
+    anomalies: List[str] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    def apply_to(self, store: StateStore) -> int:
+        """Write every rebuilt state into a StateStore; returns the number written."""
+        for (feature, tenant_id, entity_id), state in self.states.items():
+            store.set(feature, tenant_id, entity_id, state)
+        store.flush()
+        return len(self.states)
+
+
+def _feature_rules(features: Iterable[str]) -> Dict[str, Tuple[str, FrozenSet[Tuple[str, str]]]]:
+    from ranex.registry import get_registry
+
+    registry = get_registry()
+    rules = {}
+    for feature in features:
+        try:
+            compiled = registry.get(feature)
+        except Exception as e:
+            logger.warning(
+                f"Cannot validate replayed events for '{feature}': {e}",
+                extra={"feature": feature, "error": str(e)},
+            )
+            continue
+        rules[feature] = (compiled.initial, compiled.allowed_pairs)
+    return rules
+
+
+def replay(
+    directory: Union[str, Path] = ".ranex/events",
+    tenants: Optional[Sequence[str]] = None,
+    validate: bool = False,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    until_seq: Optional[int] = None,
+) -> ReplayResult:
+    """
+    Rebuild the latest state of every entity from a log directory.
+
+    Loads the newest snapshot, then decodes only the segments holding later
+    events (in parallel) and applies each tenant's events in order (tenants
+    in parallel). A damaged snapshot is skipped with a warning in favour of
+    the next older one (or of the full log when none is left).
+
+    Args:
+        directory: Event log directory
+        tenants: Only rebuild these tenants (default: all)
+        validate: Check every event against the previous state and the
+            feature's state.yaml rules, collecting mismatches as anomalies
+        max_workers: Size of the default thread pool
+        executor: Pool to use instead, e.g. a ProcessPoolExecutor for
+            CPU-bound replays on interpreters with a GIL
+        until_seq: Ignore events after this sequence number
+
+    Returns:
+        ReplayResult with the rebuilt states
+    """
+    started = time.perf_counter()
+    directory = Path(directory)
+    snapshot_seq = 0
+    base: Dict[str, Dict[Tuple[str, str], str]] = {}
+    snapshots = [
+        path for path in _snapshot_paths(directory) if until_seq is None or _name_seq(path) <= until_seq
+    ]
+    for path in reversed(snapshots):
+        try:
+            snapshot_seq, base = _load_snapshot(path)
+            break
+        except (OSError, ValueError) as e:
+            logger.warning(
+                f"Skipping unreadable event log snapshot {path.name}: {e}",
+                extra={"operation": "eventlog_replay", "error": str(e)},
+            )
+
+    # A segment is needed unless the next one starts at or before the snapshot
+    segments = _segment_paths(directory)
+    needed = [
+        path for index, path in enumerate(segments)
+        if (index + 1 == len(segments) or _name_seq(segments[index + 1]) > snapshot_seq + 1)
+        and (until_seq is None or _name_seq(path) <= until_seq)
+    ]
+
+    own_pool = executor is None
+    pool = executor if executor is not None else ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="ranex-replay"
+    )
+    try:
+        decoded = list(pool.map(
+            _read_segment, needed, [snapshot_seq] * len(needed), [until_seq] * len(needed)
+        ))
+        events: Dict[str, List[_TenantEvent]] = {}
+        last_seq = snapshot_seq
+        for segment_last, by_tenant in decoded:
+            last_seq = max(last_seq, segment_last if until_seq is None else min(segment_last, until_seq))
+            for tenant, tenant_events in by_tenant.items():
+                bucket = events.get(tenant)
+                if bucket is None:
+                    events[tenant] = tenant_events
+                else:
+                    bucket.extend(tenant_events)
+
+        names = sorted(set(base) | set(events)) if tenants is None else list(tenants)
+        rules = None
+        if validate:
+            rules = _feature_rules({event[1] for tenant in names for event in events.get(tenant, ())})
+        replayed = pool.map(
+            _replay_tenant,
+            names,
+            [base.get(tenant, {}) for tenant in names],
+            [events.get(tenant, []) for tenant in names],
+            [rules] * len(names),
+        )
+        states: Dict[EventKey, str] = {}
+        anomalies: List[str] = []
+        applied = 0
+        for tenant, (tenant_states, tenant_anomalies) in zip(names, replayed):
+            for (feature, entity), state in tenant_states.items():
+                states[(feature, tenant, entity)] = state
+            anomalies.extend(tenant_anomalies)
+            applied += len(events.get(tenant, ()))
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    return ReplayResult(
+        states=states,
+        snapshot_seq=snapshot_seq,
+        last_seq=last_seq,
+        events_applied=applied,
+        anomalies=anomalies,
+        duration_seconds=time.perf_counter() - started,
+    )
+
+
+# Open logs, so a forked child can disable the ones it inherited
+_open_logs: "weakref.WeakSet[EventLog]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for log in list(_open_logs):
+        log._disown()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _lock_directory(directory: Path) -> Any:
+    """Hold an exclusive lock on the log directory so only one process writes to it."""
+    handle = open(directory / ".lock", "a+b")
+    try:
+        import fcntl
+    except ImportError:
+        return handle  # No advisory locks on this platform
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        raise RuntimeError(
+            f"Event log {directory} is already open for writing by another process; "
+            f"give each worker process its own directory"
+        ) from None
+    return handle
+
+
+class EventLog:
+    """
+    Writer for a transition event log directory.
+
+    Appends are serialized by a lock and written (and flushed to the OS)
+    before append() returns; with ``fsync=True`` they are also on disk.
+    Segments roll over at ``segment_bytes``.
+
+    One process writes a directory at a time, and the lock is not shared
+    across fork(): a log opened before a pre-fork server (Gunicorn, uvicorn
+    --workers) forks raises RuntimeError on every write in the workers.
+    Open the EventLog in each worker instead, with one directory per worker.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = ".ranex/events",
+        segment_bytes: int = 64 * 1024 * 1024,
+        snapshot_every: Optional[int] = None,
+        fsync: bool = False,
+        prune: bool = False,
+    ):
+        """
+        Initialize the log.
+
+        Args:
+            directory: Where segments and snapshots live (created if missing)
+            segment_bytes: Size at which a new segment file is started
+            snapshot_every: Take a snapshot in the background after this many
+                events (None: only when snapshot() is called)
+            fsync: fsync every append (survives power loss, much slower)
+            prune: Delete segments once a snapshot covers them. Off by default
+                because segments are also the audit trail.
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.prune = prune
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_handle = _lock_directory(self.directory)
+
+        self._lock = threading.Lock()
+        self._seq = self._recover_seq()
+        self._file: Optional[Any] = None
+        self._strings: Dict[str, int] = {}
+        self._size = 0
+        self._since_snapshot = 0
+        self._snapshotting = False
+        self._owner_pid = os.getpid()
+        _open_logs.add(self)
+        atexit.register(self.close)
+
+    def _disown(self) -> None:
+        """In a forked child: drop the parent's handles without touching its files."""
+        # The parent may have held the lock mid-append when it forked
+        self._lock = threading.Lock()
+        for handle in (self._file, self._lock_handle):
+            if handle is not None:
+                # Closing our copy leaves the parent's segment and flock intact
+                handle.close()
+        self._file = None
+        self._lock_handle = None
+
+    def _check_owner(self) -> None:
+        if os.getpid() != self._owner_pid:
+            raise RuntimeError(
+                f"Event log {self.directory} was opened in process {self._owner_pid} before it forked; "
+                f"open a separate EventLog, with its own directory, in each worker process"
+            )
+
+    def _recover_seq(self) -> int:
+        seq = 0
+        snapshots = _snapshot_paths(self.directory)
+        if snapshots:
+            seq = _name_seq(snapshots[-1])
+        segments = _segment_paths(self.directory)
+        if segments:
+            last = segments[-1]
+            seq = max(seq, _name_seq(last) - 1, _read_segment(last, sys.maxsize, None)[0])
+        return seq
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent event."""
+        return self._seq
+
+    def _open_segment(self) -> None:
+        self._close_segment()
+        path = self.directory / f"events-{self._seq + 1:016d}.log"
+        # A file by this name can only be a segment with no complete event
+        # (torn by a crash), so it is safe to start it over. Unbuffered: each
+        # append is one write, and a forked child inherits no pending bytes.
+        self._file = open(path, "wb", buffering=0)
+        self._write(SEGMENT_MAGIC)
+        self._strings = {}
+        self._size = len(SEGMENT_MAGIC)
+
+    def _write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def _string_id(self, value: str, parts: List[bytes]) -> int:
+        string_id = self._strings.get(value)
+        if string_id is None:
+            encoded = value.encode("utf-8")
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f"Event log strings are limited to 65535 bytes: {value[:40]!r}...")
+            string_id = self._strings[value] = len(self._strings)
+            parts.append(_STRING.pack(_TAG_STRING, string_id, len(encoded)))
+            parts.append(encoded)
+        return string_id
+
+    def append(self, feature: str, tenant_id: str, entity_id: str, transitions: Sequence[Tuple[str, str]]) -> int:
+        """
+        Log one entity's transitions, as (from_state, to_state) pairs in order.
+
+        Returns:
+            Sequence number of the last event written
+        """
+        return self.append_many(((feature, tenant_id, entity_id, transitions),))
+
+    def append_many(self, entries: Iterable[Tuple[str, str, str, Sequence[Tuple[str, str]]]]) -> int:
+        """Log several entities' transitions in one write; see append()."""
+        now = time.time()
+        pack_event = _EVENT.pack
+        self._check_owner()
+        with self._lock:
+            if self._file is None or self._size >= self.segment_bytes:
+                self._open_segment()
+            string_id = self._string_id
+            parts: List[bytes] = []
+            seq = self._seq
+            written = 0
+            for feature, tenant_id, entity_id, transitions in entries:
+                feature_id = string_id(feature, parts)
+                tenant = string_id(tenant_id, parts)
+                entity = string_id(entity_id, parts)
+                for source, target in transitions:
+                    source_id = string_id(source, parts)
+                    target_id = string_id(target, parts)
+                    seq += 1
+                    parts.append(pack_event(_TAG_EVENT, seq, now, feature_id, tenant, entity, source_id, target_id))
+                written += len(transitions)
+            if not written:
+                return self._seq
+            record = b"".join(parts)
+            self._write(record)
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._seq = seq
+            self._size += len(record)
+            self._since_snapshot += written
+            start_snapshot = (
+                self.snapshot_every is not None
+                and self._since_snapshot >= self.snapshot_every
+                and not self._snapshotting
+            )
+            if start_snapshot:
+                self._snapshotting = True
+        if start_snapshot:
+            threading.Thread(target=self._background_snapshot, name="ranex-eventlog-snapshot", daemon=True).start()
+        return seq
+
+    def _background_snapshot(self) -> None:
+        try:
+            self.snapshot()
+        except Exception as e:
+            logger.warning(
+                f"Event log snapshot failed for {self.directory}: {e}",
+                extra={"operation": "eventlog_snapshot", "error": str(e)},
+            )
+        finally:
+            with self._lock:
+                self._snapshotting = False
+
+    def snapshot(self) -> Path:
+        """
+        Write a snapshot of every entity's latest state as of now.
+
+        The current segment is closed first, so the snapshot covers only
+        immutable files while appends continue into a new segment.
+
+        Returns:
+            Path of the new snapshot file
+        """
+        self._check_owner()
+        with self._lock:
+            self._close_segment()
+            upto = self._seq
+            self._since_snapshot = 0
+        result = replay(self.directory, until_seq=upto)
+        path = write_snapshot(self.directory, result.states, upto)
+
+        # Keep the previous snapshot, which replay() falls back to if the
+        # newest one is damaged
+        snapshots = _snapshot_paths(self.directory)
+        for old in snapshots[:-2]:
+            old.unlink(missing_ok=True)
+        if self.prune and len(snapshots) >= 2:
+            # Only what the fallback snapshot covers: a segment goes once the
+            # next one starts at or before its seq + 1
+            fallback_seq = _name_seq(snapshots[-2])
+            segments = _segment_paths(self.directory)
+            for segment, following in zip(segments, segments[1:]):
+                if _name_seq(following) <= fallback_seq + 1:
+                    segment.unlink(missing_ok=True)
+        logger.info(
+            f"Event log snapshot written: {path.name} ({len(result.states)} entities)",
+            extra={"operation": "eventlog_snapshot", "seq": upto, "entities": len(result.states)},
+        )
+        return path
+
+    def flush(self) -> None:
+        """Flush the current segment to disk (fsync)."""
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Close the current segment and release the directory lock."""
+        with self._lock:
+            self._close_segment()
+            if self._lock_handle is not None:
+                self._lock_handle.close()
+                self._lock_handle = None
+
+
+# Export all public symbols
+__all__ = [
+    "EventLog",
+    "TransitionEvent",
+    "ReplayResult",
+    "read_events",
+    "replay",
+    "write_snapshot",
+]
@@ -0,0 +1,240 @@
+"""
+Ranex Idempotency.
+
+Result caching for Contract-wrapped operations so client retries do not
+re-run business logic or re-attempt transitions:
+- Results of successful calls cached per idempotency key with a TTL
+- Concurrent calls with the same key share one execution (single-flight)
+- Bounded in-process LRU, or Redis to share results across nodes
+
+Usage:
+    from ranex import Contract
+
+    @Contract(feature="payment", idempotency_key=lambda req, **_: req.request_id)
+    async def charge(req: ChargeRequest, *, _ctx=None):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("ranex.contract")
+
+class IdempotencyStore(ABC):
+    """
+    Interface for cached call results.
+
+    Implementations must be safe to call from multiple threads.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, result) for a live entry, else (False, None)."""
+
+    @abstractmethod
+    def set(self, key: str, result: Any, ttl_seconds: float) -> None:
+        """Cache a result for ``ttl_seconds``."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Forget a cached result."""
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    In-process LRU of results with per-entry expiry.
+
+    Cached results are returned as the same object to every hit; treat
+    them as immutable.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of cached results (LRU eviction)
+        """
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key: str, result: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """
+    Redis-backed result cache shared by every process and node.
+
+    Results are pickled, so only point this at a Redis you trust.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "ranex:idempotency:",
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            client: Redis client to use; created from ``url`` if omitted
+            url: Redis connection URL
+            prefix: Key prefix for all cached results
+        """
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            return False, None
+        return True, pickle.loads(data)
+
+    def set(self, key: str, result: Any, ttl_seconds: float) -> None:
+        self.client.set(
+            self.prefix + key,
+            pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+            ex=max(1, math.ceil(ttl_seconds)),
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+class IdempotencyCache:
+    """
+    Result cache with single-flight execution in front of an IdempotencyStore.
+
+    Only successful results are cached. While a call is running, other
+    calls with the same key (from any thread or event loop in this process)
+    wait for it and receive its result, or its exception.
+    """
+
+    def __init__(self, store: Optional[IdempotencyStore] = None, ttl_seconds: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            store: Where results live (default: a MemoryIdempotencyStore)
+            ttl_seconds: How long a result is replayed for retries
+        """
+        self.store = store if store is not None else MemoryIdempotencyStore()
+        self.ttl_seconds = ttl_seconds
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, key: str) -> Tuple[bool, Future]:
+        """Return (leader, future): the leader runs the call, others wait on it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return False, future
+            future = self._inflight[key] = Future()
+            return True, future
+
+    def _settle(
+        self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None, store: bool = True
+    ) -> None:
+        """Cache a successful result, then release the key and wake the waiters."""
+        try:
+            if error is None and store:
+                try:
+                    self.store.set(key, result, self.ttl_seconds)
+                except Exception as e:
+                    # The call itself succeeded: a later retry simply runs again
+                    logger.warning(
+                        f"Failed to cache idempotent result for key '{key}': {e}",
+                        extra={"idempotency_key": key, "error": str(e)},
+                    )
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def run(self, key: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Return the cached result for ``key``, or run ``func(*args)`` once and cache it."""
+        hit, result = self.store.get(key)
+        if hit:
+            return result
+        leader, future = self._claim(key)
+        if not leader:
+            return future.result()
+        try:
+            # The previous leader may have cached its result after our lookup
+            hit, result = self.store.get(key)
+            if not hit:
+                result = func(*args)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result, store=not hit)
+        return result
+
+    async def run_async(self, key: str, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Async form of run(): ``func(*args)`` is awaited."""
+        hit, result = self.store.get(key)
+        if hit:
+            return result
+        leader, future = self._claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            hit, result = self.store.get(key)
+            if not hit:
+                result = await func(*args)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result, store=not hit)
+        return result
+
+
+# Export all public symbols
+__all__ = [
+    "IdempotencyStore",
+    "MemoryIdempotencyStore",
+    "RedisIdempotencyStore",
+    "IdempotencyCache",
+]
@@ -0,0 +1,385 @@
+"""
+Ranex Contract Metrics.
+
+Opt-in Prometheus metrics for Contract executions:
+- Latency histogram per feature and function (whole stream for generators)
+- Time to first item of streaming (generator) Contracts
+- Call outcomes (success / error) and rollback results
+- State transitions labelled by from/to state
+
+The hot path only appends to a thread-local buffer; a background thread
+folds the buffers into prometheus_client every ``flush_interval`` seconds.
+Under multi-worker uvicorn/gunicorn, set PROMETHEUS_MULTIPROC_DIR before
+the workers start and every worker's samples are aggregated on scrape.
+
+Usage:
+    from ranex.metrics import enable_metrics, metrics_asgi_app
+
+    enable_metrics()
+    app.mount("/metrics", metrics_asgi_app())
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Metric families: name -> (type, help, label names). Names get the "ranex_" prefix.
+METRIC_FAMILIES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "contract_duration_seconds": (
+        "histogram", "Contract execution latency", ("feature", "function"),
+    ),
+    "contract_calls_total": (
+        "counter", "Contract executions by outcome", ("feature", "function", "outcome"),
+    ),
+    "contract_rollbacks_total": (
+        "counter", "Contract auto-rollbacks by result", ("feature", "function", "result"),
+    ),
+    "state_transitions_total": (
+        "counter", "State transitions applied inside Contracts", ("feature", "from_state", "to_state"),
+    ),
+    "contract_stream_first_item_seconds": (
+        "histogram", "Time from a streaming Contract call to its first item", ("feature", "function"),
+    ),
+    "contract_batch_seconds": (
+        "histogram", "Contract batch execution latency", ("feature", "function"),
+    ),
+    "contract_batches_total": (
+        "counter", "Contract batches executed (items are in contract_calls_total)", ("feature", "function"),
+    ),
+    "schema_validation_seconds": (
+        "histogram", "Contract input_schema validation latency", ("feature", "mode"),
+    ),
+    "bulkhead_wait_seconds": (
+        "histogram", "Time spent queued for a bulkhead slot", ("bulkhead", "scope"),
+    ),
+    "bulkhead_rejections_total": (
+        "counter", "Calls rejected by a full bulkhead", ("bulkhead", "scope"),
+    ),
+    "rules_reload_seconds": (
+        "histogram", "Time to recompile a changed state.yaml", ("feature",),
+    ),
+    "rules_reloads_total": (
+        "counter", "state.yaml reloads by result", ("feature", "result"),
+    ),
+    "event_loop_lag_seconds": (
+        "histogram", "Delay between a scheduled event loop wakeup and when it ran", (),
+    ),
+}
+
+LabelKey = Tuple[str, Tuple[str, ...]]
+
+
+class _Buffer:
+    """Per-thread accumulation of counter increments and observations."""
+
+    __slots__ = ("thread", "lock", "counts", "observations")
+
+    def __init__(self) -> None:
+        self.thread = threading.current_thread()
+        self.lock = threading.Lock()
+        self.counts: Dict[LabelKey, float] = {}
+        self.observations: Dict[LabelKey, List[float]] = {}
+
+    def drain(self) -> Tuple[Dict[LabelKey, float], Dict[LabelKey, List[float]]]:
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            observations, self.observations = self.observations, {}
+        return counts, observations
+
+
+class MetricsRecorder:
+    """
+    Low-overhead recorder in front of prometheus_client metrics.
+
+    Recording takes an uncontended per-thread lock and a dict update;
+    prometheus_client is only touched by flush().
+    """
+
+    def __init__(self, registry: Optional[Any] = None, flush_interval: float = 1.0, namespace: str = "ranex"):
+        """
+        Initialize the recorder and create the metric families.
+
+        Args:
+            registry: prometheus_client CollectorRegistry (default: the global REGISTRY)
+            flush_interval: Seconds between background flushes
+            namespace: Metric name prefix
+        """
+        import prometheus_client
+
+        self.flush_interval = flush_interval
+        self.registry = registry if registry is not None else prometheus_client.REGISTRY
+        self._metrics: Dict[str, Any] = {}
+        for name, (kind, help_text, labels) in METRIC_FAMILIES.items():
+            metric_cls = prometheus_client.Histogram if kind == "histogram" else prometheus_client.Counter
+            metric_name = name[:-len("_total")] if kind == "counter" and name.endswith("_total") else name
+            self._metrics[name] = metric_cls(
+                metric_name, help_text, labels, namespace=namespace, registry=self.registry
+            )
+
+        self._local = threading.local()
+        self._buffers: List[_Buffer] = []
+        self._buffers_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.close)
+        # Forked workers start with empty buffers and their own flusher
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._local = threading.local()
+        self._buffers = []
+        self._buffers_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+
+    def _buffer(self) -> _Buffer:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._register_buffer()
+        return buffer
+
+    def _register_buffer(self) -> _Buffer:
+        with self._buffers_lock:
+            if self._flusher is None:
+                self._start_flusher()
+            buffer = _Buffer()
+            self._buffers.append(buffer)
+            self._local.buffer = buffer
+            return buffer
+
+    def _start_flusher(self) -> None:
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name="ranex-metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        stop = self._stop
+        while not stop.wait(self.flush_interval):
+            self.flush()
+
+    def inc(self, name: str, labels: Tuple[str, ...], amount: float = 1.0) -> None:
+        """Buffer a counter increment."""
+        buffer = self._buffer()
+        key = (name, labels)
+        with buffer.lock:
+            buffer.counts[key] = buffer.counts.get(key, 0.0) + amount
+
+    def observe(self, name: str, labels: Tuple[str, ...], value: float) -> None:
+        """Buffer a histogram observation."""
+        buffer = self._buffer()
+        key = (name, labels)
+        with buffer.lock:
+            observations = buffer.observations.get(key)
+            if observations is None:
+                buffer.observations[key] = [value]
+            else:
+                observations.append(value)
+
+    def record_contract(
+        self,
+        feature: str,
+        function: str,
+        outcome: str,
+        duration: float,
+        transitions: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> None:
+        """Buffer everything one Contract call produces under a single lock."""
+        buffer = self._buffer()
+        call_labels = (feature, function)
+        with buffer.lock:
+            counts = buffer.counts
+            key = ("contract_calls_total", (feature, function, outcome))
+            counts[key] = counts.get(key, 0.0) + 1.0
+            key = ("contract_duration_seconds", call_labels)
+            observations = buffer.observations.get(key)
+            if observations is None:
+                buffer.observations[key] = [duration]
+            else:
+                observations.append(duration)
+            if transitions:
+                for from_state, to_state in transitions:
+                    key = ("state_transitions_total", (feature, from_state, to_state))
+                    counts[key] = counts.get(key, 0.0) + 1.0
+
+    def record_batch(
+        self,
+        feature: str,
+        function: str,
+        succeeded: int,
+        failed: int,
+        duration: float,
+        transitions: Optional[Iterable[Tuple[str, str]]] = None,
+    ) -> None:
+        """Buffer one aggregated record for a Contract batch under a single lock."""
+        buffer = self._buffer()
+        call_labels = (feature, function)
+        with buffer.lock:
+            counts = buffer.counts
+            for outcome, amount in (("success", succeeded), ("error", failed)):
+                if amount:
+                    key = ("contract_calls_total", (feature, function, outcome))
+                    counts[key] = counts.get(key, 0.0) + amount
+            key = ("contract_batches_total", call_labels)
+            counts[key] = counts.get(key, 0.0) + 1.0
+            key = ("contract_batch_seconds", call_labels)
+            observations = buffer.observations.get(key)
+            if observations is None:
+                buffer.observations[key] = [duration]
+            else:
+                observations.append(duration)
+            if transitions:
+                for from_state, to_state in transitions:
+                    key = ("state_transitions_total", (feature, from_state, to_state))
+                    counts[key] = counts.get(key, 0.0) + 1.0
+
+    def flush(self) -> None:
+        """Fold every thread's buffered samples into prometheus_client."""
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+            # Buffers of finished threads are drained one last time below
+            self._buffers = [b for b in self._buffers if b.thread.is_alive()]
+        with self._flush_lock:
+            for buffer in buffers:
+                counts, observations = buffer.drain()
+                for (name, labels), amount in counts.items():
+                    metric = self._metrics[name]
+                    (metric.labels(*labels) if labels else metric).inc(amount)
+                for (name, labels), values in observations.items():
+                    metric = self._metrics[name]
+                    child = metric.labels(*labels) if labels else metric
+                    for value in values:
+                        child.observe(value)
+
+    def close(self) -> None:
+        """Stop the background flusher and flush what is left."""
+        self._stop.set()
+        self.flush()
+
+
+# Global recorder; None while metrics are disabled
+_recorder: Optional[MetricsRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def enable_metrics(registry: Optional[Any] = None, flush_interval: float = 1.0) -> MetricsRecorder:
+    """
+    Turn on Contract metrics for this process.
+
+    Call once at startup (e.g. in the FastAPI lifespan). Safe to call again;
+    the first recorder is kept.
+
+    Args:
+        registry: prometheus_client CollectorRegistry (default: the global REGISTRY)
+        flush_interval: Seconds between background flushes
+
+    Returns:
+        The active MetricsRecorder
+    """
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = MetricsRecorder(registry=registry, flush_interval=flush_interval)
+        return _recorder
+
+
+def get_recorder() -> Optional[MetricsRecorder]:
+    """Return the active recorder, or None if metrics are disabled."""
+    return _recorder
+
+
+async def monitor_event_loop_lag(interval: float = 0.25) -> None:
+    """
+    Record event loop lag until cancelled.
+
+    Sleeps ``interval`` seconds at a time and records how late each wakeup
+    was. Sustained lag means something is blocking the loop (e.g. large
+    payloads validated inline; see Contract's offload_validation_over_bytes).
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        recorder = _recorder
+        if recorder is not None:
+            recorder.observe("event_loop_lag_seconds", (), max(0.0, loop.time() - expected))
+
+
+def start_event_loop_lag_monitor(interval: float = 0.25) -> Any:
+    """
+    Start monitor_event_loop_lag as a task on the running loop.
+
+    Returns:
+        The asyncio.Task (cancel it on shutdown)
+    """
+    import asyncio
+
+    return asyncio.get_running_loop().create_task(monitor_event_loop_lag(interval))
+
+
+def collector_registry() -> Any:
+    """
+    Registry to expose on /metrics.
+
+    In prometheus multiprocess mode (PROMETHEUS_MULTIPROC_DIR set) this is a
+    fresh registry aggregating every worker's samples; otherwise the
+    registry the recorder writes to.
+    """
+    import prometheus_client
+    from prometheus_client import multiprocess
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    if _recorder is not None:
+        return _recorder.registry
+    return prometheus_client.REGISTRY
+
+
+def generate_latest() -> bytes:
+    """Render the current metrics in the Prometheus text format."""
+    import prometheus_client
+
+    if _recorder is not None:
+        _recorder.flush()
+    return prometheus_client.generate_latest(collector_registry())
+
+
+def metrics_asgi_app() -> Any:
+    """Build an ASGI app serving /metrics (mount it on your FastAPI app)."""
+    import prometheus_client
+
+    return prometheus_client.make_asgi_app(registry=collector_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Clean up a dead worker's live gauges in multiprocess mode.
+
+    Call from the process manager's worker-exit hook.
+    """
+    from prometheus_client import multiprocess
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+# Export all public symbols
+__all__ = [
+    "METRIC_FAMILIES",
+    "MetricsRecorder",
+    "enable_metrics",
+    "get_recorder",
+    "monitor_event_loop_lag",
+    "start_event_loop_lag_monitor",
+    "collector_registry",
+    "generate_latest",
+    "metrics_asgi_app",
+    "mark_process_dead",
+]
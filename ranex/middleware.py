@@ -0,0 +1,156 @@
+"""
+Ranex ASGI Middleware.
+
+Pure ASGI tenant middleware: sets the tenant Contract uses for isolation,
+logging and bulkheads on every request, without BaseHTTPMiddleware's
+per-request task and stream wrapping:
+- Tenant from a header, a JWT claim or a URL path segment
+- Tenant strings interned in a bounded cache (no new string per request)
+- Context reset only after the response, streaming and background tasks finish
+
+Usage:
+    from fastapi import FastAPI
+    from ranex.middleware import TenantMiddleware
+
+    app = FastAPI()
+    app.add_middleware(TenantMiddleware, header="x-tenant-id")
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ranex import reset_tenant_id, set_tenant_id
+
+Scope = Dict[str, Any]
+ASGIApp = Callable[[Scope, Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]], Awaitable[None]]
+
+
+class TenantMiddleware:
+    """
+    Resolve the tenant of each HTTP/WebSocket request and set it for Contract.
+
+    Sources are tried in order: ``header``, then ``jwt_claim`` (read from the
+    Authorization bearer token), then ``path_segment``; ``default`` is used if
+    none yields a value. Lifespan and other scope types pass straight through.
+
+    The JWT payload is decoded but NOT verified: it only routes the request
+    to a tenant. Authentication must still verify the token.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: Optional[str] = "x-tenant-id",
+        jwt_claim: Optional[str] = None,
+        path_segment: Optional[int] = None,
+        default: Optional[str] = None,
+        cache_size: int = 10_000,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            header: Request header holding the tenant id (None to skip)
+            jwt_claim: Claim in the bearer token holding the tenant id (None to skip)
+            path_segment: Index of the path segment holding the tenant id,
+                e.g. 1 for ``/tenants/{tenant}/...`` (None to skip)
+            default: Tenant for requests with none; None leaves the context untouched
+            cache_size: Maximum distinct raw values remembered per source
+        """
+        self.app = app
+        self.header = header.lower().encode("latin-1") if header else None
+        self.jwt_claim = jwt_claim
+        self.path_segment = path_segment
+        self.default = sys.intern(default) if default is not None else None
+        self.cache_size = cache_size
+        self._header_cache: Dict[bytes, str] = {}
+        self._token_cache: Dict[bytes, Optional[str]] = {}
+        self._path_cache: Dict[str, str] = {}
+
+    def _intern(self, cache: Dict[Any, Any], raw: Any, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            value = sys.intern(value)
+        if len(cache) >= self.cache_size:
+            # Unbounded tenant ids (e.g. attacker-chosen) must not grow memory
+            cache.clear()
+        cache[raw] = value
+        return value
+
+    def _claim_from_token(self, token: bytes) -> Optional[str]:
+        try:
+            payload = token.split(b".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + b"=" * (-len(payload) % 4)))
+        except (IndexError, ValueError, binascii.Error):
+            return None
+        value = claims.get(self.jwt_claim) if isinstance(claims, dict) else None
+        return None if value is None else str(value)
+
+    def _tenant_from_token(self, token: bytes) -> Optional[str]:
+        cache = self._token_cache
+        if token in cache:
+            return cache[token]
+        return self._intern(cache, token, self._claim_from_token(token))
+
+    def resolve(self, scope: Scope) -> Optional[str]:
+        """Return the tenant for a request scope, or ``default``."""
+        header = self.header
+        jwt_claim = self.jwt_claim
+        if header is not None or jwt_claim is not None:
+            claim_tenant = None
+            for name, value in scope.get("headers", ()):
+                if name == header and value:
+                    tenant = self._header_cache.get(value)
+                    if tenant is None:
+                        tenant = self._intern(self._header_cache, value, value.decode("latin-1"))
+                    return tenant
+                if (
+                    jwt_claim is not None
+                    and claim_tenant is None
+                    and name == b"authorization"
+                    and value[:7].lower() == b"bearer "
+                ):
+                    claim_tenant = self._tenant_from_token(value[7:])
+                    if claim_tenant is not None and header is None:
+                        return claim_tenant
+            if claim_tenant is not None:
+                return claim_tenant
+
+        index = self.path_segment
+        if index is not None:
+            segments = scope.get("path", "").split("/", index + 2)
+            # segments[0] is the empty string before the leading slash
+            if index + 1 < len(segments) and segments[index + 1]:
+                segment = segments[index + 1]
+                tenant = self._path_cache.get(segment)
+                if tenant is None:
+                    tenant = self._intern(self._path_cache, segment, segment)
+                return tenant
+        return self.default
+
+    async def __call__(self, scope: Scope, receive: Callable[[], Awaitable[Any]], send: Callable[[Any], Awaitable[None]]) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        tenant = self.resolve(scope)
+        if tenant is None:
+            await self.app(scope, receive, send)
+            return
+        # The app call spans the streamed body and Starlette background tasks,
+        # so the tenant stays set until the request is completely done
+        token = set_tenant_id(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_tenant_id(token)
+
+
+# Export all public symbols
+__all__ = [
+    "TenantMiddleware",
+]
@@ -0,0 +1,223 @@
+"""
+Ranex Offload.
+
+Runs the body of a sync Contract function off the event loop, for
+CPU-heavy code called from async routes:
+- "thread": managed thread pool; ``_ctx`` and the tenant context travel as-is
+- "process": managed process pool; the machine state and tenant id are
+  shipped to the worker, and the transitions it made are replayed on the
+  caller's machine, so rollback and state persistence work as usual
+
+Usage:
+    from ranex import Contract
+
+    @Contract(feature="pricing", offload="process")
+    def price_quote(quote_id: str, *, _ctx=None):
+        _ctx.transition("Priced")
+        return expensive_pricing(quote_id)
+
+    price = await price_quote("q-42")  # Offloaded Contracts are awaited
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import importlib
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+OFFLOAD_MODES = ("thread", "process")
+
+# Pools shared by every offloaded Contract
+_thread_executor: Optional[ThreadPoolExecutor] = None
+_process_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_thread_workers = min(32, (os.cpu_count() or 1) + 4)
+_process_workers = os.cpu_count() or 1
+_process_context: Optional[Any] = None
+
+
+def set_offload_workers(
+    threads: Optional[int] = None,
+    processes: Optional[int] = None,
+    mp_context: Optional[Any] = None,
+) -> None:
+    """
+    Size the offload pools.
+
+    Must be called before the first offloaded call of that kind to take effect.
+
+    Args:
+        threads: Worker threads for offload="thread"
+        processes: Worker processes for offload="process"
+        mp_context: multiprocessing context for the process pool
+            (e.g. ``multiprocessing.get_context("spawn")``)
+    """
+    global _thread_workers, _process_workers, _process_context
+    if threads is not None:
+        _thread_workers = max(1, threads)
+    if processes is not None:
+        _process_workers = max(1, processes)
+    if mp_context is not None:
+        _process_context = mp_context
+
+
+def get_offload_executor(mode: str) -> Executor:
+    """Get or create the pool for an offload mode ("thread" or "process")."""
+    global _thread_executor, _process_executor
+    if mode == "thread":
+        if _thread_executor is None:
+            with _executor_lock:
+                if _thread_executor is None:
+                    _thread_executor = ThreadPoolExecutor(
+                        max_workers=_thread_workers, thread_name_prefix="ranex-offload"
+                    )
+        return _thread_executor
+    if _process_executor is None:
+        with _executor_lock:
+            if _process_executor is None:
+                _process_executor = ProcessPoolExecutor(max_workers=_process_workers, mp_context=_process_context)
+    return _process_executor
+
+
+def shutdown_offload_pools(wait: bool = True) -> None:
+    """Shut down both offload pools; they are recreated on next use."""
+    global _thread_executor, _process_executor
+    with _executor_lock:
+        executors = (_thread_executor, _process_executor)
+        _thread_executor = _process_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def _discard_broken_pool(executor: Executor) -> None:
+    # A worker died (e.g. OOM-killed): start a fresh pool on the next call
+    global _process_executor
+    with _executor_lock:
+        if _process_executor is executor:
+            _process_executor = None
+
+
+def _call_in_tenant(func: Callable[..., Any], tenant_context: str, args: tuple, kwargs: dict) -> Any:
+    from ranex import set_tenant_id
+
+    set_tenant_id(tenant_context)  # Inside a copied context: never leaks back
+    return func(*args, **kwargs)
+
+
+# Worker-process cache of resolved functions
+_resolved: Dict[Tuple[str, str], Callable[..., Any]] = {}
+
+
+def _resolve(module: str, qualname: str) -> Callable[..., Any]:
+    """Import the decorated function by name and unwrap it to the original body."""
+    func = _resolved.get((module, qualname))
+    if func is None:
+        obj: Any = importlib.import_module(module)
+        for part in qualname.split("."):
+            obj = getattr(obj, part)
+        while hasattr(obj, "__wrapped__"):
+            obj = obj.__wrapped__
+        func = _resolved[(module, qualname)] = obj
+    return func
+
+
+def _run_in_worker(
+    module: str,
+    qualname: str,
+    feature: str,
+    state: str,
+    tenant_context: str,
+    args: tuple,
+    kwargs: dict,
+) -> Tuple[Any, List[Tuple[str, str]]]:
+    """Process-pool entry point: returns (result, transitions made)."""
+    from ranex import set_tenant_id
+    from ranex.registry import get_registry
+
+    machine = get_registry().new_machine(feature, record=True)
+    machine.restore(state)
+    kwargs["_ctx"] = machine
+    set_tenant_id(tenant_context)  # Workers run one call at a time
+    result = _resolve(module, qualname)(*args, **kwargs)
+    return result, machine.trail
+
+
+class OffloadRunner:
+    """
+    Runs one Contract function's body on an offload pool.
+
+    Built once per decorated function; see the module docstring for what
+    crosses the boundary in each mode.
+    """
+
+    __slots__ = ("mode", "func", "module", "qualname")
+
+    def __init__(self, mode: str, func: Callable[..., Any]):
+        """
+        Initialize the runner.
+
+        Args:
+            mode: "thread" or "process"
+            func: The undecorated sync function
+
+        Raises:
+            ValueError: For an unknown mode, or a function a worker process
+                cannot import by name (nested functions, lambdas)
+        """
+        if mode not in OFFLOAD_MODES:
+            raise ValueError(f"offload must be one of {OFFLOAD_MODES}, got {mode!r}")
+        if asyncio.iscoroutinefunction(func):
+            raise ValueError(f"offload is for sync functions; {func.__name__}() is already async")
+        if mode == "process" and ("<locals>" in func.__qualname__ or "<lambda>" in func.__qualname__):
+            raise ValueError(
+                f"offload='process' needs a module-level function or method; "
+                f"{func.__qualname__}() cannot be imported by a worker process"
+            )
+        self.mode = mode
+        self.func = func
+        self.module = func.__module__
+        self.qualname = func.__qualname__
+
+    async def run(self, ctx: Any, args: tuple, kwargs: dict, tenant_context: str) -> Any:
+        """
+        Run the body with ``kwargs`` (which already holds ``_ctx``) and return its result.
+
+        In process mode, the worker's transitions are applied to ``ctx``
+        before returning; if the body raises, none of them are.
+        """
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                get_offload_executor("thread"), context.run, _call_in_tenant, self.func, tenant_context, args, kwargs
+            )
+
+        executor = get_offload_executor("process")
+        worker_kwargs = {name: value for name, value in kwargs.items() if name != "_ctx"}
+        try:
+            result, trail = await loop.run_in_executor(
+                executor, _run_in_worker, self.module, self.qualname,
+                ctx.rules.feature, ctx.current_state, tenant_context, args, worker_kwargs,
+            )
+        except BrokenProcessPool:
+            _discard_broken_pool(executor)
+            raise
+        for _, target in trail:
+            ctx.transition(target)  # Re-checked against the caller's rules
+        return result
+
+
+# Export all public symbols
+__all__ = [
+    "OFFLOAD_MODES",
+    "OffloadRunner",
+    "set_offload_workers",
+    "get_offload_executor",
+    "shutdown_offload_pools",
+]
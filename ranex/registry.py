@@ -0,0 +1,779 @@
+"""
+Ranex Feature Registry.
+
+Compiles each feature's state.yaml once per process and hands every
+Contract invocation a cheap machine that shares the compiled rules:
+- One Rust parse per feature instead of one per call
+- Invalidation when state.yaml changes (mtime/size first, then content hash)
+- Lock-free reads; only compilation is serialized
+- Optional background watcher that hot-reloads changed files
+
+Usage:
+    from ranex.registry import get_registry
+
+    ctx = get_registry().new_machine("orders")
+    ctx.transition("Confirmed")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import numbers
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ranex_core import StateMachine as RustMachine
+
+from ranex.metrics import get_recorder
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; bulk validation falls back to pure Python
+    np = None
+
+logger = logging.getLogger("ranex.contract")
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+def features_root() -> Path:
+    """Resolve the directory the Rust core loads features from."""
+    return Path(os.environ.get("RANEX_APP_DIR", "app")) / "features"
+
+
+def feature_state_path(feature: str) -> Path:
+    """Resolve the state.yaml path the Rust core loads for a feature."""
+    return features_root() / feature / "state.yaml"
+
+
+class StateTransitionError(ValueError):
+    """
+    Exception raised when an invalid state transition is attempted.
+
+    This exception provides detailed information about the failed transition,
+    including the current state, the attempted state, and the allowed
+    transitions from the current state. It subclasses ValueError, which is
+    what the Rust core raises for illegal transitions, and when the feature
+    is known its message is the same text the Rust core produces.
+
+    Attributes:
+        message: Human-readable error message (None when built by a machine)
+        current_state: The state the machine was in when transition was attempted
+        attempted_state: The state that was attempted to transition to
+        allowed_states: Valid states that can be transitioned to from current_state
+        feature: Feature whose rules rejected the transition, if known
+
+    Example:
+        try:
+            _ctx.transition("InvalidState")
+        except StateTransitionError as e:
+            print(f"Cannot transition from {e.current_state} to {e.attempted_state}")
+            print(f"Allowed transitions: {e.allowed_states}")
+    """
+
+    def __init__(
+        self,
+        message: Optional[str],
+        current_state: str,
+        attempted_state: str,
+        allowed_states: Sequence[str],
+        feature: Optional[str] = None,
+    ):
+        """
+        Initialize a StateTransitionError.
+
+        Args:
+            message: Human-readable error message, or None to format lazily
+            current_state: The state the machine was in
+            attempted_state: The state that was attempted
+            allowed_states: Valid transition targets (the precomputed tuple is used as-is)
+            feature: Feature name; when given, str() matches the Rust core's message
+        """
+        super().__init__(*((message,) if message is not None else ()))
+        self.message = message
+        self.current_state = current_state
+        self.attempted_state = attempted_state
+        self.allowed_states = allowed_states
+        self.feature = feature
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Picklable, so it survives the trip back from an offload process
+        return (
+            type(self),
+            (self.message, self.current_state, self.attempted_state, tuple(self.allowed_states), self.feature),
+        )
+
+    def __str__(self) -> str:
+        if self.feature is not None:
+            return (
+                f"Illegal transition from '{self.current_state}' to '{self.attempted_state}' "
+                f"for feature '{self.feature}'.\n"
+                f"Allowed transitions from '{self.current_state}': [{', '.join(self.allowed_states)}]"
+            )
+        return (
+            f"Cannot transition from '{self.current_state}' to '{self.attempted_state}'. "
+            f"Allowed transitions: {list(self.allowed_states)}"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"StateTransitionError(current_state={self.current_state!r}, "
+            f"attempted_state={self.attempted_state!r}, "
+            f"allowed_states={self.allowed_states!r})"
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TransitionResult:
+    """
+    Outcome of FeatureMachine.try_transition.
+
+    Truthy when the transition was applied.
+
+    Attributes:
+        ok: Whether the transition was allowed (and applied)
+        from_state: State before the attempt
+        to_state: State that was requested
+        allowed_states: Valid targets from ``from_state``
+        feature: Feature whose rules were checked
+    """
+    ok: bool
+    from_state: str
+    to_state: str
+    allowed_states: Tuple[str, ...]
+    feature: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def raise_for_status(self) -> None:
+        """Raise StateTransitionError if the transition was rejected."""
+        if not self.ok:
+            raise StateTransitionError(None, self.from_state, self.to_state, self.allowed_states, self.feature)
+
+
+@dataclass(frozen=True)
+class FeatureRules:
+    """
+    Immutable compiled rules for one feature.
+
+    Mirrors the ``rules`` object of the Rust StateMachine (``initial``,
+    ``states``, ``transitions``) so CLI code can use either.
+
+    Attributes:
+        feature: Feature name
+        initial: Initial state for new machines
+        states: All known states, in declaration order
+        transitions: Allowed target states per source state
+        digest: Content hash of the state.yaml the rules were compiled from
+    """
+    feature: str
+    initial: str
+    states: Tuple[str, ...]
+    transitions: Dict[str, Tuple[str, ...]]
+    digest: str = ""
+
+    # Derived lookup structures, built once in __post_init__
+    allowed_sets: Dict[str, FrozenSet[str]] = field(init=False, repr=False, compare=False)
+    allowed_pairs: FrozenSet[Tuple[str, str]] = field(init=False, repr=False, compare=False)
+    state_ids: Dict[str, int] = field(init=False, repr=False, compare=False)
+    state_names: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    adjacency: bytes = field(init=False, repr=False, compare=False)
+    # reachable[i] has bit j set if state j is reachable from i in one or more steps
+    reachable: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    # next_hop[i][j] is the first step on a shortest path from i to j, or -1
+    next_hop: Tuple[Tuple[int, ...], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        state_ids: Dict[str, int] = {}
+        for state in (self.initial, *self.states):
+            state_ids.setdefault(state, len(state_ids))
+        for state, targets in self.transitions.items():
+            state_ids.setdefault(state, len(state_ids))
+            for target in targets:
+                state_ids.setdefault(target, len(state_ids))
+
+        # Row-major n x n matrix: adjacency[from_id * n + to_id] == 1 if allowed
+        n = len(state_ids)
+        adjacency = bytearray(n * n)
+        for state, targets in self.transitions.items():
+            row = state_ids[state] * n
+            for target in targets:
+                adjacency[row + state_ids[target]] = 1
+
+        object.__setattr__(self, "allowed_sets", {s: frozenset(t) for s, t in self.transitions.items()})
+        object.__setattr__(
+            self,
+            "allowed_pairs",
+            frozenset((s, t) for s, targets in self.transitions.items() for t in targets),
+        )
+        object.__setattr__(self, "state_ids", state_ids)
+        object.__setattr__(self, "state_names", tuple(state_ids))
+        object.__setattr__(self, "adjacency", bytes(adjacency))
+        self._index_paths(n)
+
+    def _index_paths(self, n: int) -> None:
+        """Build the reachability bitsets and next-hop table with one BFS per state."""
+        successors = [
+            [self.state_ids[t] for t in self.transitions.get(name, ())] for name in self.state_ids
+        ]
+        reachable = []
+        next_hop = []
+        for source in range(n):
+            hops = [-1] * n
+            bits = 0
+            frontier = []
+            for target in successors[source]:
+                if not bits >> target & 1:
+                    bits |= 1 << target
+                    hops[target] = target
+                    frontier.append(target)
+            while frontier:
+                following = []
+                for state in frontier:
+                    for target in successors[state]:
+                        if not bits >> target & 1:
+                            bits |= 1 << target
+                            hops[target] = hops[state]
+                            following.append(target)
+                frontier = following
+            reachable.append(bits)
+            next_hop.append(tuple(hops))
+        object.__setattr__(self, "reachable", tuple(reachable))
+        object.__setattr__(self, "next_hop", tuple(next_hop))
+
+    def can_reach(self, from_state: str, to_state: str) -> bool:
+        """
+        Check whether ``to_state`` is reachable from ``from_state``.
+
+        A state always reaches itself. Unknown states reach nothing.
+        """
+        source = self.state_ids.get(from_state)
+        target = self.state_ids.get(to_state)
+        if source is None or target is None:
+            return False
+        return source == target or bool(self.reachable[source] >> target & 1)
+
+    def reachable_from(self, state: str) -> List[str]:
+        """List the states reachable from ``state`` in one or more steps."""
+        source = self.state_ids.get(state)
+        if source is None:
+            return []
+        bits = self.reachable[source]
+        return [name for i, name in enumerate(self.state_names) if bits >> i & 1]
+
+    def shortest_path(self, from_state: str, to_state: str) -> Optional[List[str]]:
+        """
+        Shortest sequence of states from ``from_state`` to ``to_state``.
+
+        Returns:
+            The path including both ends (``[from_state]`` when they are equal),
+            or None if ``to_state`` is unreachable
+        """
+        source = self.state_ids.get(from_state)
+        target = self.state_ids.get(to_state)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [from_state]
+        next_hop = self.next_hop
+        if next_hop[source][target] < 0:
+            return None
+        names = self.state_names
+        path = [from_state]
+        while source != target:
+            source = next_hop[source][target]
+            path.append(names[source])
+        return path
+
+    def adjacency_matrix(self) -> Any:
+        """
+        Return the adjacency matrix indexed by ``state_ids``.
+
+        Returns:
+            An n x n NumPy bool array if NumPy is installed, else a list of rows
+        """
+        n = len(self.state_ids)
+        if np is not None:
+            return np.frombuffer(self.adjacency, dtype=np.uint8).reshape(n, n).astype(bool)
+        return [[bool(b) for b in self.adjacency[i * n:(i + 1) * n]] for i in range(n)]
+
+    def encode(self, states: Iterable[str]) -> Any:
+        """
+        Map state names to their ``state_ids`` integers, for validate_transitions.
+
+        Unknown names map to -1, which validate_transitions reports as not
+        allowed. Encode once and reuse the result across checks.
+
+        Returns:
+            A NumPy intp array if NumPy is installed, else a list of ints
+        """
+        state_ids = self.state_ids
+        ids = [state_ids.get(state, -1) for state in states]
+        if np is not None:
+            return np.array(ids, dtype=np.intp)
+        return ids
+
+    def validate_transitions(
+        self,
+        from_states: Union[Sequence[str], Sequence[int], Any],
+        to_states: Union[Sequence[str], Sequence[int], Any],
+    ) -> Any:
+        """
+        Check many transitions at once without raising.
+
+        Args:
+            from_states: Source states, as names or ``state_ids`` integers
+                (see encode())
+            to_states: Target states, same length and form as ``from_states``
+
+        Returns:
+            A boolean mask. NumPy integer arrays in give a NumPy bool array
+            out (one vectorized lookup); anything else gives a list of bools.
+            Unknown states are reported as not allowed.
+
+        Raises:
+            ValueError: If the inputs differ in length
+        """
+        if len(from_states) != len(to_states):
+            raise ValueError(
+                f"validate_transitions() got {len(from_states)} source states and {len(to_states)} targets"
+            )
+        n = len(self.state_ids)
+
+        if np is not None and isinstance(from_states, np.ndarray) and isinstance(to_states, np.ndarray):
+            if from_states.dtype.kind in "iu" and to_states.dtype.kind in "iu":
+                src = from_states.astype(np.intp, copy=False)
+                dst = to_states.astype(np.intp, copy=False)
+                known = (src >= 0) & (src < n) & (dst >= 0) & (dst < n)
+                matrix = np.frombuffer(self.adjacency, dtype=np.uint8).reshape(n, n)
+                mask = np.zeros(len(src), dtype=bool)
+                mask[known] = matrix[src[known], dst[known]].astype(bool)
+                return mask
+            from_states = from_states.tolist()
+            to_states = to_states.tolist()
+
+        # Integral also covers NumPy integer scalars (e.g. items of an int64 array)
+        if len(from_states) and isinstance(from_states[0], numbers.Integral):
+            adjacency = self.adjacency
+            return [
+                0 <= a < n and 0 <= b < n and adjacency[a * n + b] == 1
+                for a, b in zip(from_states, to_states)
+            ]
+
+        pairs = self.allowed_pairs
+        return [pair in pairs for pair in zip(from_states, to_states)]
+
+    @classmethod
+    def from_machine(cls, feature: str, machine: RustMachine, digest: str = "") -> "FeatureRules":
+        """Build compiled rules from a freshly loaded Rust StateMachine."""
+        rules = machine.rules
+        transitions = {
+            str(state): tuple(str(t) for t in targets)
+            for state, targets in dict(rules.transitions).items()
+        }
+        states = tuple(str(s) for s in (rules.states or ()))
+        if not states:
+            # Derive the state list from the transition graph
+            seen: Dict[str, None] = {str(rules.initial): None}
+            for state, targets in transitions.items():
+                seen[state] = None
+                for target in targets:
+                    seen[target] = None
+            states = tuple(seen)
+        return cls(
+            feature=feature,
+            initial=str(rules.initial),
+            states=states,
+            transitions=transitions,
+            digest=digest,
+        )
+
+
+class FeatureMachine:
+    """
+    Per-call state machine backed by shared compiled rules.
+
+    Exposes the same surface as the Rust StateMachine (``current_state``,
+    ``transition``, ``get_allowed_transitions``, ``validate_transition``,
+    ``rules``) but costs a single small allocation to create.
+
+    When created with ``record=True``, every applied transition is appended
+    to ``trail`` as a (from_state, to_state) pair.
+    """
+
+    __slots__ = ("rules", "current_state", "trail")
+
+    def __init__(self, rules: FeatureRules, current_state: Optional[str] = None, record: bool = False):
+        self.rules = rules
+        self.current_state = rules.initial if current_state is None else current_state
+        self.trail: Optional[List[Tuple[str, str]]] = [] if record else None
+
+    def get_allowed_transitions(self) -> List[str]:
+        """List the states reachable in one step from the current state."""
+        return list(self.rules.transitions.get(self.current_state, ()))
+
+    def validate_transition(self, from_state: str, to_state: str) -> None:
+        """Raise StateTransitionError if ``from_state -> to_state`` is not allowed."""
+        if to_state not in self.rules.allowed_sets.get(from_state, _EMPTY):
+            raise StateTransitionError(
+                None, from_state, to_state, self.rules.transitions.get(from_state, ()), self.rules.feature
+            )
+
+    def validate_transitions(self, from_states: Any, to_states: Any) -> Any:
+        """Bulk form of validate_transition; see FeatureRules.validate_transitions."""
+        return self.rules.validate_transitions(from_states, to_states)
+
+    def encode(self, states: Iterable[str]) -> Any:
+        """Map state names to integer ids; see FeatureRules.encode."""
+        return self.rules.encode(states)
+
+    def can_reach(self, state: str) -> bool:
+        """Check whether ``state`` is reachable from the current state (precomputed)."""
+        return self.rules.can_reach(self.current_state, state)
+
+    def path_to(self, state: str) -> Optional[List[str]]:
+        """Shortest path of states from the current state to ``state``, or None."""
+        return self.rules.shortest_path(self.current_state, state)
+
+    def transition(self, target: str) -> None:
+        """Validate and move to ``target``."""
+        current = self.current_state
+        self.validate_transition(current, target)
+        self.current_state = target
+        if self.trail is not None:
+            self.trail.append((current, target))
+
+    def try_transition(self, target: str) -> TransitionResult:
+        """
+        Attempt a transition without raising.
+
+        Moves to ``target`` if allowed. Either way, returns a TransitionResult;
+        rejections cost no exception and no message formatting.
+        """
+        current = self.current_state
+        rules = self.rules
+        if target in rules.allowed_sets.get(current, _EMPTY):
+            self.current_state = target
+            if self.trail is not None:
+                self.trail.append((current, target))
+            return TransitionResult(True, current, target, rules.transitions[current], rules.feature)
+        return TransitionResult(False, current, target, rules.transitions.get(current, ()), rules.feature)
+
+    def set_state(self, state: str) -> None:
+        """
+        Jump to ``state`` without a rule check (e.g. syncing from storage).
+
+        Raises:
+            ValueError: If the state is not defined for this feature
+        """
+        if state not in self.rules.state_ids:
+            raise ValueError(f"Unknown state '{state}' for feature '{self.rules.feature}'")
+        self.current_state = state
+
+    def snapshot(self) -> str:
+        """
+        Capture the machine's state for a later restore().
+
+        Constant time: the state is an immutable string, so nothing is copied.
+        """
+        return self.current_state
+
+    def restore(self, snapshot: str) -> None:
+        """
+        Return to a snapshot() of this machine without a rule check.
+
+        Used for rollback, where the reverse move is usually not a legal
+        transition. The recorded trail is left untouched.
+        """
+        self.current_state = snapshot
+
+    def __repr__(self) -> str:
+        return f"FeatureMachine(feature={self.rules.feature!r}, current_state={self.current_state!r})"
+
+
+@dataclass
+class _Entry:
+    """Cached compilation of one feature."""
+    rules: FeatureRules
+    stat_key: Optional[Tuple[int, int]]
+    checked_at: float
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _digest(path: Path) -> str:
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return ""
+
+
+class FeatureRegistry:
+    """
+    Process-wide cache of compiled feature rules.
+
+    Entries are revalidated at most once per ``check_interval`` seconds:
+    a changed mtime/size triggers a content hash, and only a changed hash
+    triggers a recompile, so touching a file is cheap.
+
+    With a watcher running (see watch()), reads skip the freshness check
+    entirely and changed files are recompiled in the background. Reloads
+    swap in a new immutable FeatureRules; machines already created keep
+    the rules they started with.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        """
+        Initialize the registry.
+
+        Args:
+            check_interval: Minimum seconds between state.yaml freshness checks
+        """
+        self.check_interval = check_interval
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[RegistryWatcher] = None
+
+    def get(self, feature: str) -> FeatureRules:
+        """Return compiled rules for a feature, compiling on first use."""
+        entry = self._entries.get(feature)
+        if entry is None:
+            return self._compile(feature)
+        if self._watcher is not None:
+            return entry.rules
+        now = time.monotonic()
+        if now - entry.checked_at < self.check_interval:
+            return entry.rules
+        return self._revalidate(feature, entry, now)
+
+    def new_machine(self, feature: str, record: bool = False) -> FeatureMachine:
+        """Create a fresh machine at the feature's initial state."""
+        return FeatureMachine(self.get(feature), record=record)
+
+    def invalidate(self, feature: Optional[str] = None) -> None:
+        """Drop one cached feature, or all of them."""
+        with self._lock:
+            if feature is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(feature, None)
+
+    def features(self) -> List[str]:
+        """List the features currently compiled."""
+        return list(self._entries)
+
+    def refresh(self, feature: Optional[str] = None) -> List[str]:
+        """
+        Check compiled features against their state.yaml now, reloading changed ones.
+
+        Args:
+            feature: Feature to check, or None for every compiled feature
+
+        Returns:
+            The features whose rules were replaced
+        """
+        reloaded = []
+        now = time.monotonic()
+        names = [feature] if feature is not None else list(self._entries)
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None and self._revalidate(name, entry, now) is not entry.rules:
+                reloaded.append(name)
+        return reloaded
+
+    def watch(self, interval: float = 1.0, use_inotify: bool = True) -> "RegistryWatcher":
+        """
+        Start a background thread that hot-reloads changed state.yaml files.
+
+        Args:
+            interval: Polling interval in seconds (when inotify is unavailable)
+            use_inotify: Use file system events via ``watchfiles`` if installed
+
+        Returns:
+            The running RegistryWatcher (also stopped by stop_watching())
+        """
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = RegistryWatcher(self, interval=interval, use_inotify=use_inotify)
+                self._watcher.start()
+            return self._watcher
+
+    def stop_watching(self) -> None:
+        """Stop the background watcher; reads go back to periodic checks."""
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    def _revalidate(self, feature: str, entry: _Entry, now: float) -> FeatureRules:
+        # Claim the check first: threads arriving meanwhile keep serving the
+        # cached rules instead of all stat()-ing the same file in parallel
+        entry.checked_at = now
+        path = feature_state_path(feature)
+        stat_key = _stat_key(path)
+        if stat_key is None:
+            # Missing (deleted, moved, or mid-replace): keep serving cached rules
+            # and stat again on later calls. Clearing stat_key warns only once
+            # and forces a digest check when the file comes back.
+            if entry.stat_key is not None:
+                entry.stat_key = None
+                logger.warning(
+                    f"State machine file for '{feature}' is missing, keeping previous rules: {path}",
+                    extra={"feature": feature, "path": str(path)},
+                )
+            return entry.rules
+        if stat_key == entry.stat_key:
+            return entry.rules
+        if _digest(path) == entry.rules.digest:
+            entry.stat_key = stat_key
+            return entry.rules
+        return self._compile(feature, stale=entry)
+
+    def _compile(self, feature: str, stale: Optional[_Entry] = None) -> FeatureRules:
+        with self._lock:
+            current = self._entries.get(feature)
+            if current is not None and current is not stale:
+                # Another thread compiled while we waited
+                return current.rules
+            path = feature_state_path(feature)
+            stat_key = _stat_key(path)
+            digest = _digest(path)
+            started = time.perf_counter()
+            try:
+                rules = FeatureRules.from_machine(feature, RustMachine(feature), digest)
+            except Exception as e:
+                if stale is None:
+                    raise
+                recorder = get_recorder()
+                if recorder is not None:
+                    recorder.inc("rules_reloads_total", (feature, "failed"))
+                # A broken edit must not take down a feature that was working
+                logger.warning(
+                    f"Failed to recompile state machine for '{feature}', keeping previous rules: {e}",
+                    extra={"feature": feature, "error": str(e)},
+                )
+                stale.stat_key = stat_key
+                stale.checked_at = time.monotonic()
+                return stale.rules
+            # Single dict store: readers see either the old or the new rules
+            self._entries[feature] = _Entry(rules=rules, stat_key=stat_key, checked_at=time.monotonic())
+            if stale is not None:
+                recorder = get_recorder()
+                if recorder is not None:
+                    recorder.observe("rules_reload_seconds", (feature,), time.perf_counter() - started)
+                    recorder.inc("rules_reloads_total", (feature, "success"))
+                logger.info(
+                    f"Reloaded state machine for '{feature}'",
+                    extra={"feature": feature, "operation": "rules_reload", "digest": digest},
+                )
+            return rules
+
+
+class RegistryWatcher:
+    """
+    Background thread that reloads compiled features when state.yaml changes.
+
+    Uses file system events from the optional ``watchfiles`` package when it
+    is installed (inotify on Linux), and mtime polling otherwise. Only
+    features already compiled are watched; others compile on first use.
+    """
+
+    def __init__(self, registry: FeatureRegistry, interval: float = 1.0, use_inotify: bool = True):
+        """
+        Initialize the watcher (call start() to run it).
+
+        Args:
+            registry: Registry whose features are reloaded
+            interval: Polling interval in seconds
+            use_inotify: Prefer ``watchfiles`` events over polling
+        """
+        self.registry = registry
+        self.interval = interval
+        self.use_inotify = use_inotify
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="ranex-registry-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        if self.use_inotify and self._run_events():
+            return
+        while not self._stop.wait(self.interval):
+            self._refresh()
+
+    def _run_events(self) -> bool:
+        """Follow file system events; returns False if they are unavailable."""
+        try:
+            from watchfiles import watch
+        except ImportError:
+            return False
+        root = features_root()
+        if not root.is_dir():
+            return False
+        for changes in watch(root, stop_event=self._stop, rust_timeout=int(self.interval * 1000)):
+            features = {
+                Path(path).parent.name for _, path in changes if Path(path).name == "state.yaml"
+            }
+            for feature in features:
+                self._refresh(feature)
+        return True
+
+    def _refresh(self, feature: Optional[str] = None) -> None:
+        try:
+            self.registry.refresh(feature)
+        except Exception as e:
+            # Keep watching; the next change gets another chance
+            logger.warning(f"State machine reload check failed: {e}", extra={"error": str(e)})
+
+
+# Global registry instance
+_registry: Optional[FeatureRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> FeatureRegistry:
+    """
+    Get or create the global feature registry.
+
+    Returns:
+        The process-wide FeatureRegistry instance
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FeatureRegistry()
+    return _registry
+
+
+# Export all public symbols
+__all__ = [
+    "StateTransitionError",
+    "TransitionResult",
+    "FeatureRules",
+    "FeatureMachine",
+    "FeatureRegistry",
+    "RegistryWatcher",
+    "get_registry",
+    "feature_state_path",
+    "features_root",
+]
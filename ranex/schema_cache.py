@@ -0,0 +1,204 @@
+"""
+Ranex Schema Cache.
+
+On-disk cache of the JSON schemas Contract generates for ``input_schema``
+models, so process startup (and every worker process) skips the costly
+``model_json_schema()`` call for models that have not changed:
+- Keyed by a fingerprint of the model's compiled Pydantic core schema,
+  plus the class-level inputs model_json_schema() reads on top of it
+  (docstrings, json_schema_extra, custom JSON-schema hooks), so editing
+  the model, or any model or enum it uses, changes the key
+- One JSON file per model under .ranex/schema-cache/
+  (or $RANEX_SCHEMA_CACHE_DIR; set RANEX_SCHEMA_CACHE=0 to disable)
+- Unreadable or read-only directories fall back to generating the schema
+
+Usage:
+    from ranex.schema_cache import get_schema_cache
+
+    schema = get_schema_cache().json_schema(OrderRequest)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger("ranex.contract")
+
+# Bump when the cached file layout or fingerprint recipe changes
+CACHE_FORMAT = 2
+
+DEFAULT_CACHE_DIR = Path(".ranex") / "schema-cache"
+
+# Process-specific parts of a core schema dump: object addresses in reprs
+# and the id() suffix Pydantic appends to model refs
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+_REF_ID = re.compile(r":\d{6,}(?=\")")
+
+
+def _code_digest(code: Any) -> str:
+    """Hash of a code object's bytecode, constants and names (stable across processes)."""
+    digest = hashlib.blake2b(code.co_code, digest_size=8)
+    for const in code.co_consts:
+        digest.update(_code_digest(const).encode() if hasattr(const, "co_code") else repr(const).encode())
+    digest.update(repr(code.co_names).encode())
+    return digest.hexdigest()
+
+
+def _stable_default(obj: Any) -> Any:
+    """json.dumps fallback that renders non-JSON objects the same in every process."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(repr(item) for item in obj)
+    qualname = getattr(obj, "__qualname__", None)
+    if not isinstance(qualname, str):
+        return repr(obj)
+    module = getattr(obj, "__module__", None) or ""
+    name = f"{module}.{qualname}"
+    if module.split(".", 1)[0] in ("pydantic", "pydantic_core"):
+        # Covered by the Pydantic version in the key
+        return name
+    if isinstance(obj, type):
+        # Classes (models, dataclasses, enums): model_json_schema() also reads
+        # their docstring and config, which the core schema leaves out
+        config = getattr(obj, "model_config", None) or getattr(obj, "__pydantic_config__", None) or {}
+        return [name, obj.__doc__, config.get("json_schema_extra"), config.get("json_schema_mode_override")]
+    code = getattr(getattr(obj, "__func__", obj), "__code__", None)
+    if code is not None:
+        # Functions (validators, serializers, JSON-schema hooks): by name and body
+        return [name, _code_digest(code)]
+    return name
+
+
+class SchemaCache:
+    """
+    Directory of generated JSON schemas keyed by model fingerprint.
+
+    Entries are never invalidated in place: a changed model gets a new key,
+    and clear() removes old files.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, enabled: Optional[bool] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory (default: $RANEX_SCHEMA_CACHE_DIR or .ranex/schema-cache)
+            enabled: Use the cache (default: unless $RANEX_SCHEMA_CACHE is 0/false/no)
+        """
+        if directory is None:
+            directory = os.environ.get("RANEX_SCHEMA_CACHE_DIR") or DEFAULT_CACHE_DIR
+        if enabled is None:
+            enabled = os.environ.get("RANEX_SCHEMA_CACHE", "1").lower() not in ("0", "false", "no")
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._writable = True
+
+    def fingerprint(self, model: Any) -> Optional[str]:
+        """
+        Hash of everything the model's JSON schema is generated from.
+
+        Uses the core schema Pydantic already built when the class was
+        defined, which embeds every field, constraint and nested model or
+        enum, plus the Pydantic and Python versions. Classes in it add their
+        docstring and json_schema_extra, and functions (including custom
+        __get_pydantic_json_schema__ hooks) their bytecode. Returns None for
+        models without a core schema.
+        """
+        core_schema = getattr(model, "__pydantic_core_schema__", None)
+        if not isinstance(core_schema, dict):
+            return None
+        try:
+            import pydantic
+
+            dump = json.dumps(core_schema, default=_stable_default)
+        except (ImportError, TypeError, ValueError):
+            return None
+        dump = _REF_ID.sub("", _ADDRESS.sub("", dump))
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(
+            f"{CACHE_FORMAT}:{pydantic.VERSION}:{sys.version_info[:2]}:{model.__module__}.{model.__qualname__}:".encode()
+        )
+        digest.update(dump.encode("utf-8"))
+        return digest.hexdigest()
+
+    def json_schema(self, model: Any) -> Dict[str, Any]:
+        """Return ``model.model_json_schema()``, from the cache when the model is unchanged."""
+        key = self.fingerprint(model) if self.enabled else None
+        if key is None:
+            return model.model_json_schema()
+        path = self.directory / f"{key}.json"
+        try:
+            schema = json.loads(path.read_bytes())
+            self.hits += 1
+            return schema
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable schema cache entry {path}: {e}")
+        schema = model.model_json_schema()
+        self.misses += 1
+        self._store(path, schema)
+        return schema
+
+    def _store(self, path: Path, schema: Dict[str, Any]) -> None:
+        if not self._writable:
+            return
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(schema, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, path)  # Atomic: concurrent workers never see a partial file
+        except OSError as e:
+            # e.g. a read-only container file system: keep generating, stop trying to write
+            self._writable = False
+            logger.debug(f"Schema cache directory {self.directory} is not writable: {e}")
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        """Delete every cached schema; returns the number of files removed."""
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+_cache: Optional[SchemaCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_schema_cache() -> SchemaCache:
+    """Get the process-wide schema cache used by Contract."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SchemaCache()
+    return _cache
+
+
+def set_schema_cache(cache: Optional[SchemaCache]) -> None:
+    """Replace the process-wide schema cache (None: rebuild from the environment on next use)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+# Export all public symbols
+__all__ = [
+    "SchemaCache",
+    "get_schema_cache",
+    "set_schema_cache",
+]
@@ -0,0 +1,272 @@
+"""
+Ranex Startup Warmup.
+
+Pays every feature's first-request costs before the app takes traffic:
+- Compiles each feature's state.yaml into the shared FeatureRegistry
+- Imports each feature's modules, which registers their Contract schemas
+- Runs features concurrently in a thread pool and reports per-feature timings
+
+Usage:
+    import ranex
+
+    report = ranex.warmup()
+    print(report.summary())
+
+    # FastAPI
+    from ranex.startup import warmup_lifespan
+
+    app = FastAPI(lifespan=warmup_lifespan())
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+from ranex.registry import FeatureRegistry, features_root, get_registry
+
+logger = logging.getLogger("ranex.contract")
+
+
+@dataclass
+class FeatureWarmup:
+    """
+    Warmup result for one feature.
+
+    Attributes:
+        feature: Feature name
+        compile_seconds: Time to compile state.yaml (0 if it has none)
+        import_seconds: Time to import the feature's modules
+        states: Number of states in the compiled machine
+        modules: Modules imported (their Contracts are now registered)
+        error: Error message if any step failed, else None
+    """
+    feature: str
+    compile_seconds: float = 0.0
+    import_seconds: float = 0.0
+    states: int = 0
+    modules: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return self.compile_seconds + self.import_seconds
+
+
+@dataclass
+class WarmupReport:
+    """
+    Timing report returned by warmup().
+
+    Attributes:
+        root: Features directory that was scanned
+        features: Per-feature results, in discovery order
+        total_seconds: Wall-clock time for the whole warmup
+    """
+    root: str
+    features: List[FeatureWarmup]
+    total_seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return all(f.error is None for f in self.features)
+
+    @property
+    def failed(self) -> List[FeatureWarmup]:
+        return [f for f in self.features if f.error is not None]
+
+    def raise_for_errors(self) -> None:
+        """Raise RuntimeError listing every feature that failed to warm up."""
+        if not self.ok:
+            details = "; ".join(f"{f.feature}: {f.error}" for f in self.failed)
+            raise RuntimeError(f"Warmup failed for {len(self.failed)} feature(s): {details}")
+
+    def summary(self) -> str:
+        """One line per feature plus a total, slowest first."""
+        lines = [
+            f"{f.feature}: {f.seconds * 1000:.1f}ms "
+            f"(compile {f.compile_seconds * 1000:.1f}ms, import {f.import_seconds * 1000:.1f}ms, "
+            f"{f.states} states, {len(f.modules)} modules)"
+            + (f" FAILED: {f.error}" if f.error else "")
+            for f in sorted(self.features, key=lambda f: f.seconds, reverse=True)
+        ]
+        lines.append(f"Warmed {len(self.features)} features in {self.total_seconds * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+def discover_features(root: Union[str, Path, None] = None) -> List[str]:
+    """
+    List feature directories under ``root`` (skipping ``__pycache__`` and friends).
+
+    Args:
+        root: Features directory (default: app/features, or $RANEX_APP_DIR/features)
+    """
+    features_dir = Path(root) if root is not None else features_root()
+    if not features_dir.is_dir():
+        return []
+    return sorted(p.name for p in features_dir.iterdir() if p.is_dir() and not p.name.startswith("__"))
+
+
+def _module_prefix(features_dir: Path) -> Optional[str]:
+    """Dotted package path of the features directory, if importable from the cwd."""
+    try:
+        relative = features_dir.resolve().relative_to(Path.cwd().resolve())
+    except ValueError:
+        return None
+    if not relative.parts:
+        return None
+    return ".".join(relative.parts)
+
+
+def _feature_modules(feature_dir: Path, prefix: str) -> List[str]:
+    modules = [f"{prefix}.{feature_dir.name}"] if (feature_dir / "__init__.py").exists() else []
+    for path in sorted(feature_dir.glob("*.py")):
+        if path.stem.startswith("_") or path.stem.startswith("test"):
+            continue
+        modules.append(f"{prefix}.{feature_dir.name}.{path.stem}")
+    return modules
+
+
+def _warm_feature(
+    feature: str, features_dir: Path, registry: FeatureRegistry, prefix: Optional[str]
+) -> FeatureWarmup:
+    result = FeatureWarmup(feature=feature)
+    feature_dir = features_dir / feature
+    errors: List[str] = []
+    if (feature_dir / "state.yaml").exists():
+        started = time.perf_counter()
+        try:
+            result.states = len(registry.get(feature).states)
+        except Exception as e:
+            errors.append(f"state.yaml: {type(e).__name__}: {e}")
+        result.compile_seconds = time.perf_counter() - started
+    if prefix is not None:
+        # One broken module must not stop the others from registering
+        started = time.perf_counter()
+        for module in _feature_modules(feature_dir, prefix):
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                errors.append(f"{module}: {type(e).__name__}: {e}")
+            else:
+                result.modules.append(module)
+        result.import_seconds = time.perf_counter() - started
+    if errors:
+        result.error = "; ".join(errors)
+        logger.warning(
+            f"Warmup failed for feature '{feature}': {result.error}",
+            extra={"feature": feature, "error": result.error},
+        )
+    return result
+
+
+def warmup(
+    root: Union[str, Path, None] = None,
+    import_modules: bool = True,
+    max_workers: Optional[int] = None,
+    registry: Optional[FeatureRegistry] = None,
+) -> WarmupReport:
+    """
+    Preload every feature's state machine and Contract schemas.
+
+    Failures are recorded in the report (and logged) rather than raised;
+    call ``report.raise_for_errors()`` to fail startup on them.
+
+    Args:
+        root: Features directory (default: app/features, or $RANEX_APP_DIR/features).
+            The Rust core only loads state.yaml files from $RANEX_APP_DIR/features,
+            so any other directory is rejected; set RANEX_APP_DIR instead.
+        import_modules: Import each feature's modules so their Contract
+            decorators run and register schemas. Needs ``root`` under the
+            current directory, which must be on sys.path.
+        max_workers: Thread pool size (default: min(8, cpu count))
+        registry: FeatureRegistry to fill (default: the global registry)
+
+    Returns:
+        WarmupReport with per-feature timings
+
+    Raises:
+        ValueError: If ``root`` is not the directory the Rust core loads features from
+    """
+    started = time.perf_counter()
+    features_dir = Path(root) if root is not None else features_root()
+    if features_dir.resolve() != features_root().resolve():
+        # Compiling goes through the registry, which always reads features_root():
+        # warming another directory would check one state.yaml and compile another
+        raise ValueError(
+            f"warmup(root={str(features_dir)!r}) does not match the features directory the "
+            f"Rust core loads from ({features_root()}); set RANEX_APP_DIR instead"
+        )
+    registry = registry if registry is not None else get_registry()
+    prefix = _module_prefix(features_dir) if import_modules else None
+    features = discover_features(features_dir)
+
+    results: List[FeatureWarmup] = []
+    if features:
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ranex-warmup") as pool:
+            results = list(pool.map(lambda f: _warm_feature(f, features_dir, registry, prefix), features))
+
+    report = WarmupReport(root=str(features_dir), features=results, total_seconds=time.perf_counter() - started)
+    logger.info(
+        f"Warmed {len(results)} features in {report.total_seconds * 1000:.1f}ms",
+        extra={
+            "operation": "warmup",
+            "features": len(results),
+            "failed": len(report.failed),
+            "duration_seconds": report.total_seconds,
+        },
+    )
+    return report
+
+
+def warmup_lifespan(
+    root: Union[str, Path, None] = None,
+    strict: bool = False,
+    lifespan: Optional[Callable[[Any], Any]] = None,
+    **kwargs: Any,
+) -> Callable[[Any], Any]:
+    """
+    Build a FastAPI/Starlette lifespan that runs warmup() before startup completes.
+
+    The report is stored on ``app.state.ranex_warmup``.
+
+    Args:
+        root: Features directory, as for warmup()
+        strict: Fail startup if any feature fails to warm up
+        lifespan: Your own lifespan to run after warmup (optional)
+        **kwargs: Passed through to warmup()
+    """
+    @asynccontextmanager
+    async def _lifespan(app: Any):
+        report = await asyncio.to_thread(warmup, root, **kwargs)
+        if strict:
+            report.raise_for_errors()
+        state = getattr(app, "state", None)
+        if state is not None:
+            state.ranex_warmup = report
+        if lifespan is None:
+            yield
+        else:
+            async with lifespan(app) as value:
+                yield value
+
+    return _lifespan
+
+
+# Export all public symbols
+__all__ = [
+    "FeatureWarmup",
+    "WarmupReport",
+    "discover_features",
+    "warmup",
+    "warmup_lifespan",
+]
@@ -0,0 +1,464 @@
+"""
+Ranex State Store.
+
+Persists the current state of each entity so Contract calls resume from
+where the entity left off instead of the feature's initial state.
+
+Keys are (feature, tenant_id, entity_id). Backends:
+- MemoryStateStore: bounded in-process LRU
+- SQLiteStateStore: SQLite in WAL mode with batched writes
+- RedisStateStore: shared across processes and nodes
+
+Every backend supports compare_and_set(), which Contract(optimistic=True)
+uses so two nodes cannot both move an entity out of the same state.
+
+Usage:
+    from ranex import Contract
+    from ranex.store import SQLiteStateStore
+
+    store = SQLiteStateStore(".ranex/state.db")
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id")
+    async def confirm_order(order_id: str, *, _ctx=None):
+        _ctx.transition("Confirmed")  # Validated from the stored state
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger("ranex.contract")
+
+StateKey = Tuple[str, str, str]
+
+# (feature, tenant_id, entity_id, expected_state, new_state)
+CompareAndSet = Tuple[str, str, str, Optional[str], str]
+
+
+class StateConflictError(RuntimeError):
+    """
+    Raised when an optimistic state write loses a race.
+
+    Another worker changed the entity between our read and our write; the
+    write was not applied. Safe to retry the whole operation.
+
+    Attributes:
+        feature: Feature name
+        tenant_id: Tenant of the entity
+        entity_id: Entity whose state changed underneath us
+        expected_state: State read at the start (None if it was unset)
+        attempted_state: State we tried to write
+        retryable: Always True
+    """
+
+    retryable = True
+
+    def __init__(
+        self,
+        feature: str,
+        tenant_id: str,
+        entity_id: str,
+        expected_state: Optional[str],
+        attempted_state: str,
+    ):
+        super().__init__(
+            f"State of '{feature}:{tenant_id}:{entity_id}' changed concurrently; "
+            f"expected '{expected_state}', could not write '{attempted_state}'"
+        )
+        self.feature = feature
+        self.tenant_id = tenant_id
+        self.entity_id = entity_id
+        self.expected_state = expected_state
+        self.attempted_state = attempted_state
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (
+            type(self),
+            (self.feature, self.tenant_id, self.entity_id, self.expected_state, self.attempted_state),
+        )
+
+
+class StateStore(ABC):
+    """
+    Interface for entity state persistence.
+
+    Implementations must be safe to call from multiple threads.
+    """
+
+    @abstractmethod
+    def get(self, feature: str, tenant_id: str, entity_id: str) -> Optional[str]:
+        """Return the stored state, or None if the entity is unknown."""
+
+    @abstractmethod
+    def set(self, feature: str, tenant_id: str, entity_id: str, state: str) -> None:
+        """Store the current state of an entity."""
+
+    @abstractmethod
+    def delete(self, feature: str, tenant_id: str, entity_id: str) -> None:
+        """Forget an entity."""
+
+    @abstractmethod
+    def compare_and_set(
+        self, feature: str, tenant_id: str, entity_id: str, expected: Optional[str], state: str
+    ) -> bool:
+        """
+        Atomically store ``state`` only if the current state is ``expected``.
+
+        Args:
+            expected: State read earlier, or None if the entity was unknown
+
+        Returns:
+            True if written, False if the stored state no longer matched
+        """
+
+    def compare_and_set_many(self, operations: Sequence[CompareAndSet]) -> List[bool]:
+        """
+        Apply several compare_and_set operations, as few round-trips as the backend allows.
+
+        Each operation succeeds or fails on its own. Returns one bool per operation.
+        """
+        return [self.compare_and_set(*op) for op in operations]
+
+    def flush(self) -> None:
+        """Write any buffered changes to the backend."""
+
+    def close(self) -> None:
+        """Flush and release backend resources."""
+        self.flush()
+
+
+class MemoryStateStore(StateStore):
+    """
+    In-process LRU state store.
+
+    Suitable for single-process deployments and tests. The least recently
+    used entities are evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of entities kept in memory
+        """
+        self.max_entries = max_entries
+        self._data: OrderedDict[StateKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, feature: str, tenant_id: str, entity_id: str) -> Optional[str]:
+        key = (feature, tenant_id, entity_id)
+        with self._lock:
+            state = self._data.get(key)
+            if state is not None:
+                self._data.move_to_end(key)
+            return state
+
+    def set(self, feature: str, tenant_id: str, entity_id: str, state: str) -> None:
+        key = (feature, tenant_id, entity_id)
+        with self._lock:
+            self._data[key] = state
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, feature: str, tenant_id: str, entity_id: str) -> None:
+        with self._lock:
+            self._data.pop((feature, tenant_id, entity_id), None)
+
+    def compare_and_set(
+        self, feature: str, tenant_id: str, entity_id: str, expected: Optional[str], state: str
+    ) -> bool:
+        key = (feature, tenant_id, entity_id)
+        with self._lock:
+            if self._data.get(key) != expected:
+                return False
+            self._data[key] = state
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    SQLite-backed state store.
+
+    Runs in WAL mode so readers never block the writer. Writes are buffered
+    and committed in one transaction once ``batch_size`` changes are pending,
+    or by a background timer at most ``flush_interval`` seconds after the
+    first buffered write. Reads through this store see buffered writes at
+    once; other processes on the same file see them once committed.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ranex_state (
+            feature TEXT NOT NULL,
+            tenant_id TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (feature, tenant_id, entity_id)
+        ) WITHOUT ROWID
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ".ranex/state.db",
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: Database file (created with its parent directory if missing)
+            batch_size: Pending writes that trigger a commit
+            flush_interval: Maximum seconds a write stays buffered before a
+                background timer commits it (0: commit on every write)
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self._SCHEMA)
+
+        # Pending writes; None marks a pending delete
+        self._pending: Dict[StateKey, Optional[str]] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.close)
+
+    def get(self, feature: str, tenant_id: str, entity_id: str) -> Optional[str]:
+        key = (feature, tenant_id, entity_id)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            row = self._conn.execute(
+                "SELECT state FROM ranex_state WHERE feature = ? AND tenant_id = ? AND entity_id = ?",
+                key,
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, feature: str, tenant_id: str, entity_id: str, state: str) -> None:
+        self._buffer((feature, tenant_id, entity_id), state)
+
+    def delete(self, feature: str, tenant_id: str, entity_id: str) -> None:
+        self._buffer((feature, tenant_id, entity_id), None)
+
+    def compare_and_set(
+        self, feature: str, tenant_id: str, entity_id: str, expected: Optional[str], state: str
+    ) -> bool:
+        return self.compare_and_set_many([(feature, tenant_id, entity_id, expected, state)])[0]
+
+    def compare_and_set_many(self, operations: Sequence[CompareAndSet]) -> List[bool]:
+        """Apply the operations in one immediate transaction (safe across processes)."""
+        results = []
+        now = time.time()
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for feature, tenant_id, entity_id, expected, state in operations:
+                    if expected is None:
+                        cursor = self._conn.execute(
+                            "INSERT OR IGNORE INTO ranex_state (feature, tenant_id, entity_id, state, updated_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (feature, tenant_id, entity_id, state, now),
+                        )
+                    else:
+                        cursor = self._conn.execute(
+                            "UPDATE ranex_state SET state = ?, updated_at = ? "
+                            "WHERE feature = ? AND tenant_id = ? AND entity_id = ? AND state = ?",
+                            (state, now, feature, tenant_id, entity_id, expected),
+                        )
+                    results.append(cursor.rowcount == 1)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def _buffer(self, key: StateKey, state: Optional[str]) -> None:
+        with self._lock:
+            self._pending[key] = state
+            if (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+            elif self._timer is None:
+                # Bound how long other processes can read a stale state
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._conn is None:
+                return
+            try:
+                self._flush_locked()
+            except sqlite3.Error as e:
+                # Writes stay pending and are retried by the next write or flush()
+                logger.warning(
+                    f"Failed to flush buffered state writes to {self.path}: {e}",
+                    extra={"path": str(self.path), "pending": len(self._pending), "error": str(e)},
+                )
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        now = time.time()
+        upserts = [(*key, state, now) for key, state in self._pending.items() if state is not None]
+        deletes = [key for key, state in self._pending.items() if state is None]
+        self._conn.execute("BEGIN")
+        try:
+            if upserts:
+                self._conn.executemany(
+                    "INSERT INTO ranex_state (feature, tenant_id, entity_id, state, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (feature, tenant_id, entity_id) "
+                    "DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                    upserts,
+                )
+            if deletes:
+                self._conn.executemany(
+                    "DELETE FROM ranex_state WHERE feature = ? AND tenant_id = ? AND entity_id = ?",
+                    deletes,
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
+
+
+class RedisStateStore(StateStore):
+    """
+    Redis-backed state store shared by every process and node.
+
+    Each entity is a plain string key ``{prefix}{feature}:{tenant}:{entity}``.
+    Pass an existing client (or any object with the same get/set/delete
+    methods) or a URL.
+
+    compare_and_set uses WATCH/MULTI/EXEC; compare_and_set_many watches
+    every key, reads them with one MGET and writes the matching ones in a
+    single MULTI/EXEC, so a batch costs three round-trips in total.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "ranex:state:",
+        ttl_seconds: Optional[int] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            client: Redis client to use; created from ``url`` if omitted
+            url: Redis connection URL
+            prefix: Key prefix for all state keys
+            ttl_seconds: Optional expiry applied on every write
+        """
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def key(self, feature: str, tenant_id: str, entity_id: str) -> str:
+        """Build the Redis key for an entity."""
+        return f"{self.prefix}{feature}:{tenant_id}:{entity_id}"
+
+    def get(self, feature: str, tenant_id: str, entity_id: str) -> Optional[str]:
+        value = self.client.get(self.key(feature, tenant_id, entity_id))
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    def set(self, feature: str, tenant_id: str, entity_id: str, state: str) -> None:
+        self.client.set(self.key(feature, tenant_id, entity_id), state, ex=self.ttl_seconds)
+
+    def delete(self, feature: str, tenant_id: str, entity_id: str) -> None:
+        self.client.delete(self.key(feature, tenant_id, entity_id))
+
+    def compare_and_set(
+        self, feature: str, tenant_id: str, entity_id: str, expected: Optional[str], state: str
+    ) -> bool:
+        return self.compare_and_set_many([(feature, tenant_id, entity_id, expected, state)])[0]
+
+    def compare_and_set_many(self, operations: Sequence[CompareAndSet]) -> List[bool]:
+        from redis.exceptions import WatchError
+
+        if not operations:
+            return []
+        keys = [self.key(feature, tenant_id, entity_id) for feature, tenant_id, entity_id, _, _ in operations]
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(*keys)
+                current = pipe.mget(keys)
+                matched = [
+                    (value.decode("utf-8") if isinstance(value, bytes) else value) == op[3]
+                    for value, op in zip(current, operations)
+                ]
+                pipe.multi()
+                for key, op, ok in zip(keys, operations, matched):
+                    if ok:
+                        pipe.set(key, op[4], ex=self.ttl_seconds)
+                pipe.execute()
+                return matched
+            except WatchError:
+                pass
+        if len(operations) == 1:
+            return [False]
+        # Some watched key changed mid-batch: settle each operation on its own
+        return [self.compare_and_set(*op) for op in operations]
+
+
+# Export all public symbols
+__all__ = [
+    "StateConflictError",
+    "StateStore",
+    "MemoryStateStore",
+    "SQLiteStateStore",
+    "RedisStateStore",
+]
@@ -0,0 +1,344 @@
+"""
+Ranex Schema Validation Helpers.
+
+Support code for Contract's ``input_schema`` checks:
+- ValidatedCache: remembers recently validated objects by identity, and
+  str/bytes bodies by content digest
+- estimate_payload_size: cheap, early-exit size estimate of a payload
+- Bounded thread pool for validating large payloads off the event loop
+- SchemaValidatorPool: one compiled validator per thread on free-threaded builds
+- validate_many: a whole list checked in one native call, failures located by bisection
+
+Usage:
+    from ranex.validation import ValidatedCache
+
+    cache = ValidatedCache(max_entries=1024)
+    if not cache.contains(payload):
+        validate(payload)
+        cache.add(payload)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Sub-lists this short are checked item by item when locating failures
+_BISECT_MIN = 16
+
+
+def gil_disabled() -> bool:
+    """Return True when running on a free-threaded (no-GIL) interpreter with the GIL off."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+class ValidatedCache:
+    """
+    Bounded cache of payloads that already passed validation.
+
+    Immutable ``str`` and ``bytes`` bodies are remembered by a content
+    digest, so a repeated request body hits even as a new object. Other
+    objects are remembered by identity through weak references, so an
+    object is forgotten when it is garbage collected and a recycled
+    ``id()`` can never produce a false hit. Objects that are neither
+    (dict, list, bytearray, ...) are never cached and are always validated.
+
+    Note: an object mutated after validation is not re-validated while it
+    stays cached; only use this for payloads treated as immutable.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of remembered objects, and separately
+                of remembered body digests (LRU eviction)
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, weakref.ref] = OrderedDict()
+        self._digests: OrderedDict[bytes, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(obj: Any) -> Optional[bytes]:
+        """Content key for immutable bodies, or None for anything else."""
+        kind = type(obj)
+        if kind is bytes:
+            return b"b" + hashlib.blake2b(obj, digest_size=16).digest()
+        if kind is str:
+            return b"s" + hashlib.blake2b(obj.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        return None
+
+    def contains(self, obj: Any) -> bool:
+        """Return True if ``obj`` (or, for str/bytes, an equal body) was validated recently."""
+        digest = self._digest(obj)
+        if digest is not None:
+            return digest in self._digests
+        ref = self._entries.get(id(obj))
+        return ref is not None and ref() is obj
+
+    def add(self, obj: Any) -> None:
+        """Remember ``obj`` as validated (no-op if it can be neither hashed nor weak-referenced)."""
+        digest = self._digest(obj)
+        if digest is not None:
+            with self._lock:
+                self._digests[digest] = None
+                self._digests.move_to_end(digest)
+                while len(self._digests) > self.max_entries:
+                    self._digests.popitem(last=False)
+            return
+        key = id(obj)
+        try:
+            ref = weakref.ref(obj, lambda _ref, key=key: self._discard(key, _ref))
+        except TypeError:
+            return
+        with self._lock:
+            self._entries[key] = ref
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _discard(self, key: int, ref: weakref.ref) -> None:
+        with self._lock:
+            if self._entries.get(key) is ref:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._digests)
+
+
+def estimate_payload_size(obj: Any, limit: int) -> int:
+    """
+    Estimate the serialized size of a payload in bytes.
+
+    Walks containers and stops as soon as the running total exceeds
+    ``limit``, so the cost is bounded by the threshold, not the payload.
+
+    Args:
+        obj: Payload (bytes, str, dict, list, scalars, ...)
+        limit: Size above which the exact value no longer matters
+
+    Returns:
+        Estimated size; any value above ``limit`` means "larger than limit"
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return obj.nbytes if isinstance(obj, memoryview) else len(obj)
+    if isinstance(obj, str):
+        return len(obj)
+
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            total += len(item) + 2
+        elif isinstance(item, (bytes, bytearray)):
+            total += len(item)
+        elif isinstance(item, dict):
+            total += 2
+            for key, value in item.items():
+                total += len(key) + 3 if isinstance(key, str) else 8
+                stack.append(value)
+        elif isinstance(item, (list, tuple)):
+            total += 2 + len(item)
+            stack.extend(item)
+        else:
+            total += 8
+        if total > limit:
+            break
+    return total
+
+
+@dataclass(slots=True)
+class ManyValidationResult:
+    """
+    Outcome of validating a list of payloads against one schema.
+
+    Only failing items are described, keyed by their index in the list.
+    Index -1 holds list-level errors that could not be pinned on an item.
+    """
+    count: int
+    errors: Dict[int, List[str]] = field(default_factory=dict)
+    field_errors: Dict[int, Any] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def failed_indices(self) -> List[int]:
+        return sorted(self.errors)
+
+    def __bool__(self) -> bool:
+        return not self.errors
+
+
+def _array_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap an object schema as "array of it", keeping $defs at the root so refs resolve."""
+    hoisted = ("$defs", "definitions", "$schema")
+    wrapped: Dict[str, Any] = {key: schema[key] for key in hoisted if key in schema}
+    wrapped["type"] = "array"
+    wrapped["items"] = {key: value for key, value in schema.items() if key not in hoisted}
+    return wrapped
+
+
+class SchemaValidatorPool:
+    """
+    Registry of input schemas in front of the Rust SchemaValidator.
+
+    With the GIL on, one validator is shared by every thread, as before.
+    Without it, a single native validator would be mutably borrowed by
+    ``register_schema`` while other threads validate, so each thread gets
+    its own validator instead; it compiles the registered schemas on its
+    first use and picks up schemas registered later on its next call.
+    """
+
+    def __init__(self, factory: Callable[[], Any], per_thread: Optional[bool] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Creates an empty validator (e.g. ranex_core.SchemaValidator)
+            per_thread: One validator per thread (default: only when the GIL is off)
+        """
+        self._factory = factory
+        self.per_thread = gil_disabled() if per_thread is None else per_thread
+        self._schemas: Dict[str, Any] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shared = None if self.per_thread else factory()
+
+    def register_schema(self, name: str, schema: Any) -> None:
+        """Register (or replace) a JSON schema under ``name`` for every thread."""
+        with self._lock:
+            # Compile once here so an invalid schema fails at registration,
+            # not later on every thread's first validation
+            (self._shared if self._shared is not None else self._factory()).register_schema(name, schema)
+            self._schemas[name] = schema
+            self._schemas.pop(name + "[]", None)  # Rebuilt from the new schema on next use
+            self._version += 1
+
+    def validate(self, name: str, payload: Any) -> Any:
+        """Validate ``payload`` against schema ``name``; returns the validator's result."""
+        validator = self._shared
+        if validator is None:
+            local = self._local
+            validator = getattr(local, "validator", None)
+            if validator is None or local.version != self._version:
+                validator = self._sync_thread()
+        return validator.validate(name, payload)
+
+    def validate_many(self, name: str, items: Sequence[Any]) -> ManyValidationResult:
+        """
+        Validate every item of a list against schema ``name``.
+
+        The whole list is checked in one native call against an "array of
+        ``name``" schema (compiled on first use). Only if that fails are
+        halves re-checked, down to single items, to find which ones failed,
+        so valid lists cost one call and one result object.
+        """
+        list_name = self._list_schema(name)
+        if not isinstance(items, list):
+            items = list(items)
+        outcome = ManyValidationResult(len(items))
+        result = self.validate(list_name, items)
+        if result.valid:
+            return outcome
+        self._locate(name, list_name, items, 0, outcome)
+        if not outcome.errors:
+            outcome.errors[-1] = list(result.errors)
+            outcome.field_errors[-1] = result.field_errors
+        return outcome
+
+    def _locate(self, name: str, list_name: str, items: List[Any], offset: int, outcome: ManyValidationResult) -> None:
+        """Record the failing items of ``items``, which is known to contain at least one."""
+        if len(items) <= _BISECT_MIN:
+            for index, item in enumerate(items):
+                result = self.validate(name, item)
+                if not result.valid:
+                    outcome.errors[offset + index] = list(result.errors)
+                    outcome.field_errors[offset + index] = result.field_errors
+            return
+        middle = len(items) // 2
+        for start, part in ((0, items[:middle]), (middle, items[middle:])):
+            if not self.validate(list_name, part).valid:
+                self._locate(name, list_name, part, offset + start, outcome)
+
+    def _list_schema(self, name: str) -> str:
+        list_name = name + "[]"
+        if list_name not in self._schemas:
+            with self._lock:
+                if list_name not in self._schemas:
+                    if name not in self._schemas:
+                        raise ValueError(f"Schema '{name}' is not registered")
+                    wrapped = _array_schema(self._schemas[name])
+                    (self._shared if self._shared is not None else self._factory()).register_schema(list_name, wrapped)
+                    self._schemas[list_name] = wrapped
+                    self._version += 1
+        return list_name
+
+    def _sync_thread(self) -> Any:
+        local = self._local
+        validator = getattr(local, "validator", None)
+        if validator is None:
+            validator = local.validator = self._factory()
+            local.registered = {}
+        with self._lock:
+            version = self._version
+            pending = [
+                (name, schema) for name, schema in self._schemas.items()
+                if local.registered.get(name) is not schema
+            ]
+        for name, schema in pending:
+            validator.register_schema(name, schema)
+            local.registered[name] = schema
+        local.version = version
+        return validator
+
+
+# Pool shared by every Contract that offloads validation
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_max_workers = min(4, os.cpu_count() or 1)
+
+
+def set_validation_workers(max_workers: int) -> None:
+    """
+    Set the size of the validation thread pool.
+
+    Must be called before the first offloaded validation to take effect.
+    """
+    global _max_workers
+    _max_workers = max(1, max_workers)
+
+
+def get_validation_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded validation thread pool."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="ranex-validate")
+    return _executor
+
+
+# Export all public symbols
+__all__ = [
+    "ValidatedCache",
+    "SchemaValidatorPool",
+    "ManyValidationResult",
+    "gil_disabled",
+    "estimate_payload_size",
+    "set_validation_workers",
+    "get_validation_executor",
+]
@@ -0,0 +1,134 @@
+"""
+Shared fixtures for the Ranex test suite.
+
+The ranex package imports the compiled ranex_core module, so every test
+module starts with ``pytest.importorskip("ranex_core")``.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+ORDERS_STATE_YAML = """\
+feature: orders
+initial_state: Pending
+states:
+  Pending: {}
+  Confirmed: {}
+  Processing: {}
+  Shipped: {}
+  Delivered: {terminal: true}
+  Cancelled: {terminal: true}
+transitions:
+  - { from: Pending, to: Confirmed }
+  - { from: Pending, to: Cancelled }
+  - { from: Confirmed, to: Processing }
+  - { from: Processing, to: Shipped }
+  - { from: Shipped, to: Delivered }
+"""
+
+
+@pytest.fixture(autouse=True)
+def schema_cache_dir(tmp_path, monkeypatch):
+    """Keep Contract's on-disk schema cache out of the working tree."""
+    directory = tmp_path / "schema-cache"
+    monkeypatch.setenv("RANEX_SCHEMA_CACHE_DIR", str(directory))
+    module = sys.modules.get("ranex.schema_cache")
+    if module is not None:
+        # Rebuilt from the environment on next use
+        monkeypatch.setattr(module, "_cache", None)
+    return directory
+
+
+@pytest.fixture
+def orders_feature(tmp_path, monkeypatch):
+    """An "orders" feature under a temporary RANEX_APP_DIR, compiled fresh."""
+    from ranex.registry import get_registry
+
+    feature_dir = tmp_path / "app" / "features" / "orders"
+    feature_dir.mkdir(parents=True)
+    (feature_dir / "state.yaml").write_text(ORDERS_STATE_YAML)
+    monkeypatch.setenv("RANEX_APP_DIR", str(tmp_path / "app"))
+    get_registry().invalidate()
+    yield "orders"
+    get_registry().invalidate()
+
+
+class FakeRedisPipeline:
+    """The WATCH/MULTI/EXEC subset of redis-py's Pipeline used by the stores."""
+
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.watched: Dict[str, int] = {}
+        self.queued: List[Callable[[], Any]] = []
+
+    def __enter__(self) -> "FakeRedisPipeline":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.watched.clear()
+        self.queued.clear()
+
+    def watch(self, *keys: str) -> None:
+        self.watched = {key: self.client.versions.get(key, 0) for key in keys}
+        if self.client.on_watch is not None:
+            self.client.on_watch()
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def multi(self) -> None:
+        self.queued = []
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> None:
+        self.queued.append(lambda: self.client.set(key, value, ex=ex))
+
+    def execute(self) -> List[Any]:
+        from redis.exceptions import WatchError
+
+        if any(self.client.versions.get(key, 0) != version for key, version in self.watched.items()):
+            raise WatchError("Watched variable changed")
+        return [command() for command in self.queued]
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for a redis-py client (bytes values, like the real one).
+
+    ``on_watch`` runs right after WATCH, to simulate another node writing
+    between our read and our EXEC.
+    """
+
+    def __init__(self) -> None:
+        self.data: Dict[str, bytes] = {}
+        self.expiry: Dict[str, Optional[int]] = {}
+        self.versions: Dict[str, int] = {}
+        self.on_watch: Optional[Callable[[], None]] = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode("utf-8")
+        self.expiry[key] = ex
+        self.versions[key] = self.versions.get(key, 0) + 1
+        return True
+
+    def delete(self, key: str) -> int:
+        self.versions[key] = self.versions.get(key, 0) + 1
+        self.expiry.pop(key, None)
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def pipeline(self) -> FakeRedisPipeline:
+        return FakeRedisPipeline(self)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
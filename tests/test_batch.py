@@ -0,0 +1,123 @@
+"""Tests for Contract batches (ranex.batch)."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex import Contract, StateConflictError, StateTransitionError
+from ranex.store import MemoryStateStore
+
+
+def test_failing_item_is_rolled_back_alone(orders_feature):
+    store = MemoryStateStore()
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id")
+    def confirm(order_id: str, *, _ctx=None):
+        _ctx.transition("Confirmed")
+        if order_id == "bad":
+            raise RuntimeError("payment declined")
+        return order_id.upper()
+
+    results = confirm.batch(["a", "bad", "c"])
+    assert [r.ok for r in results] == [True, False, True]
+    assert [r.state for r in results] == ["Confirmed", "Pending", "Confirmed"]
+    assert results[0].result == "A"
+    assert isinstance(results[1].error, RuntimeError)
+    assert store.get("orders", "default", "a") == "Confirmed"
+    assert store.get("orders", "default", "bad") is None
+
+
+def test_target_rejects_items_without_running_them(orders_feature):
+    calls = []
+
+    @Contract(feature="orders")
+    def ship(order_id: str, *, _ctx=None):
+        calls.append(order_id)
+        _ctx.transition("Shipped")
+
+    results = ship.batch(["a", "b"], states=["Processing", "Pending"], target="Shipped")
+    assert calls == ["a"]
+    assert results[0].ok and results[0].state == "Shipped"
+    assert isinstance(results[1].error, StateTransitionError)
+    assert results[1].state == "Pending"
+
+
+def test_conflicting_items_fail_with_state_conflict(orders_feature):
+    store = MemoryStateStore()
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id", optimistic=True)
+    def confirm(order_id: str, *, _ctx=None):
+        _ctx.transition("Confirmed")
+        if order_id == "raced":
+            store.set("orders", "default", "raced", "Cancelled")  # Another node got there first
+
+    results = confirm.batch(["a", "raced"])
+    assert [r.ok for r in results] == [True, False]
+    assert isinstance(results[1].error, StateConflictError)
+    assert store.get("orders", "default", "raced") == "Cancelled"
+
+
+def test_items_bind_to_the_entity_parameter_by_name(orders_feature):
+    store = MemoryStateStore()
+    store.set("orders", "default", "ORD-2", "Confirmed")
+    seen = []
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id")
+    def process(warehouse: str, order_id: str, *, _ctx=None):
+        seen.append((warehouse, order_id))
+        _ctx.transition("Processing")
+
+    results = process.batch(["ORD-1", "ORD-2"], warehouse="north")
+    assert seen == [("north", "ORD-1"), ("north", "ORD-2")]
+    assert [r.ok for r in results] == [False, True]
+    assert store.get("orders", "default", "ORD-2") == "Processing"
+    assert store.get("orders", "default", "north") is None
+
+
+def test_items_bind_to_the_schema_parameter_by_name(orders_feature):
+    pydantic = pytest.importorskip("pydantic")
+
+    class Order(pydantic.BaseModel):
+        order_id: str
+
+    @Contract(feature="orders", input_schema=Order, raw_body=True)
+    def confirm(source: str, order: Order, *, _ctx=None):
+        _ctx.transition("Confirmed")
+        return (source, order.order_id)
+
+    results = confirm.batch([b'{"order_id": "ORD-1"}', b"{}"], source="api")
+    assert results[0].result == ("api", "ORD-1")
+    assert not results[1].ok and "Schema validation failed" in str(results[1].error)
+
+
+def test_conflicting_item_parameters_are_rejected(orders_feature):
+    pydantic = pytest.importorskip("pydantic")
+
+    class Order(pydantic.BaseModel):
+        order_id: str
+
+    @Contract(feature="orders", input_schema=Order, state_store=MemoryStateStore(), entity_key="order_id")
+    def confirm(order: Order, order_id: str, *, _ctx=None):
+        _ctx.transition("Confirmed")
+
+    with pytest.raises(ValueError, match="input_schema binds 'order' and entity_key 'order_id'"):
+        confirm.batch([{"order_id": "ORD-1"}])
+
+
+def test_async_batch_runs_items_concurrently(orders_feature):
+    running = 0
+    peak = 0
+
+    @Contract(feature="orders")
+    async def confirm(order_id: str, *, _ctx=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        _ctx.transition("Confirmed")
+
+    results = asyncio.run(confirm.batch([str(n) for n in range(6)], concurrency=3))
+    assert all(results) and peak == 3
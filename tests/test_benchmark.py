@@ -0,0 +1,21 @@
+"""Tests for the Contract benchmark regression gate (ranex.benchmark)."""
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex.benchmark import compare_to_baseline
+
+RESULTS = {"sync/noschema": {"overhead_median_ns": 1000.0, "overhead_p99_ns": 2000.0}}
+
+
+def test_missing_baseline_passes_only_when_not_strict():
+    assert compare_to_baseline(RESULTS, None) == []
+    with pytest.raises(ValueError):
+        compare_to_baseline(RESULTS, None, strict=True)
+
+
+def test_strict_flags_cases_absent_from_baseline():
+    baseline = {"results": {}}
+    assert compare_to_baseline(RESULTS, baseline) == []
+    assert compare_to_baseline(RESULTS, baseline, strict=True) == ["sync/noschema: not in baseline"]
@@ -0,0 +1,70 @@
+"""Tests for Bulkhead limits shared across threads and event loops."""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex.bulkhead import Bulkhead, BulkheadFullError
+
+
+def test_bulkhead_works_across_event_loops():
+    bulkhead = Bulkhead("orders", max_concurrent=1, max_queue=1)
+
+    async def hold_and_queue():
+        first = await bulkhead.acquire_async("t1")
+        waiter = asyncio.ensure_future(bulkhead.acquire_async("t1"))
+        await asyncio.sleep(0)
+        first.release()
+        (await waiter).release()
+
+    # A second loop must not trip over primitives bound to the first
+    asyncio.run(hold_and_queue())
+    asyncio.run(hold_and_queue())
+
+
+def test_sync_and_async_callers_share_one_limit():
+    bulkhead = Bulkhead("orders", max_concurrent=1)
+    permit = bulkhead.acquire("t1")
+
+    async def call():
+        await bulkhead.acquire_async("t1")
+
+    with pytest.raises(BulkheadFullError) as exc:
+        asyncio.run(call())
+    assert exc.value.scope == "feature"
+
+    permit.release()
+    asyncio.run(call())
+
+
+def test_release_from_thread_wakes_async_waiter():
+    bulkhead = Bulkhead("orders", max_concurrent_per_tenant=1, max_queue=1, timeout=5.0)
+    permit = bulkhead.acquire("t1")
+
+    async def wait_for_slot():
+        threading.Timer(0.05, permit.release).start()
+        queued = await bulkhead.acquire_async("t1")
+        queued.release()
+
+    asyncio.run(wait_for_slot())
+    assert bulkhead._tenants == {}
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    bulkhead = Bulkhead("orders", max_concurrent=1, max_queue=1)
+
+    async def cancel_waiter():
+        held = await bulkhead.acquire_async("t1")
+        waiter = asyncio.ensure_future(bulkhead.acquire_async("t1"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        held.release()
+        (await bulkhead.acquire_async("t1")).release()
+
+    asyncio.run(cancel_waiter())
+    assert bulkhead._feature.active == 0
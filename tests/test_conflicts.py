@@ -0,0 +1,116 @@
+"""Tests for optimistic compare-and-set writes and StateConflictError."""
+
+import pickle
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex import Contract, StateConflictError
+from ranex.store import MemoryStateStore, RedisStateStore, SQLiteStateStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path, fake_redis):
+    if request.param == "memory":
+        yield MemoryStateStore()
+    elif request.param == "sqlite":
+        store = SQLiteStateStore(tmp_path / "state.db")
+        yield store
+        store.close()
+    else:
+        yield RedisStateStore(client=fake_redis)
+
+
+def test_compare_and_set_rejects_stale_expected_state(store):
+    store.set("orders", "default", "ORD-1", "Confirmed")
+    assert not store.compare_and_set("orders", "default", "ORD-1", "Pending", "Cancelled")
+    assert store.get("orders", "default", "ORD-1") == "Confirmed"
+
+
+def test_compare_and_set_with_none_requires_unknown_entity(store):
+    store.set("orders", "default", "ORD-1", "Confirmed")
+    assert not store.compare_and_set("orders", "default", "ORD-1", None, "Pending")
+    assert store.get("orders", "default", "ORD-1") == "Confirmed"
+
+
+def test_compare_and_set_many_settles_each_operation(store):
+    store.set("orders", "default", "a", "Pending")
+    store.set("orders", "default", "b", "Confirmed")
+    written = store.compare_and_set_many([
+        ("orders", "default", "a", "Pending", "Confirmed"),
+        ("orders", "default", "b", "Pending", "Confirmed"),
+        ("orders", "default", "c", None, "Pending"),
+    ])
+    assert written == [True, False, True]
+    assert store.get("orders", "default", "b") == "Confirmed"
+    assert store.get("orders", "default", "c") == "Pending"
+
+
+def test_sqlite_conflict_between_two_stores_on_one_file(tmp_path):
+    first = SQLiteStateStore(tmp_path / "state.db")
+    second = SQLiteStateStore(tmp_path / "state.db")
+    try:
+        assert first.compare_and_set("orders", "default", "ORD-1", None, "Confirmed")
+        assert not second.compare_and_set("orders", "default", "ORD-1", None, "Cancelled")
+        assert second.get("orders", "default", "ORD-1") == "Confirmed"
+    finally:
+        first.close()
+        second.close()
+
+
+def test_redis_write_between_watch_and_exec_is_a_conflict(fake_redis):
+    store = RedisStateStore(client=fake_redis)
+    store.set("orders", "default", "ORD-1", "Pending")
+    # Another node moves the entity after our WATCH, before our EXEC
+    fake_redis.on_watch = lambda: fake_redis.set(store.key("orders", "default", "ORD-1"), "Cancelled")
+    assert not store.compare_and_set("orders", "default", "ORD-1", "Pending", "Confirmed")
+    fake_redis.on_watch = None
+    assert store.get("orders", "default", "ORD-1") == "Cancelled"
+
+
+def test_state_conflict_error_is_retryable_and_picklable():
+    error = StateConflictError("orders", "acme", "ORD-1", "Pending", "Confirmed")
+    assert error.retryable
+    copy = pickle.loads(pickle.dumps(error))
+    assert (copy.entity_id, copy.expected_state, copy.attempted_state) == ("ORD-1", "Pending", "Confirmed")
+
+
+def test_optimistic_contract_raises_on_concurrent_change(orders_feature, store):
+    store.set("orders", "default", "ORD-1", "Pending")
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id", optimistic=True)
+    def confirm(order_id, *, _ctx=None):
+        _ctx.transition("Confirmed")
+        # Another worker cancels the order while we run
+        store.set("orders", "default", order_id, "Cancelled")
+
+    with pytest.raises(StateConflictError) as exc:
+        confirm("ORD-1")
+    assert exc.value.expected_state == "Pending"
+    assert exc.value.attempted_state == "Confirmed"
+    assert store.get("orders", "default", "ORD-1") == "Cancelled"
+
+
+def test_optimistic_contract_writes_when_uncontended(orders_feature, store):
+    @Contract(feature="orders", state_store=store, entity_key="order_id", optimistic=True)
+    def confirm(order_id, *, _ctx=None):
+        _ctx.transition("Confirmed")
+
+    confirm("ORD-1")
+    assert store.get("orders", "default", "ORD-1") == "Confirmed"
+
+
+def test_optimistic_batch_marks_conflicted_items_failed(orders_feature, store):
+    @Contract(feature="orders", state_store=store, entity_key="order_id", optimistic=True)
+    def confirm(order_id, *, _ctx=None):
+        _ctx.transition("Confirmed")
+        if order_id == "b":
+            store.set("orders", "default", "b", "Cancelled")
+
+    results = confirm.batch(["a", "b", "c"])
+    assert [r.ok for r in results] == [True, False, True]
+    assert isinstance(results[1].error, StateConflictError)
+    assert results[1].state == "Pending"
+    assert store.get("orders", "default", "a") == "Confirmed"
+    assert store.get("orders", "default", "b") == "Cancelled"
@@ -0,0 +1,192 @@
+"""Tests for the Contract decorator."""
+
+import asyncio
+import importlib
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex import Contract
+
+
+def test_contract_runs_after_ranex_logging_is_imported(orders_feature, caplog):
+    # The submodule import rebinds the package's "logging" attribute
+    importlib.import_module("ranex.logging")
+
+    @Contract(feature="orders")
+    def confirm(*, _ctx=None):
+        _ctx.transition("Confirmed")
+        return _ctx.current_state
+
+    with caplog.at_level("DEBUG", logger="ranex.contract"):
+        assert confirm() == "Confirmed"
+
+
+def test_repeated_str_and_bytes_bodies_are_validated_once(orders_feature, monkeypatch):
+    pydantic = pytest.importorskip("pydantic")
+    import ranex
+
+    class Order(pydantic.BaseModel):
+        order_id: str
+
+    calls = []
+
+    def validate(schema_name, payload):
+        calls.append(payload)
+        return SimpleNamespace(valid=True, errors=[], field_errors={})
+
+    @Contract(feature="orders", input_schema=Order)
+    def create(order: Order, *, _ctx=None):
+        return order
+
+    monkeypatch.setattr(ranex._schema_validator, "validate", validate)
+    body = '{"order_id": "ORD-1"}'
+    # Equal bodies built separately are distinct objects, as with real requests
+    for payload in (body, "".join(body), body.encode(), bytes(bytearray(body.encode()))):
+        create(payload)
+    assert calls == [body, body.encode()]
+
+    # Mutable bodies are always validated
+    create(bytearray(body.encode()))
+    create(bytearray(body.encode()))
+    assert len(calls) == 4
+
+
+def test_large_payloads_are_validated_off_the_event_loop(orders_feature, monkeypatch):
+    pydantic = pytest.importorskip("pydantic")
+    import ranex
+
+    class Order(pydantic.BaseModel):
+        order_id: str
+        note: str
+
+    threads = []
+
+    def validate(schema_name, payload):
+        threads.append(threading.current_thread().name)
+        ok = bool(payload.get("order_id"))
+        return SimpleNamespace(valid=ok, errors=[] if ok else ["order_id: empty"], field_errors={})
+
+    @Contract(feature="orders", input_schema=Order, offload_validation_over_bytes=1000)
+    async def create(order: dict, *, _ctx=None):
+        return threading.current_thread().name
+
+    monkeypatch.setattr(ranex._schema_validator, "validate", validate)
+    loop_thread = asyncio.run(create({"order_id": "ORD-1", "note": "small"}))
+    assert threads == [loop_thread]
+
+    asyncio.run(create({"order_id": "ORD-2", "note": "x" * 5000}))
+    assert threads[1].startswith("ranex-validate")
+
+    with pytest.raises(ValueError, match="order_id: empty"):
+        asyncio.run(create({"order_id": "", "note": "x" * 5000}))
+    assert threads[2].startswith("ranex-validate")
+
+
+def test_estimate_payload_size_stops_past_the_limit():
+    from ranex.validation import estimate_payload_size
+
+    assert estimate_payload_size(b"x" * 10, 100) == 10
+    assert estimate_payload_size({"a": "xyz"}, 100) == 2 + 4 + 5
+    # The walk stops once the limit is passed instead of visiting every item
+    huge = {"items": [{"k": "v" * 100} for _ in range(1_000)]}
+    assert 100 < estimate_payload_size(huge, 100) < 2_000
+
+
+def test_list_of_models_is_validated_in_one_pass(orders_feature):
+    pydantic = pytest.importorskip("pydantic")
+    from typing import List
+
+    class Order(pydantic.BaseModel):
+        order_id: str
+
+    @Contract(feature="orders", input_schema=Order)
+    def import_orders(orders: List[Order], *, _ctx=None):
+        return len(orders)
+
+    assert import_orders([{"order_id": str(n)} for n in range(50)]) == 50
+    # Model instances are skipped; indices still refer to the caller's list
+    mixed = [Order(order_id="a"), {"order_id": "b"}, {}, Order(order_id="c"), {"sku": "x"}]
+    with pytest.raises(ValueError) as exc:
+        import_orders(mixed)
+    assert str(exc.value).startswith("Schema validation failed for 2 of 5 items: [2] ")
+    assert "; [4] " in str(exc.value)
+    with pytest.raises(ValueError, match="expected a list"):
+        import_orders({"order_id": "a"})
+
+
+def test_raw_body_is_parsed_straight_into_the_model(orders_feature):
+    pydantic = pytest.importorskip("pydantic")
+    from typing import List
+
+    class Order(pydantic.BaseModel):
+        order_id: str
+        quantity: int = 1
+
+    @Contract(feature="orders", input_schema=Order, raw_body=True)
+    def create(order: Order, *, _ctx=None):
+        return order
+
+    body = b'{"order_id": "ORD-1", "quantity": 3}'
+    for raw in (body, bytearray(body), memoryview(body), body.decode()):
+        assert create(raw) == Order(order_id="ORD-1", quantity=3)
+    assert create(order=body).order_id == "ORD-1"
+    # Dicts still take the schema validator path
+    assert create({"order_id": "ORD-2"}) == {"order_id": "ORD-2"}
+
+    with pytest.raises(ValueError) as exc:
+        create(b'{"quantity": "many"}')
+    assert str(exc.value).startswith("Schema validation failed: order_id: Field required")
+    assert "quantity: Input should be a valid integer" in str(exc.value)
+    with pytest.raises(ValueError, match="Schema validation failed: Invalid JSON"):
+        create(b"{not json")
+
+    @Contract(feature="orders", input_schema=Order, raw_body=True)
+    async def import_orders(orders: List[Order], *, _ctx=None):
+        return orders
+
+    orders = asyncio.run(import_orders(b'[{"order_id": "a"}, {"order_id": "b"}]'))
+    assert [o.order_id for o in orders] == ["a", "b"]
+    with pytest.raises(ValueError, match=r"Schema validation failed: 1\.order_id: Field required"):
+        asyncio.run(import_orders(b'[{"order_id": "a"}, {}]'))
+
+
+def test_raw_body_needs_a_pydantic_input_schema(orders_feature):
+    with pytest.raises(ValueError, match="raw_body=True\\) needs an input_schema"):
+        Contract(feature="orders", raw_body=True)(lambda order, *, _ctx=None: order)
+    with pytest.raises(ValueError, match="needs a Pydantic model"):
+        Contract(feature="orders", input_schema={"type": "object"}, raw_body=True)(lambda order, *, _ctx=None: order)
+
+
+def test_streams_forward_send_and_return_values(orders_feature):
+    @Contract(feature="orders")
+    def confirm_lines(*, _ctx=None):
+        total = 0
+        while True:
+            quantity = yield total
+            if quantity is None:
+                break
+            total += quantity
+        _ctx.transition("Confirmed")
+        return total
+
+    stream = confirm_lines()
+    assert next(stream) == 0
+    assert stream.send(2) == 2
+    assert stream.send(3) == 5
+    with pytest.raises(StopIteration) as stop:
+        stream.send(None)
+    assert stop.value.value == 5
+
+
+def test_streams_reject_offload_and_idempotency(orders_feature):
+    def progress(*, _ctx=None):
+        yield
+
+    with pytest.raises(ValueError, match="does not support offload on generator functions"):
+        Contract(feature="orders", offload="thread")(progress)
+    with pytest.raises(ValueError, match="does not support idempotency_key on generator functions"):
+        Contract(feature="orders", idempotency_key=lambda **_: "k")(progress)
@@ -0,0 +1,178 @@
+"""Tests for the transition event log (ranex.eventlog)."""
+
+import os
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex.eventlog import SEGMENT_MAGIC, EventLog, read_events, replay
+from ranex.store import MemoryStateStore
+
+EVENT_SIZE = 37
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return tmp_path / "events"
+
+
+def fill(log, tenants=("t1", "t2"), entities=10):
+    """Move every entity Pending -> Confirmed -> Processing; returns the expected states."""
+    expected = {}
+    for step in (("Pending", "Confirmed"), ("Confirmed", "Processing")):
+        for tenant in tenants:
+            for n in range(entities):
+                log.append("orders", tenant, f"ORD-{n}", [step])
+                expected[("orders", tenant, f"ORD-{n}")] = step[1]
+    return expected
+
+
+def test_segment_stores_strings_once_and_fixed_size_events(log_dir):
+    log = EventLog(log_dir)
+    log.append("orders", "t1", "ORD-1", [("Pending", "Confirmed"), ("Confirmed", "Processing")])
+    log.append("orders", "t1", "ORD-1", [("Processing", "Shipped")])
+    log.close()
+
+    [segment] = sorted(log_dir.glob("events-*.log"))
+    data = segment.read_bytes()
+    assert data.startswith(SEGMENT_MAGIC)
+    strings = ["orders", "t1", "ORD-1", "Pending", "Confirmed", "Processing", "Shipped"]
+    # Each string is a 7-byte header plus its UTF-8 bytes, written once
+    assert len(data) == len(SEGMENT_MAGIC) + sum(7 + len(s) for s in strings) + 3 * EVENT_SIZE
+    assert data.count(b"Confirmed") == 1
+    assert [(e.seq, e.from_state, e.to_state) for e in read_events(log_dir)] == [
+        (1, "Pending", "Confirmed"), (2, "Confirmed", "Processing"), (3, "Processing", "Shipped"),
+    ]
+
+
+def test_torn_tail_is_dropped_and_the_log_reopens(log_dir):
+    log = EventLog(log_dir)
+    for n in range(3):
+        log.append("orders", "t1", f"ORD-{n}", [("Pending", "Confirmed")])
+    log.close()
+    [segment] = sorted(log_dir.glob("events-*.log"))
+    with open(segment, "r+b") as f:
+        f.truncate(segment.stat().st_size - 10)  # Crash mid-record
+
+    assert [e.seq for e in read_events(log_dir)] == [1, 2]
+    assert set(replay(log_dir).states) == {("orders", "t1", "ORD-0"), ("orders", "t1", "ORD-1")}
+
+    reopened = EventLog(log_dir)
+    assert reopened.last_seq == 2
+    assert reopened.append("orders", "t1", "ORD-9", [("Pending", "Cancelled")]) == 3
+    reopened.close()
+    assert len(list(log_dir.glob("events-*.log"))) == 2
+    assert [e.seq for e in read_events(log_dir)] == [1, 2, 3]
+    assert replay(log_dir).states[("orders", "t1", "ORD-9")] == "Cancelled"
+
+
+def test_snapshot_replay_matches_full_replay(log_dir):
+    log = EventLog(log_dir, segment_bytes=512)
+    expected = fill(log)
+    log.snapshot()
+    log.append("orders", "t1", "ORD-0", [("Processing", "Shipped")])
+    expected[("orders", "t1", "ORD-0")] = "Shipped"
+    log.close()
+
+    with_snapshot = replay(log_dir)
+    assert with_snapshot.snapshot_seq == 40
+    assert with_snapshot.events_applied == 1
+    assert with_snapshot.states == expected
+
+    for path in log_dir.glob("snapshot-*.snap"):
+        path.unlink()
+    full = replay(log_dir)
+    assert (full.snapshot_seq, full.events_applied) == (0, 41)
+    assert full.states == expected
+
+
+def test_damaged_snapshot_falls_back_to_the_previous_one(log_dir, caplog):
+    log = EventLog(log_dir, segment_bytes=512, prune=True)
+    expected = fill(log)
+    log.snapshot()
+    expected.update(fill(log, tenants=("t3",)))
+    log.snapshot()
+    log.close()
+
+    older, newest = sorted(log_dir.glob("snapshot-*.snap"))
+    newest.write_bytes(newest.read_bytes()[:-5])
+    with caplog.at_level("WARNING", logger="ranex.contract"):
+        result = replay(log_dir)
+    assert any("Skipping unreadable event log snapshot" in r.message for r in caplog.records)
+    assert result.snapshot_seq == int(older.stem.split("-")[1])
+    # prune=True kept every segment the fallback snapshot needs
+    assert result.states == expected
+
+
+def test_prune_deletes_only_segments_the_fallback_snapshot_covers(log_dir):
+    log = EventLog(log_dir, segment_bytes=256, prune=True)
+    fill(log)
+    log.snapshot()
+    segments = len(list(log_dir.glob("events-*.log")))
+    fill(log, tenants=("t3",))
+    log.snapshot()
+    log.close()
+    # The first snapshot kept every segment; the second pruned up to the first
+    assert segments > 1
+    remaining = sorted(log_dir.glob("events-*.log"))
+    assert int(remaining[0].stem.split("-")[1]) <= 41
+
+
+def test_validate_reports_anomalies(orders_feature, log_dir):
+    log = EventLog(log_dir)
+    log.append("orders", "t1", "ORD-1", [("Pending", "Confirmed")])
+    log.append("orders", "t1", "ORD-1", [("Confirmed", "Delivered")])  # Not allowed
+    log.append("orders", "t1", "ORD-2", [("Shipped", "Delivered")])  # Was Pending
+    log.close()
+
+    assert replay(log_dir).anomalies == []
+    result = replay(log_dir, validate=True)
+    assert result.anomalies == [
+        "seq 2: orders does not allow 'Confirmed' -> 'Delivered'",
+        "seq 3: orders:t1:ORD-2 was 'Pending', event moves from 'Shipped'",
+    ]
+    # Anomalous events are still applied
+    assert result.states[("orders", "t1", "ORD-2")] == "Delivered"
+
+
+def test_apply_to_writes_every_state(log_dir):
+    log = EventLog(log_dir)
+    expected = fill(log, entities=3)
+    log.close()
+    store = MemoryStateStore()
+    assert replay(log_dir).apply_to(store) == len(expected)
+    for (feature, tenant, entity), state in expected.items():
+        assert store.get(feature, tenant, entity) == state
+
+
+def test_second_writer_is_rejected(log_dir):
+    log = EventLog(log_dir)
+    with pytest.raises(RuntimeError):
+        EventLog(log_dir)
+    log.close()
+    EventLog(log_dir).close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_log_inherited_across_fork_refuses_to_write(log_dir):
+    log = EventLog(log_dir)
+    log.append("orders", "t1", "ORD-1", [("Pending", "Confirmed")])
+    pid = os.fork()
+    if pid == 0:
+        try:
+            log.append("orders", "t1", "ORD-2", [("Pending", "Confirmed")])
+        except RuntimeError:
+            os._exit(0)
+        except BaseException:
+            pass
+        os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    # The parent keeps its lock and its segment
+    with pytest.raises(RuntimeError):
+        EventLog(log_dir)
+    log.append("orders", "t1", "ORD-3", [("Pending", "Confirmed")])
+    log.close()
+    assert [e.entity_id for e in read_events(log_dir)] == ["ORD-1", "ORD-3"]
@@ -0,0 +1,116 @@
+"""Tests for idempotent result caching (ranex.idempotency)."""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex import Contract
+from ranex.idempotency import IdempotencyCache, MemoryIdempotencyStore, RedisIdempotencyStore
+
+
+def test_concurrent_threads_share_one_execution():
+    cache = IdempotencyCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def charge(amount):
+        calls.append(amount)
+        started.set()
+        release.wait(5)
+        return {"charged": amount}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.run("req-1", charge, 10))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [10]
+    assert results == [{"charged": 10}] * 5
+    # Later retries are served from the cache
+    assert cache.run("req-1", charge, 99) == {"charged": 10} and calls == [10]
+
+
+def test_concurrent_tasks_share_one_execution():
+    cache = IdempotencyCache()
+    calls = []
+
+    async def charge(amount):
+        calls.append(amount)
+        await asyncio.sleep(0.01)
+        return amount * 2
+
+    async def main():
+        return await asyncio.gather(*(cache.run_async("req-1", charge, 21) for _ in range(5)))
+
+    assert asyncio.run(main()) == [42] * 5
+    assert calls == [21]
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = IdempotencyCache()
+    attempts = []
+
+    async def charge():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise ConnectionError("gateway down")
+        return "ok"
+
+    async def main():
+        return await asyncio.gather(*(cache.run_async("req-1", charge) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(attempts) == 1 and all(isinstance(r, ConnectionError) for r in results)
+    assert not cache._inflight
+    # The retry runs again
+    assert asyncio.run(cache.run_async("req-1", charge)) == "ok" and len(attempts) == 2
+
+
+def test_results_expire_after_the_ttl():
+    cache = IdempotencyCache(ttl_seconds=0)
+    calls = []
+    cache.run("req-1", calls.append, 1)
+    cache.run("req-1", calls.append, 2)
+    assert calls == [1, 2]
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryIdempotencyStore(max_entries=2)
+    store.set("a", 1, 60)
+    store.set("b", 2, 60)
+    store.get("a")
+    store.set("c", 3, 60)
+    assert store.get("b") == (False, None)
+    assert store.get("a") == (True, 1) and len(store) == 2
+
+
+def test_redis_store_round_trips_results(fake_redis):
+    store = RedisIdempotencyStore(client=fake_redis, prefix="test:")
+    store.set("req-1", {"charged": 10}, 0.5)
+    assert store.get("req-1") == (True, {"charged": 10})
+    assert fake_redis.expiry["test:req-1"] == 1
+    store.delete("req-1")
+    assert store.get("req-1") == (False, None)
+
+
+def test_contract_replays_results_per_tenant(orders_feature):
+    calls = []
+
+    @Contract(feature="orders", idempotency_key=lambda order_id, **_: order_id)
+    def confirm(order_id: str, *, _ctx=None):
+        calls.append(order_id)
+        _ctx.transition("Confirmed")
+        return len(calls)
+
+    assert confirm("ORD-1", tenant_id="t1") == 1
+    assert confirm("ORD-1", tenant_id="t1") == 1
+    assert confirm("ORD-1", tenant_id="t2") == 2
+    assert calls == ["ORD-1", "ORD-1"]
@@ -0,0 +1,159 @@
+"""Tests for Contract metrics (ranex.metrics)."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("ranex_core")
+pytest.importorskip("prometheus_client")
+
+import prometheus_client
+
+import ranex.metrics
+from ranex import Contract
+from ranex.metrics import MetricsRecorder
+from ranex.store import MemoryStateStore
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = MetricsRecorder(registry=prometheus_client.CollectorRegistry(), flush_interval=3600)
+    monkeypatch.setattr(ranex.metrics, "_recorder", recorder)
+    yield recorder
+    recorder.close()
+
+
+def sample(recorder, name, **labels):
+    value = recorder.registry.get_sample_value(f"ranex_{name}", labels)
+    return value or 0.0
+
+
+def test_successful_call_counts_its_transitions(orders_feature, recorder):
+    @Contract(feature="orders")
+    def confirm(*, _ctx=None):
+        _ctx.transition("Confirmed")
+
+    confirm()
+    recorder.flush()
+    assert sample(recorder, "state_transitions_total", feature="orders", from_state="Pending", to_state="Confirmed") == 1
+    assert sample(recorder, "contract_calls_total", feature="orders", function="confirm", outcome="success") == 1
+
+
+def test_rolled_back_transitions_are_not_counted(orders_feature, recorder):
+    @Contract(feature="orders")
+    def confirm(*, _ctx=None):
+        _ctx.transition("Confirmed")
+        raise RuntimeError("payment declined")
+
+    with pytest.raises(RuntimeError):
+        confirm()
+    recorder.flush()
+    assert sample(recorder, "state_transitions_total", feature="orders", from_state="Pending", to_state="Confirmed") == 0
+    assert sample(recorder, "contract_calls_total", feature="orders", function="confirm", outcome="error") == 1
+    assert sample(recorder, "contract_rollbacks_total", feature="orders", function="confirm", result="success") == 1
+
+
+def test_closed_stream_rolls_back_without_counting_transitions(orders_feature, recorder):
+    @Contract(feature="orders")
+    def progress(*, _ctx=None):
+        _ctx.transition("Confirmed")
+        yield "Confirmed"
+        _ctx.transition("Processing")
+        yield "Processing"
+
+    stream = progress()
+    assert next(stream) == "Confirmed"
+    stream.close()
+    recorder.flush()
+    assert sample(recorder, "state_transitions_total", feature="orders", from_state="Pending", to_state="Confirmed") == 0
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="cancelled") == 1
+    assert sample(recorder, "contract_rollbacks_total", feature="orders", function="progress", result="success") == 1
+
+
+def test_exhausted_stream_succeeds_and_records_its_first_item(orders_feature, recorder):
+    store = MemoryStateStore()
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id")
+    async def progress(order_id: str, *, _ctx=None):
+        for state in ("Confirmed", "Processing"):
+            _ctx.transition(state)
+            yield state
+
+    async def consume():
+        return [item async for item in progress("ORD-1")]
+
+    assert asyncio.run(consume()) == ["Confirmed", "Processing"]
+    recorder.flush()
+    assert store.get("orders", "default", "ORD-1") == "Processing"
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="success") == 1
+    assert sample(recorder, "contract_stream_first_item_seconds_count", feature="orders", function="progress") == 1
+
+
+def test_aclose_rolls_back_and_counts_cancelled(orders_feature, recorder):
+    store = MemoryStateStore()
+    cleaned_up = []
+
+    @Contract(feature="orders", state_store=store, entity_key="order_id")
+    async def progress(order_id: str, *, _ctx=None):
+        try:
+            _ctx.transition("Confirmed")
+            yield "Confirmed"
+            _ctx.transition("Processing")
+            yield "Processing"
+        finally:
+            cleaned_up.append(order_id)
+
+    async def disconnect_after_first_item():
+        stream = progress("ORD-1")
+        assert await stream.__anext__() == "Confirmed"
+        await stream.aclose()
+
+    asyncio.run(disconnect_after_first_item())
+    recorder.flush()
+    assert cleaned_up == ["ORD-1"]
+    assert store.get("orders", "default", "ORD-1") is None
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="cancelled") == 1
+    assert sample(recorder, "contract_rollbacks_total", feature="orders", function="progress", result="success") == 1
+    assert sample(recorder, "state_transitions_total", feature="orders", from_state="Pending", to_state="Confirmed") == 0
+
+
+def test_cancelled_consumer_task_counts_cancelled(orders_feature, recorder):
+    @Contract(feature="orders")
+    async def progress(*, _ctx=None):
+        _ctx.transition("Confirmed")
+        yield "Confirmed"
+        await asyncio.sleep(60)  # Waiting on a slow upstream
+        yield "never"
+
+    async def cancel_consumer():
+        async def consume():
+            async for _ in progress():
+                pass
+
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_consumer())
+    recorder.flush()
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="cancelled") == 1
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="error") == 0
+    assert sample(recorder, "contract_rollbacks_total", feature="orders", function="progress", result="success") == 1
+
+
+def test_error_inside_stream_counts_error(orders_feature, recorder):
+    @Contract(feature="orders")
+    def progress(*, _ctx=None):
+        _ctx.transition("Confirmed")
+        yield "Confirmed"
+        raise RuntimeError("upstream failed")
+
+    stream = progress()
+    assert next(stream) == "Confirmed"
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        next(stream)
+    recorder.flush()
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="error") == 1
+    assert sample(recorder, "contract_calls_total", feature="orders", function="progress", outcome="cancelled") == 0
@@ -0,0 +1,79 @@
+"""Tests for the ASGI tenant middleware (ranex.middleware)."""
+
+import asyncio
+import base64
+import json
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex import get_current_tenant_id
+from ranex.middleware import TenantMiddleware
+
+
+def bearer(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+    return b"Bearer eyJhbGciOiJub25lIn0." + payload + b".sig"
+
+
+def call(middleware_kwargs, scope_type="http", path="/", headers=()):
+    """Run one request through the middleware; returns the tenant the app saw."""
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(get_current_tenant_id())
+
+    middleware = TenantMiddleware(app, **middleware_kwargs)
+    scope = {"type": scope_type, "path": path, "headers": list(headers)}
+    asyncio.run(middleware(scope, None, None))
+    return seen[0]
+
+
+def test_tenant_from_header():
+    assert call({}, headers=[(b"x-tenant-id", b"acme")]) == "acme"
+    assert call({}, scope_type="websocket", headers=[(b"x-tenant-id", b"acme")]) == "acme"
+    assert call({"header": "X-Org"}, headers=[(b"x-org", b"globex")]) == "globex"
+
+
+def test_tenant_from_jwt_claim():
+    kwargs = {"header": None, "jwt_claim": "org"}
+    assert call(kwargs, headers=[(b"authorization", bearer({"org": "acme"}))]) == "acme"
+    assert call(kwargs, headers=[(b"authorization", b"Bearer not-a-jwt")]) == "default"
+    # The header wins over the claim, whatever the header order
+    headers = [(b"authorization", bearer({"org": "acme"})), (b"x-tenant-id", b"globex")]
+    assert call({"jwt_claim": "org"}, headers=headers) == "globex"
+
+
+def test_tenant_from_path_segment():
+    assert call({"header": None, "path_segment": 1}, path="/tenants/acme/orders") == "acme"
+    assert call({"header": None, "path_segment": 1}, path="/tenants/") == "default"
+    assert call({"header": None, "path_segment": 1, "default": "public"}, path="/health") == "public"
+
+
+def test_lifespan_passes_through():
+    assert call({"default": "public"}, scope_type="lifespan") == "default"
+
+
+def test_tenant_is_reset_after_the_request():
+    async def app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    async def handle():
+        middleware = TenantMiddleware(app)
+        scope = {"type": "http", "path": "/", "headers": [(b"x-tenant-id", b"acme")]}
+        with pytest.raises(RuntimeError):
+            await middleware(scope, None, None)
+        # Same task, so only the middleware's reset restores the default
+        return get_current_tenant_id()
+
+    assert asyncio.run(handle()) == "default"
+
+
+def test_tenant_strings_are_interned_in_a_bounded_cache():
+    middleware = TenantMiddleware(None, cache_size=2)
+    first = middleware.resolve({"headers": [(b"x-tenant-id", b"acme")]})
+    assert middleware.resolve({"headers": [(b"x-tenant-id", bytes(b"acme"))]}) is first
+    for n in range(5):
+        middleware.resolve({"headers": [(b"x-tenant-id", f"t{n}".encode())]})
+    assert len(middleware._header_cache) <= 2
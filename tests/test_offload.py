@@ -0,0 +1,73 @@
+"""Tests for running Contract bodies on offload pools (ranex.offload)."""
+
+import asyncio
+import inspect
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex import Contract, get_current_tenant_id
+from ranex.offload import shutdown_offload_pools
+from ranex.store import MemoryStateStore
+
+process_store = MemoryStateStore()
+
+
+@Contract(feature="orders", offload="process", state_store=process_store, entity_key="order_id")
+def confirm_in_worker(order_id: str, *, _ctx=None):
+    _ctx.transition("Confirmed")
+    _ctx.transition("Processing")
+    if order_id == "bad":
+        raise RuntimeError("pricing failed")
+    return os.getpid(), get_current_tenant_id()
+
+
+@pytest.fixture
+def offload_pools():
+    yield
+    shutdown_offload_pools()
+
+
+def test_thread_offload_runs_off_the_event_loop(orders_feature, offload_pools):
+    store = MemoryStateStore()
+
+    @Contract(feature="orders", offload="thread", state_store=store, entity_key="order_id")
+    def confirm(order_id: str, *, _ctx=None):
+        _ctx.transition("Confirmed")
+        return threading.current_thread().name, get_current_tenant_id()
+
+    assert inspect.iscoroutinefunction(confirm)
+    thread, tenant = asyncio.run(confirm("ORD-1", tenant_id="acme"))
+    assert thread.startswith("ranex-offload") and tenant == "acme"
+    assert store.get("orders", "acme", "ORD-1") == "Confirmed"
+    assert get_current_tenant_id() == "default"
+
+
+def test_process_offload_replays_worker_transitions(orders_feature, offload_pools):
+    pid, tenant = asyncio.run(confirm_in_worker("ORD-1", tenant_id="acme"))
+    assert pid != os.getpid() and tenant == "acme"
+    assert process_store.get("orders", "acme", "ORD-1") == "Processing"
+
+    with pytest.raises(RuntimeError, match="pricing failed"):
+        asyncio.run(confirm_in_worker("bad", tenant_id="acme"))
+    assert process_store.get("orders", "acme", "bad") is None
+
+
+def test_offload_rejects_functions_it_cannot_run():
+    with pytest.raises(ValueError, match="offload must be one of"):
+        Contract(feature="orders", offload="gpu")(lambda *, _ctx=None: None)
+
+    async def already_async(*, _ctx=None):
+        pass
+
+    with pytest.raises(ValueError, match="already async"):
+        Contract(feature="orders", offload="thread")(already_async)
+
+    def nested(*, _ctx=None):
+        pass
+
+    with pytest.raises(ValueError, match="cannot be imported by a worker process"):
+        Contract(feature="orders", offload="process")(nested)
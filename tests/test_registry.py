@@ -0,0 +1,187 @@
+"""Tests for compiled feature rules (ranex.registry)."""
+
+import pickle
+import time
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex.registry import StateTransitionError, get_registry
+
+
+@pytest.fixture
+def rules(orders_feature):
+    return get_registry().get(orders_feature)
+
+
+def test_validate_transitions_by_name(rules):
+    mask = rules.validate_transitions(["Pending", "Pending", "Shipped"], ["Confirmed", "Delivered", "Delivered"])
+    assert mask == [True, False, True]
+
+
+def test_encode_maps_unknown_states_to_minus_one(rules):
+    assert list(rules.encode(["Pending", "Nope"])) == [rules.state_ids["Pending"], -1]
+
+
+def test_validate_transitions_with_encoded_ids(rules):
+    src = rules.encode(["Pending", "Pending", "Nope"])
+    dst = rules.encode(["Confirmed", "Shipped", "Confirmed"])
+    assert list(rules.validate_transitions(src, dst)) == [True, False, False]
+
+
+def test_validate_transitions_accepts_numpy_integer_scalars(rules):
+    np = pytest.importorskip("numpy")
+    src = list(np.array([rules.state_ids["Pending"]], dtype=np.int64))
+    dst = list(np.array([rules.state_ids["Confirmed"]], dtype=np.int64))
+    assert rules.validate_transitions(src, dst) == [True]
+    # Object arrays of NumPy integers take the list path
+    assert list(rules.validate_transitions(np.array(src, dtype=object), np.array(dst, dtype=object))) == [True]
+
+
+def test_illegal_transition_raises_state_transition_error(rules):
+    machine = get_registry().new_machine("orders")
+    with pytest.raises(StateTransitionError) as exc:
+        machine.transition("Delivered")
+    assert exc.value.allowed_states == ("Confirmed", "Cancelled")
+
+
+def test_illegal_transition_message_matches_rust_core(rules):
+    machine = get_registry().new_machine("orders")
+    with pytest.raises(ValueError) as exc:
+        machine.transition("Delivered")
+    assert str(exc.value) == (
+        "Illegal transition from 'Pending' to 'Delivered' for feature 'orders'.\n"
+        "Allowed transitions from 'Pending': [Confirmed, Cancelled]"
+    )
+    assert str(pickle.loads(pickle.dumps(exc.value))) == str(exc.value)
+
+
+def test_missing_state_yaml_keeps_rules_and_warns_once(rules, tmp_path, caplog):
+    registry = get_registry()
+    path = tmp_path / "app" / "features" / "orders" / "state.yaml"
+    moved = path.with_name("state.yaml.bak")
+    path.rename(moved)
+    with caplog.at_level("WARNING", logger="ranex.contract"):
+        assert registry.refresh("orders") == []
+        assert registry.refresh("orders") == []
+    assert [r.message for r in caplog.records].count(
+        f"State machine file for 'orders' is missing, keeping previous rules: {path}"
+    ) == 1
+    assert registry.get("orders") is rules
+
+    # Checked again once it is back
+    moved.rename(path)
+    assert registry.refresh("orders") == []
+    assert registry._entries["orders"].stat_key is not None
+
+
+def test_try_transition_applies_allowed_moves(rules):
+    machine = get_registry().new_machine("orders", record=True)
+    result = machine.try_transition("Confirmed")
+    assert result
+    assert (result.from_state, result.to_state, result.allowed_states) == (
+        "Pending", "Confirmed", ("Confirmed", "Cancelled")
+    )
+    assert machine.current_state == "Confirmed"
+    assert machine.trail == [("Pending", "Confirmed")]
+    result.raise_for_status()
+
+
+def test_try_transition_rejects_without_raising(rules):
+    machine = get_registry().new_machine("orders", record=True)
+    result = machine.try_transition("Shipped")
+    assert not result
+    assert machine.current_state == "Pending"
+    assert machine.trail == []
+    with pytest.raises(StateTransitionError) as exc:
+        result.raise_for_status()
+    assert (exc.value.current_state, exc.value.attempted_state) == ("Pending", "Shipped")
+    assert exc.value.allowed_states == ("Confirmed", "Cancelled")
+
+
+def test_contract_surfaces_state_transition_error(rules):
+    from ranex import Contract
+
+    @Contract(feature="orders")
+    def ship(*, _ctx=None):
+        _ctx.transition("Shipped")
+
+    with pytest.raises(StateTransitionError) as exc:
+        ship()
+    assert isinstance(exc.value, ValueError)
+    assert (exc.value.current_state, exc.value.attempted_state, exc.value.feature) == ("Pending", "Shipped", "orders")
+
+
+def edit_state_yaml(tmp_path, old, new):
+    path = tmp_path / "app" / "features" / "orders" / "state.yaml"
+    path.write_text(path.read_text().replace(old, new))
+
+
+def allow_cancelling_confirmed(tmp_path):
+    edit_state_yaml(tmp_path, "transitions:\n", "transitions:\n  - { from: Confirmed, to: Cancelled }\n")
+
+
+def test_refresh_reloads_only_changed_rules(rules, tmp_path):
+    registry = get_registry()
+    machine = registry.new_machine("orders")
+    path = tmp_path / "app" / "features" / "orders" / "state.yaml"
+    path.write_text(path.read_text())  # Touched, same content
+    assert registry.refresh() == []
+
+    allow_cancelling_confirmed(tmp_path)
+    assert registry.refresh() == ["orders"]
+    assert registry.get("orders").validate_transitions(["Confirmed"], ["Cancelled"]) == [True]
+    # Machines created before the reload keep the rules they started with
+    assert machine.rules is rules
+    assert rules.validate_transitions(["Confirmed"], ["Cancelled"]) == [False]
+
+
+def test_broken_edit_keeps_previous_rules(rules, tmp_path, caplog):
+    registry = get_registry()
+    edit_state_yaml(tmp_path, "initial_state: Pending", "initial_state: [")
+    with caplog.at_level("WARNING", logger="ranex.contract"):
+        assert registry.refresh() == []
+    assert any("keeping previous rules" in r.message for r in caplog.records)
+    assert registry.get("orders") is rules
+
+
+def test_watcher_reloads_in_the_background(rules, tmp_path):
+    registry = get_registry()
+    watcher = registry.watch(interval=0.01, use_inotify=False)
+    try:
+        assert registry.watch() is watcher
+        allow_cancelling_confirmed(tmp_path)
+        deadline = time.monotonic() + 5
+        while registry.get("orders") is rules and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert registry.get("orders").validate_transitions(["Confirmed"], ["Cancelled"]) == [True]
+    finally:
+        registry.stop_watching()
+    assert registry._watcher is None and not watcher._thread.is_alive()
+
+
+def test_reachability_follows_transition_chains(rules):
+    assert rules.can_reach("Pending", "Delivered")
+    assert rules.can_reach("Shipped", "Shipped")
+    assert not rules.can_reach("Delivered", "Pending")
+    assert not rules.can_reach("Cancelled", "Confirmed")
+    assert not rules.can_reach("Pending", "Nope") and not rules.can_reach("Nope", "Nope")
+    assert rules.reachable_from("Confirmed") == ["Processing", "Shipped", "Delivered"]
+    assert rules.reachable_from("Delivered") == [] and rules.reachable_from("Nope") == []
+
+
+def test_shortest_path_includes_both_ends(rules):
+    assert rules.shortest_path("Pending", "Delivered") == ["Pending", "Confirmed", "Processing", "Shipped", "Delivered"]
+    assert rules.shortest_path("Pending", "Cancelled") == ["Pending", "Cancelled"]
+    assert rules.shortest_path("Shipped", "Shipped") == ["Shipped"]
+    assert rules.shortest_path("Confirmed", "Cancelled") is None
+    assert rules.shortest_path("Nope", "Pending") is None
+
+
+def test_machine_paths_start_at_the_current_state(rules):
+    machine = get_registry().new_machine("orders")
+    machine.transition("Confirmed")
+    assert machine.can_reach("Delivered") and not machine.can_reach("Cancelled")
+    assert machine.path_to("Shipped") == ["Confirmed", "Processing", "Shipped"]
+    assert machine.path_to("Pending") is None
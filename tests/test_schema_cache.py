@@ -0,0 +1,160 @@
+"""Tests for the on-disk JSON schema cache (ranex.schema_cache)."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip("ranex_core")
+pytest.importorskip("pydantic")
+
+import pydantic
+
+from ranex.schema_cache import SchemaCache
+
+MODELS = textwrap.dedent('''
+    import enum
+
+    from pydantic import BaseModel, field_validator
+
+
+    class Status(enum.Enum):
+        OPEN = "open"
+        CLOSED = "closed"
+
+
+    class Line(BaseModel):
+        sku: str
+        quantity: int
+
+
+    class Order(BaseModel):
+        """An order."""
+
+        order_id: str
+        status: Status
+        lines: list[Line]
+
+        @field_validator("order_id")
+        @classmethod
+        def strip(cls, value):
+            return value.strip()
+''')
+
+
+def make_model(**namespace):
+    namespace.setdefault("__annotations__", {"order_id": str})
+    namespace.setdefault("__module__", "tests.models")
+    return type("Order", (pydantic.BaseModel,), namespace)
+
+
+def test_miss_then_hit(tmp_path):
+    model = make_model()
+    cache = SchemaCache(tmp_path)
+    assert cache.json_schema(model) == model.model_json_schema()
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    again = SchemaCache(tmp_path)
+    assert again.json_schema(model) == model.model_json_schema()
+    assert (again.hits, again.misses) == (1, 0)
+
+
+def test_changed_model_misses(tmp_path):
+    cache = SchemaCache(tmp_path)
+    cache.json_schema(make_model())
+    cache.json_schema(make_model(__annotations__={"order_id": int}))
+    assert cache.misses == 2
+
+
+def test_json_schema_extra_changes_the_key(tmp_path):
+    loose = make_model()
+    strict = make_model(model_config=pydantic.ConfigDict(json_schema_extra={"additionalProperties": False}))
+    cache = SchemaCache(tmp_path)
+    assert cache.fingerprint(loose) != cache.fingerprint(strict)
+
+    cache.json_schema(loose)
+    assert cache.json_schema(strict)["additionalProperties"] is False
+
+
+def test_json_schema_hooks_change_the_key():
+    def hook_a(cls, core_schema, handler):
+        return {**handler(core_schema), "x-version": 1}
+
+    def hook_b(cls, core_schema, handler):
+        return {**handler(core_schema), "x-version": 2}
+
+    hook_b.__qualname__ = hook_a.__qualname__
+    cache = SchemaCache(enabled=True)
+    first = make_model(__get_pydantic_json_schema__=classmethod(hook_a))
+    second = make_model(__get_pydantic_json_schema__=classmethod(hook_b))
+    assert cache.fingerprint(first) != cache.fingerprint(second)
+    assert cache.fingerprint(make_model(__doc__="Old.")) != cache.fingerprint(make_model(__doc__="New."))
+
+
+def test_write_is_atomic(tmp_path, monkeypatch):
+    model = make_model()
+    replaced = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        replaced.append((src, dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    cache = SchemaCache(tmp_path)
+    cache.json_schema(model)
+    [(src, dst)] = replaced
+    assert str(src).endswith(".tmp") and os.path.dirname(src) == os.path.dirname(dst)
+    assert [p.name for p in tmp_path.iterdir()] == [f"{cache.fingerprint(model)}.json"]
+    assert json.loads((tmp_path / f"{cache.fingerprint(model)}.json").read_text()) == model.model_json_schema()
+
+
+def test_failed_write_leaves_no_partial_file(tmp_path, monkeypatch):
+    def replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", replace)
+    cache = SchemaCache(tmp_path)
+    model = make_model()
+    assert cache.json_schema(model) == model.model_json_schema()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unwritable_directory_falls_back_to_generating(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = SchemaCache(blocker / "schema-cache")
+    model = make_model()
+    assert cache.json_schema(model) == model.model_json_schema()
+    assert cache.json_schema(model) == model.model_json_schema()
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert not cache._writable
+
+
+def test_corrupt_entry_is_regenerated(tmp_path):
+    model = make_model()
+    cache = SchemaCache(tmp_path)
+    (tmp_path / f"{cache.fingerprint(model)}.json").write_text("{not json")
+    assert cache.json_schema(model) == model.model_json_schema()
+    assert cache.misses == 1
+
+
+def test_key_is_stable_across_processes(tmp_path):
+    (tmp_path / "cache_models.py").write_text(MODELS)
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1]);"
+        "from cache_models import Order; from ranex.schema_cache import SchemaCache;"
+        "print(SchemaCache(enabled=True).fingerprint(Order))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    keys = set()
+    for seed in ("1", "2"):
+        env["PYTHONHASHSEED"] = seed
+        out = subprocess.run(
+            [sys.executable, "-c", script, str(tmp_path)], env=env, capture_output=True, text=True, check=True
+        )
+        keys.add(out.stdout.strip())
+    assert len(keys) == 1 and None not in keys and "None" not in keys
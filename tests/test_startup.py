@@ -0,0 +1,63 @@
+"""Tests for startup warmup (ranex.startup)."""
+
+import sys
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex.registry import FeatureRegistry
+from ranex.startup import discover_features, warmup
+
+
+@pytest.fixture
+def importable_app(orders_feature, tmp_path, monkeypatch):
+    """Make app/features importable as a package from the working directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path / "app" / "features"
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+
+
+def test_warmup_compiles_and_imports_every_feature(importable_app):
+    (importable_app / "orders" / "handlers.py").write_text("LOADED = True\n")
+    (importable_app / "orders" / "test_handlers.py").write_text("raise AssertionError\n")
+    (importable_app / "__pycache__").mkdir()
+    registry = FeatureRegistry()
+
+    report = warmup(registry=registry)
+    assert discover_features() == ["orders"]
+    assert report.ok
+    [orders] = report.features
+    assert orders.feature == "orders" and orders.states == 6
+    assert orders.modules == ["app.features.orders.handlers"]
+    assert sys.modules["app.features.orders.handlers"].LOADED
+    assert "orders" in registry.features()
+    assert "Warmed 1 features" in report.summary()
+
+
+def test_broken_module_is_reported_without_stopping_the_others(importable_app):
+    (importable_app / "orders" / "a_broken.py").write_text("raise ImportError('no such driver')\n")
+    (importable_app / "orders" / "b_handlers.py").write_text("")
+
+    report = warmup(registry=FeatureRegistry())
+    assert not report.ok
+    [orders] = report.failed
+    assert "app.features.orders.a_broken: ImportError: no such driver" in orders.error
+    assert orders.modules == ["app.features.orders.b_handlers"]
+    with pytest.raises(RuntimeError, match="Warmup failed for 1 feature"):
+        report.raise_for_errors()
+
+
+def test_warmup_without_imports_only_compiles(orders_feature, tmp_path):
+    (tmp_path / "app" / "features" / "orders" / "handlers.py").write_text("raise AssertionError\n")
+    report = warmup(import_modules=False, registry=FeatureRegistry())
+    assert report.ok and report.features[0].modules == []
+
+
+def test_warmup_rejects_a_directory_the_core_does_not_load(orders_feature, tmp_path):
+    other = tmp_path / "elsewhere"
+    other.mkdir()
+    with pytest.raises(ValueError, match="set RANEX_APP_DIR instead"):
+        warmup(root=other)
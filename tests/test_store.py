@@ -0,0 +1,110 @@
+"""Tests for the StateStore backends in ranex.store."""
+
+import time
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+from ranex.store import MemoryStateStore, RedisStateStore, SQLiteStateStore, StateStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path, fake_redis):
+    if request.param == "memory":
+        yield MemoryStateStore()
+    elif request.param == "sqlite":
+        store = SQLiteStateStore(tmp_path / "state.db")
+        yield store
+        store.close()
+    else:
+        yield RedisStateStore(client=fake_redis)
+
+
+def test_get_unknown_entity_returns_none(store):
+    assert store.get("orders", "default", "ORD-1") is None
+
+
+def test_set_then_get(store):
+    store.set("orders", "default", "ORD-1", "Confirmed")
+    assert store.get("orders", "default", "ORD-1") == "Confirmed"
+    store.set("orders", "default", "ORD-1", "Processing")
+    assert store.get("orders", "default", "ORD-1") == "Processing"
+
+
+def test_keys_are_scoped_by_feature_and_tenant(store):
+    store.set("orders", "acme", "ORD-1", "Confirmed")
+    assert store.get("orders", "globex", "ORD-1") is None
+    assert store.get("payments", "acme", "ORD-1") is None
+
+
+def test_delete(store):
+    store.set("orders", "default", "ORD-1", "Confirmed")
+    store.delete("orders", "default", "ORD-1")
+    assert store.get("orders", "default", "ORD-1") is None
+
+
+def test_compare_and_set_writes_when_state_matches(store):
+    assert store.compare_and_set("orders", "default", "ORD-1", None, "Pending")
+    assert store.compare_and_set("orders", "default", "ORD-1", "Pending", "Confirmed")
+    assert store.get("orders", "default", "ORD-1") == "Confirmed"
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStateStore(max_entries=2)
+    store.set("orders", "default", "a", "Pending")
+    store.set("orders", "default", "b", "Pending")
+    store.get("orders", "default", "a")
+    store.set("orders", "default", "c", "Pending")
+    assert store.get("orders", "default", "b") is None
+    assert store.get("orders", "default", "a") == "Pending"
+    assert len(store) == 2
+
+
+def test_sqlite_buffered_writes_are_committed_by_the_timer(tmp_path):
+    path = tmp_path / "state.db"
+    writer = SQLiteStateStore(path, batch_size=1000, flush_interval=0.05)
+    reader = SQLiteStateStore(path)
+    try:
+        writer.set("orders", "default", "ORD-1", "Confirmed")  # Buffered: batch_size not reached
+        assert writer.get("orders", "default", "ORD-1") == "Confirmed"
+        deadline = time.monotonic() + 2.0
+        while reader.get("orders", "default", "ORD-1") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert reader.get("orders", "default", "ORD-1") == "Confirmed"
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_sqlite_close_flushes_pending_writes(tmp_path):
+    path = tmp_path / "state.db"
+    store = SQLiteStateStore(path, batch_size=1000, flush_interval=60)
+    store.set("orders", "default", "ORD-1", "Shipped")
+    store.close()
+    reopened = SQLiteStateStore(path)
+    try:
+        assert reopened.get("orders", "default", "ORD-1") == "Shipped"
+    finally:
+        reopened.close()
+
+
+def test_redis_store_applies_ttl(fake_redis):
+    store = RedisStateStore(client=fake_redis, prefix="t:", ttl_seconds=30)
+    store.set("orders", "default", "ORD-1", "Confirmed")
+    assert fake_redis.expiry["t:orders:default:ORD-1"] == 30
+
+
+def test_store_without_compare_and_set_fails_at_construction():
+    class NoCasStore(StateStore):
+        def get(self, feature, tenant_id, entity_id):
+            return None
+
+        def set(self, feature, tenant_id, entity_id, state):
+            pass
+
+        def delete(self, feature, tenant_id, entity_id):
+            pass
+
+    with pytest.raises(TypeError, match="compare_and_set"):
+        NoCasStore()
@@ -0,0 +1,116 @@
+"""Tests for schema validation helpers (ranex.validation)."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("ranex_core")
+
+import ranex_core
+
+from ranex.validation import SchemaValidatorPool
+
+ORDER_SCHEMA = {
+    "type": "object",
+    "properties": {"order_id": {"type": "string"}},
+    "required": ["order_id"],
+}
+
+
+class CountingFactory:
+    """Creates real validators and remembers each one."""
+
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        validator = ranex_core.SchemaValidator()
+        self.created.append(validator)
+        return validator
+
+
+def validate_in_thread(pool, name, payload):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(pool.validate(name, payload)))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_shared_pool_uses_one_validator_for_every_thread():
+    factory = CountingFactory()
+    pool = SchemaValidatorPool(factory, per_thread=False)
+    pool.register_schema("Order", ORDER_SCHEMA)
+    assert pool.validate("Order", {"order_id": "ORD-1"}).valid
+    assert not validate_in_thread(pool, "Order", {}).valid
+    assert len(factory.created) == 1
+
+
+def test_per_thread_pool_gives_each_thread_its_own_validator():
+    factory = CountingFactory()
+    pool = SchemaValidatorPool(factory, per_thread=True)
+    pool.register_schema("Order", ORDER_SCHEMA)
+    registered = len(factory.created)  # Registration compiles once to fail fast
+
+    assert pool.validate("Order", {"order_id": "ORD-1"}).valid
+    assert not validate_in_thread(pool, "Order", {}).valid
+    assert len(factory.created) == registered + 2
+
+    # Schemas registered later reach validators that already exist
+    pool.register_schema("Refund", {**ORDER_SCHEMA, "required": ["refund_id"]})
+    assert not pool.validate("Refund", {"order_id": "ORD-1"}).valid
+    assert pool.validate("Refund", {"refund_id": "R-1"}).valid
+    assert len(factory.created) == registered + 3
+
+
+def test_replaced_schema_takes_effect_on_every_thread():
+    pool = SchemaValidatorPool(ranex_core.SchemaValidator, per_thread=True)
+    pool.register_schema("Order", ORDER_SCHEMA)
+    assert not pool.validate("Order", {}).valid
+    pool.register_schema("Order", {"type": "object"})
+    assert pool.validate("Order", {}).valid
+    assert validate_in_thread(pool, "Order", {}).valid
+
+
+class CountingValidator:
+    """Wraps a real validator and counts validate() calls."""
+
+    def __init__(self):
+        self.inner = ranex_core.SchemaValidator()
+        self.calls = 0
+
+    def register_schema(self, name, schema):
+        self.inner.register_schema(name, schema)
+
+    def validate(self, name, payload):
+        self.calls += 1
+        return self.inner.validate(name, payload)
+
+
+def test_validate_many_checks_a_valid_list_in_one_call():
+    validator = CountingValidator()
+    pool = SchemaValidatorPool(lambda: validator, per_thread=False)
+    pool.register_schema("Order", ORDER_SCHEMA)
+    result = pool.validate_many("Order", [{"order_id": str(n)} for n in range(1000)])
+    assert result and result.failed_indices == [] and result.count == 1000
+    assert validator.calls == 1
+
+
+def test_validate_many_bisects_to_the_failing_items():
+    validator = CountingValidator()
+    pool = SchemaValidatorPool(lambda: validator, per_thread=False)
+    pool.register_schema("Order", ORDER_SCHEMA)
+    items = [{"order_id": str(n)} for n in range(1000)]
+    items[3] = {}
+    items[917] = {"orderid": "917"}
+    result = pool.validate_many("Order", items)
+    assert not result.valid
+    assert result.failed_indices == [3, 917]
+    assert all(result.errors[i] for i in (3, 917))
+    assert validator.calls < 200
+
+
+def test_validate_many_needs_a_registered_schema():
+    pool = SchemaValidatorPool(ranex_core.SchemaValidator, per_thread=False)
+    with pytest.raises(ValueError, match="Schema 'Order' is not registered"):
+        pool.validate_many("Order", [])